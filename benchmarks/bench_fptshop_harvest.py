@@ -0,0 +1,62 @@
+"""
+FPTShop filter harvesting on the saved listing page (tests/fixtures/fptshop_dien_thoai.html).
+
+    python -m benchmarks.bench_fptshop_harvest              # parsers only, no browser
+    python -m benchmarks.bench_fptshop_harvest --browser    # page loads too, needs Chrome
+
+With --browser the fixture is served as a file:// page and the single-pass
+get_all_filter_options() is timed against the previous pattern of one page load
+per category (six get_available_* calls, each of which also slept 3 s before).
+"""
+import argparse
+import time
+
+from selenium_.page.fptshop import FPTShopScraper
+from tests.html_harvest import FIXTURES, load_harvest
+
+CATEGORIES = ("brands", "price_ranges", "ram_options", "storage_options", "os_options", "network_options")
+PREVIOUS_SLEEP = 3.0  # time.sleep(3) after every page load before the single-pass harvester
+
+
+def bench_parsers(rounds: int):
+    scraper = FPTShopScraper()
+    harvest = load_harvest()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for category in CATEGORIES:
+            getattr(scraper, f"_parse_{category}")(harvest)
+    elapsed = time.perf_counter() - started
+    print(f"parse all categories: {elapsed / rounds * 1000:.2f} ms "
+          f"({len(harvest['links'])} links, {len(harvest['texts'])} texts)")
+
+
+def bench_browser():
+    scraper = FPTShopScraper()
+    scraper.BASE_URL = (FIXTURES / "fptshop_dien_thoai.html").as_uri()
+
+    started = time.perf_counter()
+    scraper.get_all_filter_options()
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for category in CATEGORIES:
+        getattr(scraper, f"get_available_{category}")()
+    per_category = time.perf_counter() - started
+
+    print(f"single pass:        {single:6.1f} s")
+    print(f"one load/category:  {per_category:6.1f} s "
+          f"(+{PREVIOUS_SLEEP * len(CATEGORIES):.0f} s of fixed sleeps before)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--browser", action="store_true", help="also time the page loads (needs Chrome)")
+    args = parser.parse_args()
+    bench_parsers(args.rounds)
+    if args.browser:
+        bench_browser()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Cross-source grouping of a few thousand listings.
+
+    python -m benchmarks.bench_product_matcher [--models 1500]
+
+Every model is listed by TGDD and FPT with the naming differences seen on the
+sites (network word, "Điện thoại" prefix, colour, "12GB/256GB" vs "12GB 256GB").
+"""
+import argparse
+import random
+import time
+
+from selenium_.model.result import Result
+from selenium_.product_matcher import group_offers
+
+BRANDS = ("Samsung Galaxy", "Xiaomi Redmi Note", "OPPO Reno", "vivo Y", "realme C", "iPhone")
+VARIANTS = ("", " Pro", " Pro Max", " Ultra", " Plus", " FE")
+COLOURS = ("", " Đen", " Xanh Dương", " Titan Tự Nhiên", " Tím")
+MEMORY = (("8GB", "128GB"), ("8GB", "256GB"), ("12GB", "256GB"), ("12GB", "512GB"))
+
+
+def listings(models: int, seed: int = 7):
+    rng = random.Random(seed)
+    out = []
+    for i in range(models):
+        base = f"{rng.choice(BRANDS)} {10 + i % 400}{rng.choice(VARIANTS)}"
+        ram, storage = rng.choice(MEMORY)
+        price = rng.randrange(2_000, 45_000) * 1000
+        out.append(Result("", f"{base} 5G {ram}/{storage}", f"{price:,}₫".replace(",", "."), "", [],
+                          source="TGDD", source_id=f"t{i}"))
+        out.append(Result("", f"Điện thoại {base} {ram} {storage}{rng.choice(COLOURS)}",
+                          f"{price - 200_000:,}₫".replace(",", "."), "", [], source="FPT", source_id=f"f{i}"))
+    rng.shuffle(out)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--models", type=int, default=1500)
+    args = parser.parse_args()
+    results = listings(args.models)
+
+    started = time.perf_counter()
+    groups = group_offers(results)
+    elapsed = time.perf_counter() - started
+    both = sum(1 for g in groups if len({r.source for r in g.offers}) == 2)
+    print(f"{len(results)} listings -> {len(groups)} groups ({both} with both sources) in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Memory and serialization cost of Result records at catalog scale.
+
+    python -m benchmarks.bench_result [--n 10000]
+
+Compares the compact Result (parsed once, to_dict() straight into the response)
+with the previous path that validated every product through pydantic ProductOut.
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from main import ProductOut
+from selenium_.model.result import Result
+
+NAMES = (
+    "Samsung Galaxy S24 Ultra 5G 12GB/256GB", "iPhone 15 Pro Max 256GB", "Xiaomi Redmi Note 13 8GB/128GB",
+    "OPPO Reno11 F 5G 8GB/256GB", "vivo Y36 8GB/128GB", "realme C67 8GB/128GB", "Samsung Galaxy A55 5G 8GB/128GB",
+)
+DETAILS = (
+    ("8 GB", "256 GB", "Full HD+", "120 Hz"),
+    ('6.7"', "Super Retina XDR", "Apple A17 Pro"),
+    ("RAM 8 GB", "ROM 128 GB", "6.67 inch", "Snapdragon 685"),
+    ("Dimensity 7050", "90 Hz", "HD+"),
+)
+
+
+def products(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(n):
+        price = rng.randrange(2_000, 45_000) * 1000
+        yield ("//cdn.example.vn/%d.jpg" % i, rng.choice(NAMES), f"{price:,}₫".replace(",", "."),
+               "https://example.vn/dtdd/%d" % i, list(rng.choice(DETAILS)), rng.choice(("TGDD", "FPT")), str(i))
+
+
+def timed(label: str, fn):
+    # Timed and traced in separate runs, tracemalloc slows allocation-heavy code down
+    started = time.perf_counter()
+    value = fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {elapsed * 1000:9.1f} ms  peak {peak / 1e6:7.2f} MB")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=10_000)
+    args = parser.parse_args()
+    rows = list(products(args.n))
+    print(f"{args.n} products")
+
+    results = timed("build Result (parse price + specs)",
+                    lambda: [Result(img, name, price, link, details, source=source, source_id=sid)
+                             for img, name, price, link, details, source, sid in rows])
+    timed("to_dict + json.dumps", lambda: json.dumps([r.to_dict() for r in results], ensure_ascii=False))
+    timed("ProductOut(**to_dict).dict + json.dumps",
+          lambda: json.dumps([ProductOut(**r.to_dict()).model_dump() for r in results], ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
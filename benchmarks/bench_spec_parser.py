@@ -0,0 +1,42 @@
+"""
+Throughput of SpecParser over a corpus of real product card detail strings.
+
+    python -m benchmarks.bench_spec_parser [--products 10000]
+
+Each simulated product parses four random detail strings and its name, the
+same work Result does at extraction.
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+
+from selenium_.model.spec_parser import spec_parser
+
+CORPUS = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "detail_strings.txt"
+
+
+def load_corpus():
+    lines = CORPUS.read_text(encoding="utf-8").splitlines()
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=10_000)
+    args = parser.parse_args()
+    corpus = load_corpus()
+    rng = random.Random(7)
+    products = [rng.sample(corpus, 5) for _ in range(args.products)]
+
+    started = time.perf_counter()
+    for texts in products:
+        spec_parser.parse(texts)
+    elapsed = time.perf_counter() - started
+    print(f"{len(corpus)} distinct strings, {args.products} products")
+    print(f"{elapsed * 1000:.1f} ms total, {elapsed / args.products * 1e6:.1f} µs per product, "
+          f"{args.products * 5 / elapsed:,.0f} strings/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Throughput and peak memory of the streaming exports.
+
+    python -m benchmarks.bench_streaming [--rows 100000]
+
+Rows are generated lazily, as price_history.iter_products() yields them, and
+the output is discarded, so the peak shows what the exporter itself holds.
+"""
+import argparse
+import time
+import tracemalloc
+
+from export_service.streaming import PRODUCT_COLUMNS, iter_csv, iter_ndjson, iter_parquet, pa
+
+
+def rows(n: int):
+    for i in range(n):
+        yield {
+            "source": "TGDD" if i % 2 else "FPT", "source_id": str(i), "name": f"Samsung Galaxy A{i % 90} 8GB/128GB",
+            "price": "5.990.000₫", "price_vnd": 5990000 + i, "ram_gb": 8.0, "storage_gb": 128.0,
+            "resolution": "Full HD+", "refresh_rate_hz": 120, "screen_inches": 6.6, "chip": "Exynos 1480",
+            "product_link": f"https://example.vn/dtdd/{i}", "image_link": f"https://cdn.example.vn/{i}.jpg",
+            "details": ["8 GB", "128 GB", "Full HD+", "120 Hz"],
+        }
+
+
+def run(label: str, writer, n: int):
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in writer(rows(n), PRODUCT_COLUMNS))
+    elapsed = time.perf_counter() - started
+    # Traced in a second pass, tracemalloc would skew the throughput
+    tracemalloc.start()
+    for _ in writer(rows(n), PRODUCT_COLUMNS):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {n / elapsed:12,.0f} rows/s  {size / 1e6:8.1f} MB out  peak {peak / 1e6:6.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    run("ndjson", iter_ndjson, args.rows)
+    run("csv", iter_csv, args.rows)
+    if pa is not None:
+        run("parquet", iter_parquet, args.rows)
+    else:
+        print("parquet  skipped (pyarrow not installed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+Read-only snapshot of the scraped catalog, memory-mapped by every API process.
+
+Layout of a snapshot file (native byte order, recorded in the metadata):
+
+    header     magic, format version, metadata length
+    metadata   JSON: snapshot version, row count, symbol table, column offsets
+    columns    one fixed-width array per numeric field, 8-byte aligned
+    strings    (offset, length) into the heap for each text field of each row
+    heap       UTF-8 text of names, prices, links and details
+
+Rows are sorted by (source, product id) so lookups are a binary search. Readers
+slice the columns straight out of the mapping, so N uvicorn workers share one copy
+through the page cache. A new snapshot is written next to the old one and the
+CURRENT pointer file is swapped atomically; readers notice the new pointer on
+their next access and remap without a restart.
+
+Scrapes are queued and published by a background writer that waits a short
+debounce interval to coalesce bursts, and skips the write entirely when the
+merge changed nothing.
+"""
+import json
+import logging
+import math
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from cache.price_history import product_id_of
+from selenium_.model.result import Result
+from selenium_.product_matcher import ProductKey
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single writer process is assumed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CSNP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHI")
+
+# Numeric columns: None is stored as -1 (integers) or NaN (floats)
+INT_COLUMNS = ("price_vnd", "refresh_rate_hz")
+FLOAT_COLUMNS = ("ram_gb", "storage_gb", "screen_inches", "seen_at")
+# Spec ids: index + 1 into the symbol table, 0 for none (uint32, older files may use uint16)
+SYMBOL_COLUMNS = ("source", "brand", "resolution", "chip")
+STRING_FIELDS = ("source_id", "name", "price", "product_link", "image_link", "details")
+DETAILS_SEPARATOR = "\x1f"
+# A product seen again with identical data only updates seen_at once it is this stale
+SEEN_AT_RESOLUTION = 3600.0
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def encode_snapshot(records: List[Dict[str, Any]], version: int) -> bytes:
+    """Serialize record dicts (as returned by CatalogSnapshot.record) into a snapshot"""
+    records = sorted(records, key=lambda r: (r["source"], r["source_id"]))
+    symbols: Dict[str, int] = {}
+
+    def symbol(value: Optional[str]) -> int:
+        if not value:
+            return 0
+        return symbols.setdefault(value, len(symbols) + 1)
+
+    columns: Dict[str, array] = {}
+    for name in INT_COLUMNS:
+        columns[name] = array("q", (-1 if r.get(name) is None else int(r[name]) for r in records))
+    for name in FLOAT_COLUMNS:
+        columns[name] = array("d", (math.nan if r.get(name) is None else float(r[name]) for r in records))
+    for name in SYMBOL_COLUMNS:
+        columns[name] = array("I", (symbol(r.get(name)) for r in records))
+
+    heap = bytearray()
+    strings = array("I")
+    for r in records:
+        for field in STRING_FIELDS:
+            value = r.get(field) or ""
+            if field == "details":
+                value = DETAILS_SEPARATOR.join(value)
+            data = value.encode("utf-8")
+            strings.extend((len(heap), len(data)))
+            heap += data
+
+    # Offsets depend on the metadata length, which depends on the offsets: reserve room for them
+    meta = {
+        "version": version,
+        "created_at": time.time(),
+        "rows": len(records),
+        "byteorder": sys.byteorder,
+        "symbols": list(symbols),
+        "columns": {},
+        "strings": 0,
+        "heap": [0, len(heap)],
+    }
+    sections = [(name, columns[name]) for name in (*INT_COLUMNS, *FLOAT_COLUMNS, *SYMBOL_COLUMNS)]
+    meta_size = len(json.dumps(meta)) + 64 * (len(sections) + 2)
+    offset = _align(HEADER.size + meta_size)
+    for name, column in sections:
+        meta["columns"][name] = [column.typecode, offset]
+        offset = _align(offset + len(column) * column.itemsize)
+    meta["strings"] = offset
+    offset = _align(offset + len(strings) * strings.itemsize)
+    meta["heap"][0] = offset
+
+    meta_bytes = json.dumps(meta).encode("utf-8").ljust(meta_size)
+    out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, meta_size) + meta_bytes)
+    for _, column in [*sections, (None, strings)]:
+        out += b"\0" * (_align(len(out)) - len(out))
+        out += column.tobytes()
+    out += b"\0" * (offset - len(out))
+    out += heap
+    return bytes(out)
+
+
+class CatalogSnapshot:
+    """One memory-mapped snapshot file; columns are zero-copy views of the mapping"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, meta_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a catalog snapshot (format {FORMAT_VERSION})")
+        meta = json.loads(self._mmap[HEADER.size:HEADER.size + meta_size])
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {meta['byteorder']}-endian machine")
+        self.version: int = meta["version"]
+        self.created_at: float = meta["created_at"]
+        self.rows: int = meta["rows"]
+        self.symbols: List[str] = meta["symbols"]
+        self._codes = {value: i + 1 for i, value in enumerate(self.symbols)}
+
+        view = memoryview(self._mmap)
+        self.columns = {}
+        for name, (typecode, offset) in meta["columns"].items():
+            size = array(typecode).itemsize
+            self.columns[name] = view[offset:offset + self.rows * size].cast(typecode)
+        strings_size = self.rows * len(STRING_FIELDS) * 2 * array("I").itemsize
+        self._strings = view[meta["strings"]:meta["strings"] + strings_size].cast("I")
+        heap_offset, heap_size = meta["heap"]
+        self._heap = view[heap_offset:heap_offset + heap_size]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _string(self, row: int, field: int) -> str:
+        i = (row * len(STRING_FIELDS) + field) * 2
+        offset, length = self._strings[i], self._strings[i + 1]
+        return str(self._heap[offset:offset + length], "utf-8")
+
+    def _symbol(self, column: str, row: int) -> Optional[str]:
+        code = self.columns[column][row]
+        return self.symbols[code - 1] if code else None
+
+    def _number(self, column: str, row: int):
+        value = self.columns[column][row]
+        if column in INT_COLUMNS:
+            return None if value == -1 else value
+        return None if math.isnan(value) else value
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Product at `row`, in the shape of Result.to_dict() plus brand and seen_at"""
+        details = self._string(row, STRING_FIELDS.index("details"))
+        return {
+            "image_link": self._string(row, STRING_FIELDS.index("image_link")) or "N/A",
+            "name": self._string(row, STRING_FIELDS.index("name")),
+            "price": self._string(row, STRING_FIELDS.index("price")) or "Không có thông tin",
+            "product_link": self._string(row, STRING_FIELDS.index("product_link")) or "N/A",
+            "details": details.split(DETAILS_SEPARATOR) if details else [],
+            "price_vnd": self._number("price_vnd", row),
+            "source": self._symbol("source", row) or "",
+            "source_id": self._string(row, STRING_FIELDS.index("source_id")),
+            "ram_gb": self._number("ram_gb", row),
+            "storage_gb": self._number("storage_gb", row),
+            "resolution": self._symbol("resolution", row),
+            "refresh_rate_hz": self._number("refresh_rate_hz", row),
+            "screen_inches": self._number("screen_inches", row),
+            "chip": self._symbol("chip", row),
+            "brand": self._symbol("brand", row),
+            "seen_at": self._number("seen_at", row),
+        }
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        return (self.record(row) for row in range(self.rows))
+
+    def lookup(self, source: str, product_id: str) -> Optional[int]:
+        """Row of a product, by binary search over the (source, product id) order"""
+        target = (source, product_id)
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key = (self._symbol("source", mid) or "", self._string(mid, 0))
+            if key < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.rows and (self._symbol("source", lo), self._string(lo, 0)) == target:
+            return lo
+        return None
+
+    def find(self, source: Optional[str] = None, brand: Optional[str] = None,
+             min_price: Optional[int] = None, max_price: Optional[int] = None,
+             ram_gb: Optional[float] = None, storage_gb: Optional[float] = None) -> List[int]:
+        """Rows matching every given constraint, cheapest first (unpriced last)"""
+        checks: List[Tuple[memoryview, Any]] = []
+        for column, value in (("source", source), ("brand", brand)):
+            if value:
+                if value not in self._codes:
+                    return []
+                checks.append((self.columns[column], self._codes[value]))
+        for column, value in (("ram_gb", ram_gb), ("storage_gb", storage_gb)):
+            if value is not None:
+                checks.append((self.columns[column], float(value)))
+        prices = self.columns["price_vnd"]
+        low = -1 if min_price is None else min_price
+        high = sys.maxsize if max_price is None else max_price
+
+        rows = []
+        for row in range(self.rows):
+            if any(column[row] != value for column, value in checks):
+                continue
+            price = prices[row]
+            if (min_price is not None or max_price is not None) and not (price != -1 and low <= price <= high):
+                continue
+            rows.append(row)
+        rows.sort(key=lambda r: (prices[r] == -1, prices[r]))
+        return rows
+
+
+class CatalogSnapshotStore:
+    """Publishes new snapshots from scrape results and serves the current one"""
+
+    POINTER = "CURRENT"
+    KEEP = 2
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv('CATALOG_SNAPSHOT_DIR', 'data/catalog')
+        self.max_age_days = float(os.getenv('CATALOG_SNAPSHOT_MAX_AGE_DAYS', 7))
+        self.debounce_seconds = float(os.getenv('CATALOG_SNAPSHOT_DEBOUNCE_SECONDS', 30))
+        os.makedirs(self.directory, exist_ok=True)
+        self._pointer = os.path.join(self.directory, self.POINTER)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._pointer_stat: Optional[Tuple[int, int]] = None
+        self._swap_lock = threading.Lock()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """Snapshot the pointer names now, remapped when another process published a newer one"""
+        try:
+            st = os.stat(self._pointer)
+        except FileNotFoundError:
+            return None
+        # os.replace() gives the pointer a new inode on every publish
+        stat = (st.st_ino, st.st_mtime_ns)
+        if stat != self._pointer_stat:
+            with self._swap_lock:
+                if stat != self._pointer_stat:
+                    with open(self._pointer, encoding="utf-8") as f:
+                        name = f.read().strip()
+                    if not self._snapshot or os.path.basename(self._snapshot.path) != name:
+                        # The previous mapping is released once no request still uses it
+                        self._snapshot = CatalogSnapshot(os.path.join(self.directory, name))
+                        logger.info(f"Catalog snapshot v{self._snapshot.version} mapped ({len(self._snapshot)} products)")
+                    self._pointer_stat = stat
+        return self._snapshot
+
+    def submit(self, results: List[Result], observed_at: Optional[float] = None):
+        """Queue scraped products for the next snapshot; returns immediately"""
+        if results:
+            self._queue.put((results, observed_at or time.time()))
+
+    def flush(self):
+        """Wait until every queued batch is in a published snapshot"""
+        self._queue.join()
+
+    def _write_loop(self):
+        while True:
+            batches = [self._queue.get()]
+            # Coalesce everything arriving within the debounce interval into a single snapshot
+            until = time.monotonic() + self.debounce_seconds
+            while True:
+                try:
+                    batches.append(self._queue.get(timeout=max(0.0, until - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.publish(batches)
+            except Exception as e:
+                print(f"⚠️ Could not publish catalog snapshot: {e}")
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _record(result: Result, seen_at: float) -> Dict[str, Any]:
+        return {
+            **result.to_dict(),
+            "source_id": product_id_of(result),
+            "brand": ProductKey(result).brand or None,
+            "seen_at": seen_at,
+        }
+
+    @staticmethod
+    def _unchanged(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> bool:
+        """Same product data, and last seen recently enough that the stored time need not move"""
+        if old is None or old["seen_at"] < new["seen_at"] - SEEN_AT_RESOLUTION:
+            return False
+        return all(old.get(k) == v for k, v in new.items() if k != "seen_at")
+
+    def publish(self, batches: List[Tuple[List[Result], float]]) -> int:
+        """
+        Merge scraped batches into the current catalog and publish it; returns the new
+        version, or the current one when the merge changed nothing
+        """
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            if fcntl:
+                # Several processes scrape and publish; merges must not interleave
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            previous = self.current()
+            cutoff = time.time() - self.max_age_days * 86400
+            records = {}
+            changed = False
+            if previous:
+                for record in previous.records():
+                    if record["seen_at"] is not None and record["seen_at"] >= cutoff:
+                        records[(record["source"], record["source_id"])] = record
+                    else:
+                        changed = True
+            for results, seen_at in batches:
+                for result in results:
+                    if result.source:
+                        record = self._record(result, seen_at)
+                        key = (record["source"], record["source_id"])
+                        if not self._unchanged(records.get(key), record):
+                            records[key] = record
+                            changed = True
+
+            if previous and not changed:
+                return previous.version
+            version = (previous.version if previous else 0) + 1
+            name = f"catalog-{version:08d}.snap"
+            self._atomic_write(name, encode_snapshot(list(records.values()), version))
+            self._atomic_write(self.POINTER, name.encode("utf-8"))
+            self._prune()
+        logger.info(f"Published catalog snapshot v{version} ({len(records)} products)")
+        return version
+
+    def _atomic_write(self, name: str, data: bytes):
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _prune(self):
+        """Delete all but the newest KEEP snapshots (open mappings stay valid on POSIX)"""
+        snapshots = sorted(n for n in os.listdir(self.directory) if n.startswith("catalog-") and n.endswith(".snap"))
+        for name in snapshots[:-self.KEEP]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+# Global instance
+try:
+    catalog_snapshots = CatalogSnapshotStore()
+except Exception as e:
+    print(f"⚠️ Catalog snapshot unavailable: {e}. The catalog will not be published.")
+    catalog_snapshots = None
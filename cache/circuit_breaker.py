@@ -0,0 +1,170 @@
+"""
+Health tracking and circuit breaker per retail source, shared by all workers through Redis.
+
+States:
+- closed     the source is scraped normally
+- open       too many recent failures; the source is skipped until the cool-down ends
+- half_open  cool-down over; one trial scrape (guarded by a Redis lock) decides
+             whether the breaker closes again or re-opens
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    HEALTH_KEY = "health:{}"
+    BREAKER_KEY = "breaker:{}"
+    TRIAL_KEY = "breaker:{}:trial"
+    CACHE_KEY = "source_cache:{}:{}"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self.failure_threshold = int(os.getenv('BREAKER_FAILURE_THRESHOLD', 3))
+        self.error_rate_threshold = float(os.getenv('BREAKER_ERROR_RATE', 0.6))
+        self.cooldown_seconds = int(os.getenv('BREAKER_COOLDOWN_SECONDS', 300))
+        self.trial_timeout = int(os.getenv('BREAKER_TRIAL_TIMEOUT', 180))
+        self.ewma_alpha = 0.2  # Weight of the newest scrape in the rolling rates
+        self.min_samples = 5
+        self.cache_ttl_hours = 24
+        self.redis = redis_client
+
+    def state(self, source: str) -> str:
+        if not self.redis:
+            return CLOSED
+        data = self.redis.hgetall(self.BREAKER_KEY.format(source))
+        state = data.get("state", CLOSED)
+        if state == OPEN and time.time() >= float(data.get("opened_at", 0)) + self.cooldown_seconds:
+            return HALF_OPEN
+        return state
+
+    def allow(self, source: str) -> bool:
+        """Whether the source may be scraped now (claims the trial slot when half-open)"""
+        if not self.redis:
+            return True
+        try:
+            state = self.state(source)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                # Only one process probes the source after the cool-down
+                return bool(self.redis.set(self.TRIAL_KEY.format(source), "1", nx=True, ex=self.trial_timeout))
+            return False
+        except Exception as e:
+            print(f"⚠️ Circuit breaker unavailable: {e}")
+            return True
+
+    def record(self, source: str, success: bool, latency: float, zero_result: bool):
+        """Update the health statistics and the breaker after a scrape of the source"""
+        if not self.redis:
+            return
+        try:
+            self._update_health(source, success, latency, zero_result)
+            self._update_breaker(source, success)
+        except Exception as e:
+            print(f"⚠️ Could not record source health: {e}")
+
+    def release(self, source: str):
+        """
+        Give back the trial slot claimed by allow() when the trial scrape was cancelled:
+        it says nothing about the source, the next request probes it instead
+        """
+        if not self.redis:
+            return
+        try:
+            if self.state(source) == HALF_OPEN:
+                self.redis.delete(self.TRIAL_KEY.format(source))
+        except Exception as e:
+            print(f"⚠️ Could not release the circuit trial: {e}")
+
+    def _update_health(self, source: str, success: bool, latency: float, zero_result: bool):
+        key = self.HEALTH_KEY.format(source)
+        health = self.redis.hgetall(key)
+        a = self.ewma_alpha
+
+        def ewma(field: str, value: float) -> float:
+            old = health.get(field)
+            return value if old is None else a * value + (1 - a) * float(old)
+
+        self.redis.hset(key, mapping={
+            "requests": int(health.get("requests", 0)) + 1,
+            "errors": int(health.get("errors", 0)) + (0 if success else 1),
+            "zero_results": int(health.get("zero_results", 0)) + (1 if zero_result else 0),
+            "error_rate": ewma("error_rate", 0.0 if success else 1.0),
+            "zero_result_rate": ewma("zero_result_rate", 1.0 if zero_result else 0.0),
+            "latency_seconds": ewma("latency_seconds", latency),
+            "last_scrape_at": time.time(),
+        })
+
+    def _update_breaker(self, source: str, success: bool):
+        key = self.BREAKER_KEY.format(source)
+        state = self.state(source)
+        if state == HALF_OPEN:
+            self.redis.delete(self.TRIAL_KEY.format(source))
+            if success:
+                self.redis.hset(key, mapping={"state": CLOSED, "consecutive_failures": 0})
+                print(f"✅ Circuit for {source} closed after successful trial")
+            else:
+                self.redis.hset(key, mapping={"state": OPEN, "opened_at": time.time()})
+                print(f"⚠️ Circuit for {source} re-opened after failed trial")
+            return
+        if success:
+            self.redis.hset(key, "consecutive_failures", 0)
+            return
+
+        failures = self.redis.hincrby(key, "consecutive_failures", 1)
+        health = self.redis.hgetall(self.HEALTH_KEY.format(source))
+        error_rate = float(health.get("error_rate", 0))
+        enough_samples = int(health.get("requests", 0)) >= self.min_samples
+        if failures >= self.failure_threshold or (enough_samples and error_rate >= self.error_rate_threshold):
+            self.redis.hset(key, mapping={"state": OPEN, "opened_at": time.time()})
+            print(f"⚠️ Circuit for {source} opened ({failures} consecutive failures, error rate {error_rate:.2f})")
+
+    def health(self, sources: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Health statistics and breaker state of each source"""
+        report = {}
+        for source in sources:
+            data: Dict[str, Any] = {"state": self.state(source)}
+            if self.redis:
+                data.update(self.redis.hgetall(self.HEALTH_KEY.format(source)))
+            report[source] = data
+        return report
+
+    def save_results(self, source: str, config_key: str, products: List[Dict[str, Any]]):
+        """Keep the last good results of a source to serve while its circuit is open"""
+        if not self.redis:
+            return
+        try:
+            self.redis.setex(self.CACHE_KEY.format(source, config_key),
+                             self.cache_ttl_hours * 3600, json.dumps(products))
+        except Exception as e:
+            print(f"⚠️ Could not cache {source} results: {e}")
+
+    def cached_results(self, source: str, config_key: str) -> Optional[List[Dict[str, Any]]]:
+        if not self.redis:
+            return None
+        try:
+            data = self.redis.get(self.CACHE_KEY.format(source, config_key))
+            return json.loads(data) if data else None
+        except Exception:
+            return None
+
+
+def _connect() -> Optional[redis.Redis]:
+    try:
+        client = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"⚠️ Circuit breaker Redis unavailable: {e}. Sources will always be scraped.")
+        return None
+
+
+# Global instance
+circuit_breaker = CircuitBreaker(_connect())
@@ -0,0 +1,72 @@
+"""
+Product counts per source and canonical configuration, for the /count fast path.
+
+Counts change as the sites restock, so entries expire after COUNT_CACHE_TTL_SECONDS.
+A per-process copy answers repeated questions without a Redis round trip.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+
+class CountCache:
+    KEY = "counts:{}:{}"
+    MAX_LOCAL = 4096  # Expired per-process entries are dropped past this size
+
+    def __init__(self):
+        self.ttl = int(os.getenv('COUNT_CACHE_TTL_SECONDS', 900))
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.redis = None
+        try:
+            self.redis = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+            self.redis.ping()
+        except Exception as e:
+            print(f"⚠️ Count cache Redis unavailable: {e}. Counts are cached per process only.")
+            self.redis = None
+
+    def _key(self, source: str, config_key: str) -> str:
+        return self.KEY.format(source, hashlib.sha1(config_key.encode("utf-8")).hexdigest())
+
+    def get(self, source: str, config_key: str) -> Optional[Dict[str, Any]]:
+        """{"count", "at"} while fresh, else None"""
+        key = self._key(source, config_key)
+        with self._lock:
+            entry = self._local.get(key)
+        if entry and time.time() - entry["at"] < self.ttl:
+            return entry
+        if not self.redis:
+            return None
+        try:
+            raw = self.redis.get(key)
+        except Exception as e:
+            print(f"⚠️ Could not read count cache: {e}")
+            return None
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        with self._lock:
+            self._local[key] = entry
+        return entry
+
+    def set(self, source: str, config_key: str, count: int):
+        key = self._key(source, config_key)
+        entry = {"count": int(count), "at": time.time()}
+        with self._lock:
+            if len(self._local) >= self.MAX_LOCAL:
+                self._local = {k: e for k, e in self._local.items() if entry["at"] - e["at"] < self.ttl}
+            self._local[key] = entry
+        if self.redis:
+            try:
+                self.redis.setex(key, self.ttl, json.dumps(entry))
+            except Exception as e:
+                print(f"⚠️ Could not write count cache: {e}")
+
+
+# Global instance
+count_cache = CountCache()
@@ -0,0 +1,193 @@
+"""
+Filter options scraped from the sites, kept in Redis and on local disk.
+
+Loaded once at startup and refreshed by a background thread, so neither the
+index page nor /api/filters ever scrape on the request path. When nothing has
+been cached yet the minimal fallback filters are served.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from selenium_.model.filter_list import FilterList
+from selenium_.scraper.dynamic_filters import DynamicFilterScraper
+from selenium_.scraper.filter_scraper import DynamicFilterManager, filter_manager
+
+# Delete the refresh lock only if it still holds our token: once it expired, another
+# process may have taken it and must keep it until its own scrape ends.
+# KEYS: lock; ARGV: token
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class FilterOptionCache:
+    KEY = "filters:combined"
+    LOCK_KEY = "filters:refresh_lock"
+    POLL_SECONDS = 60
+    # A process that dies mid-scrape blocks the others for at most this long
+    LOCK_SECONDS = 900
+
+    def __init__(self, manager: DynamicFilterManager, path: Optional[str] = None):
+        self.manager = manager
+        self.path = path or os.getenv('FILTER_CACHE_FILE', 'data/filter_options.json')
+        self.refresh_interval = float(os.getenv('FILTER_REFRESH_INTERVAL_SECONDS', 86400))
+        self.filters: Dict[str, Any] = DynamicFilterScraper()._get_fallback_filters()
+        self.scraped_at = 0.0
+        self._refresher: Optional[threading.Thread] = None
+        self.redis = None
+        try:
+            self.redis = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+            self.redis.ping()
+            self._release_script = self.redis.register_script(RELEASE_SCRIPT)
+        except Exception as e:
+            print(f"⚠️ Filter cache Redis unavailable: {e}. Using the local file only.")
+            self.redis = None
+        self.load()
+
+    @property
+    def cached(self) -> bool:
+        return self.scraped_at > 0
+
+    def load(self):
+        """Take the newest copy from Redis or disk; keeps the current filters when neither has one"""
+        candidates = []
+        if self.redis:
+            try:
+                raw = self.redis.get(self.KEY)
+                if raw:
+                    candidates.append(json.loads(raw))
+            except Exception as e:
+                print(f"⚠️ Could not read cached filters from Redis: {e}")
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                candidates.append(json.load(f))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Could not read cached filters from {self.path}: {e}")
+
+        newest = max(candidates, key=lambda c: c.get("scraped_at", 0), default=None)
+        if newest and newest.get("filters") and newest.get("scraped_at", 0) > self.scraped_at:
+            self.filters, self.scraped_at = newest["filters"], newest["scraped_at"]
+
+    def _store(self, entry: Dict[str, Any]):
+        data = json.dumps(entry, ensure_ascii=False)
+        if self.redis:
+            try:
+                self.redis.set(self.KEY, data)
+            except Exception as e:
+                print(f"⚠️ Could not cache filters in Redis: {e}")
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not write cached filters to {self.path}: {e}")
+
+    def refresh(self) -> bool:
+        """Scrape the sites now and store the result; False when every site failed"""
+        filters = self.manager.get_combined_filters(force_refresh=True)
+        if not filters:
+            return False
+        self.filters, self.scraped_at = filters, time.time()
+        self._store({"filters": filters, "scraped_at": self.scraped_at, "timings": self.manager.timings})
+        return True
+
+    def _refresh_due(self) -> Optional[str]:
+        """Lock token when this process should refresh now ("" when not locked in Redis), else None"""
+        self.load()  # Another process may have refreshed already
+        if time.time() - self.scraped_at < self.refresh_interval:
+            return None
+        if not self.redis:
+            return ""
+        # One process per deployment scrapes; the others pick the result up from Redis
+        token = f"{os.getpid()}:{uuid.uuid4()}"
+        try:
+            return token if self.redis.set(self.LOCK_KEY, token, nx=True, ex=self.LOCK_SECONDS) else None
+        except Exception:
+            return ""
+
+    def _release(self, token: str):
+        """Free the refresh lock as soon as the scrape ends, so a failed one can be retried"""
+        if not token:
+            return
+        try:
+            self._release_script(keys=[self.LOCK_KEY], args=[token])
+        except Exception as e:
+            print(f"⚠️ Could not release the filter refresh lock: {e}")
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                token = self._refresh_due()
+                if token is not None:
+                    try:
+                        print("🔄 Refreshing filter options from the sites")
+                        if not self.refresh():
+                            print("⚠️ Filter refresh failed, keeping the cached options")
+                    finally:
+                        self._release(token)
+            except Exception as e:
+                print(f"⚠️ Filter refresh error: {e}")
+            time.sleep(self.POLL_SECONDS)
+
+    def start(self):
+        """Start the background refresh thread (once per process)"""
+        if self._refresher is None and self.refresh_interval > 0:
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+            self._refresher.start()
+
+    def get(self) -> Dict[str, Any]:
+        return {
+            "filters": self.filters,
+            "cached": self.cached,
+            "scraped_at": self.scraped_at or None,
+            "refresh_interval_seconds": self.refresh_interval,
+        }
+
+    @staticmethod
+    def _words(values: List[Any]) -> set:
+        return {w for v in values if isinstance(v, str) for w in v.lower().replace("(", " ").replace(")", " ").split()}
+
+    def index_options(self, filter_list: FilterList) -> Dict[str, Any]:
+        """
+        Template lists for the index page: the FilterList options the sites currently
+        offer. A category is shown in full when the cache says nothing about it.
+        """
+        brands = list(filter_list.get_brands())
+        ram_options = list(filter_list.get_ram_options())
+        storage_options = list(filter_list.get_storage_options())
+        if self.cached:
+            site_brands = self._words(self.filters.get("brands", []))
+            offered = [b for b in brands
+                       if self._words([b, filter_list.BRAND_TGDD_TO_FPT.get(b, b)]) & site_brands]
+            brands = offered or brands
+            site_memory = {filter_list.canonical_memory(v) for v in self.filters.get("ram_options", [])
+                           + self.filters.get("storage_options", []) if isinstance(v, str)}
+            ram_options = [o for o in ram_options if o in site_memory] or ram_options
+            storage_options = [o for o in storage_options if o in site_memory] or storage_options
+        return {
+            "brands": brands,
+            "price_ranges": filter_list.get_price_ranges(),
+            "ram_options": ram_options,
+            "storage_options": storage_options,
+            "resolution_options": filter_list.get_resolution_options(),
+            "refresh_rate_options": filter_list.get_refresh_rate_options(),
+        }
+
+
+# Global instance
+filter_cache = FilterOptionCache(filter_manager)
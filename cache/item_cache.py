@@ -0,0 +1,54 @@
+"""
+Last extracted version of each listed product, keyed by the site's product id.
+
+Lets a scraper skip the field-by-field extraction of items whose fingerprint
+(name, price and spec text) has not changed since the previous scrape.
+"""
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+
+class ItemCache:
+    KEY = "items:{}:{}"
+
+    def __init__(self):
+        self.ttl_days = int(os.getenv('ITEM_CACHE_TTL_DAYS', 7))
+        self.redis = None
+        try:
+            self.redis = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+            self.redis.ping()
+        except Exception as e:
+            print(f"⚠️ Item cache unavailable: {e}. Every product will be fully extracted.")
+            self.redis = None
+
+    def get_many(self, source: str, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """{product id: {"fingerprint", "result"}} for the ids seen before"""
+        ids = [i for i in product_ids if i]
+        if not self.redis or not ids:
+            return {}
+        try:
+            values = self.redis.mget([self.KEY.format(source, i) for i in ids])
+            return {i: json.loads(v) for i, v in zip(ids, values) if v}
+        except Exception as e:
+            print(f"⚠️ Could not read item cache: {e}")
+            return {}
+
+    def set_many(self, source: str, items: List[Tuple[str, str, Dict[str, Any]]]):
+        """Store (product id, fingerprint, result dict) entries"""
+        if not self.redis or not items:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for product_id, fingerprint, result in items:
+                pipe.setex(self.KEY.format(source, product_id), self.ttl_days * 86400,
+                           json.dumps({"fingerprint": fingerprint, "result": result}))
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ Could not write item cache: {e}")
+
+
+# Global instance
+item_cache = ItemCache()
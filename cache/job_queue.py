@@ -0,0 +1,207 @@
+"""
+Redis-backed scrape job queue shared by the API process and the scrape workers.
+
+Reliable-queue layout (at-least-once delivery):
+- scrape:jobs:pending     list of job ids waiting for a worker
+- scrape:jobs:processing  list of job ids claimed by a worker
+- scrape:jobs:leases      sorted set job id -> lease expiry (visibility timeout)
+- scrape:jobs:dead        list of job ids that exhausted their attempts
+- scrape:job:<id>         hash with config, status, attempts and error
+                          (cancel_requested=1 asks the worker running it to stop)
+- scrape:job:<id>:result  JSON result of a finished job, a plain string so exports
+                          can read it in byte ranges
+"""
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import redis
+from redis.client import NEVER_DECODE
+
+# Requeue or dead-letter a failed job in one step, so the attempts read and the list
+# moves cannot interleave with another worker. A job no longer in the processing list
+# was already handled (completed, cancelled or failed twice) and is left alone.
+# KEYS: job hash, processing, leases, dead, pending; ARGV: job id, error, now, max attempts
+FAIL_SCRIPT = """
+if redis.call('LREM', KEYS[2], 1, ARGV[1]) == 0 then
+    return -1
+end
+redis.call('ZREM', KEYS[3], ARGV[1])
+local attempts = tonumber(redis.call('HGET', KEYS[1], 'attempts') or '0') or 0
+local dead = attempts >= tonumber(ARGV[4])
+redis.call('HSET', KEYS[1], 'status', dead and 'dead' or 'queued', 'error', ARGV[2], 'updated_at', ARGV[3])
+redis.call('LPUSH', dead and KEYS[4] or KEYS[5], ARGV[1])
+return dead and 1 or 0
+"""
+
+# Store the result only while the caller still holds the job's lease: a worker whose
+# lease expired (and whose job may now run elsewhere) must not overwrite it.
+# KEYS: job hash, processing, leases, result; ARGV: job id, worker id, result, now
+COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'worker') ~= ARGV[2] or not redis.call('ZSCORE', KEYS[3], ARGV[1]) then
+    return 0
+end
+redis.call('ZREM', KEYS[3], ARGV[1])
+redis.call('LREM', KEYS[2], 1, ARGV[1])
+redis.call('SET', KEYS[4], ARGV[3])
+local ttl = redis.call('TTL', KEYS[1])
+if ttl > 0 then redis.call('EXPIRE', KEYS[4], ttl) end
+redis.call('HSET', KEYS[1], 'status', 'done', 'updated_at', ARGV[4])
+return 1
+"""
+
+
+class ScrapeJobQueue:
+    PENDING_KEY = "scrape:jobs:pending"
+    PROCESSING_KEY = "scrape:jobs:processing"
+    LEASES_KEY = "scrape:jobs:leases"
+    DEAD_KEY = "scrape:jobs:dead"
+    JOB_KEY = "scrape:job:{}"
+    RESULT_KEY = "scrape:job:{}:result"
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self.visibility_timeout = int(os.getenv('SCRAPE_JOB_VISIBILITY_TIMEOUT', 300))
+        self.max_attempts = int(os.getenv('SCRAPE_JOB_MAX_ATTEMPTS', 3))
+        self.ttl_hours = 24  # Job records expire like search results
+        self.redis = redis_client or redis.from_url(
+            os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True
+        )
+        self._fail_script = self.redis.register_script(FAIL_SCRIPT)
+        self._complete_script = self.redis.register_script(COMPLETE_SCRIPT)
+
+    def _job_key(self, job_id: str) -> str:
+        return self.JOB_KEY.format(job_id)
+
+    def enqueue(self, config: Dict[str, Any], deadline_seconds: Optional[float] = None) -> str:
+        """Store a new job and push it to the pending list"""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.hset(self._job_key(job_id), mapping={
+            "id": job_id,
+            "config": json.dumps(config),
+            "status": "queued",
+            "attempts": 0,
+            "deadline_seconds": deadline_seconds or "",
+            "created_at": now,
+            "updated_at": now,
+        })
+        pipe.expire(self._job_key(job_id), self.ttl_hours * 3600)
+        pipe.lpush(self.PENDING_KEY, job_id)
+        pipe.execute()
+        return job_id
+
+    def claim(self, worker_id: str, block_timeout: float = 5) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move the oldest pending job to the processing list and lease it.
+        Returns None when nothing arrives within `block_timeout` seconds.
+        """
+        while True:
+            job_id = self.redis.blmove(self.PENDING_KEY, self.PROCESSING_KEY, block_timeout, "RIGHT", "LEFT")
+            if not job_id:
+                return None
+            if self.redis.exists(self._job_key(job_id)):
+                break
+            # The job's record expired while it was queued: without its config it would
+            # run as an unfiltered whole-catalog scrape, dead-letter the bare id instead
+            pipe = self.redis.pipeline()
+            pipe.lrem(self.PROCESSING_KEY, 1, job_id)
+            pipe.lpush(self.DEAD_KEY, job_id)
+            pipe.execute()
+        now = time.time()
+        pipe = self.redis.pipeline()
+        pipe.zadd(self.LEASES_KEY, {job_id: now + self.visibility_timeout})
+        pipe.hincrby(self._job_key(job_id), "attempts", 1)
+        pipe.hset(self._job_key(job_id), mapping={"status": "running", "worker": worker_id, "updated_at": now})
+        pipe.execute()
+        return self.get(job_id)
+
+    def heartbeat(self, job_id: str):
+        """Extend the lease of a job that is still being worked on"""
+        self.redis.zadd(self.LEASES_KEY, {job_id: time.time() + self.visibility_timeout}, xx=True)
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """Store the result of a job; False (nothing stored) if the worker no longer holds its lease"""
+        return bool(int(self._complete_script(
+            keys=[self._job_key(job_id), self.PROCESSING_KEY, self.LEASES_KEY, self.RESULT_KEY.format(job_id)],
+            args=[job_id, worker_id, json.dumps(result), time.time()],
+        )))
+
+    def fail(self, job_id: str, error: str) -> Optional[str]:
+        """
+        Requeue a failed job, or dead-letter it once it used all its attempts.
+        Returns the new status ("queued" / "dead"), None if the job was not in processing.
+        """
+        outcome = int(self._fail_script(
+            keys=[self._job_key(job_id), self.PROCESSING_KEY, self.LEASES_KEY, self.DEAD_KEY, self.PENDING_KEY],
+            args=[job_id, error, time.time(), self.max_attempts],
+        ))
+        return None if outcome < 0 else ("dead" if outcome else "queued")
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job: a queued job is dropped right away, a running one gets a cancel
+        flag that its worker polls. Returns the resulting status, None for unknown jobs.
+        """
+        status = self.redis.hget(self._job_key(job_id), "status")
+        if status is None:
+            return None
+        if status in ("done", "dead", "cancelled"):
+            return status
+        # LREM fails when a worker claimed the job in the meantime
+        if status == "queued" and self.redis.lrem(self.PENDING_KEY, 1, job_id):
+            self.redis.hset(self._job_key(job_id), mapping={"status": "cancelled", "updated_at": time.time()})
+            return "cancelled"
+        self.redis.hset(self._job_key(job_id), mapping={"cancel_requested": 1, "updated_at": time.time()})
+        return "cancelling"
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        return self.redis.hget(self._job_key(job_id), "cancel_requested") == "1"
+
+    def mark_cancelled(self, job_id: str):
+        """Release a running job whose worker stopped it after a cancel request"""
+        pipe = self.redis.pipeline()
+        pipe.hset(self._job_key(job_id), mapping={"status": "cancelled", "updated_at": time.time()})
+        pipe.lrem(self.PROCESSING_KEY, 1, job_id)
+        pipe.zrem(self.LEASES_KEY, job_id)
+        pipe.execute()
+
+    def requeue_expired(self) -> List[str]:
+        """Recover jobs whose lease expired (crashed or stuck worker)"""
+        recovered = []
+        for job_id in self.redis.zrangebyscore(self.LEASES_KEY, "-inf", time.time()):
+            # Only the worker that removes the lease handles the recovery
+            if self.redis.zrem(self.LEASES_KEY, job_id):
+                self.fail(job_id, "visibility timeout expired")
+                recovered.append(job_id)
+        return recovered
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        data = self.redis.hgetall(self._job_key(job_id))
+        if not data:
+            return None
+        job = dict(data)
+        job["config"] = json.loads(job["config"]) if job.get("config") else {}
+        job["attempts"] = int(job.get("attempts", 0))
+        job["deadline_seconds"] = float(job["deadline_seconds"]) if job.get("deadline_seconds") else None
+        if include_result and job.get("status") == "done":
+            result = self.redis.get(self.RESULT_KEY.format(job_id))
+            if result:
+                job["result"] = json.loads(result)
+        return job
+
+    def read_result(self, job_id: str, start: int, end: int) -> bytes:
+        """Bytes start..end (inclusive) of a finished job's JSON result, undecoded"""
+        return self.redis.execute_command("GETRANGE", self.RESULT_KEY.format(job_id), start, end,
+                                          **{NEVER_DECODE: True})
+
+
+# Global instance
+try:
+    job_queue = ScrapeJobQueue()
+    job_queue.redis.ping()
+except Exception as e:
+    print(f"⚠️ Scrape job queue unavailable: {e}. Jobs will not be queued.")
+    job_queue = None
@@ -0,0 +1,80 @@
+"""
+Remembered filter element locators, keyed by (source, filter type, value).
+
+AdaptiveFilterApplier finds filter elements with broad, full-document XPath
+scans. Once an element has been found and clicked, its exact CSS path is kept
+here so the next run can go straight to it; the applier validates the memo
+against the page and falls back to the adaptive search when it is stale.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+
+class LocatorMemo:
+    KEY = "locators:{}:{}:{}"
+
+    def __init__(self):
+        self.ttl_days = int(os.getenv('LOCATOR_MEMO_TTL_DAYS', 7))
+        self._local: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.redis = None
+        try:
+            self.redis = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+            self.redis.ping()
+        except Exception as e:
+            print(f"⚠️ Locator memo Redis unavailable: {e}. Locators are remembered per process only.")
+            self.redis = None
+
+    def _key(self, source: str, filter_type: str, value: str) -> str:
+        return self.KEY.format(source, filter_type, value.strip().lower())
+
+    def get(self, source: str, filter_type: str, value: str) -> Optional[Dict[str, Any]]:
+        """{"strategy", "locator", "expect", "at"} or None"""
+        key = self._key(source, filter_type, value)
+        with self._lock:
+            entry = self._local.get(key)
+        if entry and time.time() - entry["at"] < self.ttl_days * 86400:
+            return entry
+        if not self.redis:
+            return None
+        try:
+            raw = self.redis.get(key)
+        except Exception as e:
+            print(f"⚠️ Could not read locator memo: {e}")
+            return None
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        with self._lock:
+            self._local[key] = entry
+        return entry
+
+    def remember(self, source: str, filter_type: str, value: str, strategy: str, locator: str, expect: str):
+        key = self._key(source, filter_type, value)
+        entry = {"strategy": strategy, "locator": locator, "expect": expect, "at": time.time()}
+        with self._lock:
+            self._local[key] = entry
+        if self.redis:
+            try:
+                self.redis.setex(key, self.ttl_days * 86400, json.dumps(entry, ensure_ascii=False))
+            except Exception as e:
+                print(f"⚠️ Could not write locator memo: {e}")
+
+    def forget(self, source: str, filter_type: str, value: str):
+        key = self._key(source, filter_type, value)
+        with self._lock:
+            self._local.pop(key, None)
+        if self.redis:
+            try:
+                self.redis.delete(key)
+            except Exception as e:
+                print(f"⚠️ Could not clear locator memo: {e}")
+
+
+# Global instance
+locator_memo = LocatorMemo()
@@ -0,0 +1,196 @@
+"""
+Price history of every scraped product, kept in SQLite beyond the 24 h result cache.
+
+Only price changes are stored: a product scraped a hundred times at the same price
+has one row in price_changes. Writes go through a background thread so scrapes
+never wait on the disk.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from selenium_.model.result import Result
+from selenium_.product_matcher import ProductKey
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    source TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    name TEXT,
+    product_link TEXT,
+    last_price_vnd INTEGER,
+    first_seen_at REAL,
+    last_seen_at REAL,
+    PRIMARY KEY (source, product_id)
+);
+CREATE TABLE IF NOT EXISTS price_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    price_vnd INTEGER NOT NULL,
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_price_changes_product ON price_changes (source, product_id, observed_at);
+CREATE INDEX IF NOT EXISTS idx_price_changes_time ON price_changes (observed_at);
+"""
+
+BIGGEST_DROPS_SQL = """
+WITH changed AS (
+    SELECT source, product_id, MAX(price_vnd) AS high
+    FROM price_changes WHERE observed_at >= :since
+    GROUP BY source, product_id
+),
+baseline AS (
+    -- Price in effect when the window opened
+    SELECT c.source, c.product_id,
+           (SELECT p.price_vnd FROM price_changes p
+            WHERE p.source = c.source AND p.product_id = c.product_id AND p.observed_at < :since
+            ORDER BY p.observed_at DESC LIMIT 1) AS price
+    FROM changed c
+)
+SELECT pr.source, pr.product_id, pr.name, pr.product_link, pr.last_price_vnd,
+       MAX(c.high, COALESCE(b.price, 0)) AS high_price_vnd,
+       MAX(c.high, COALESCE(b.price, 0)) - pr.last_price_vnd AS drop_vnd
+FROM changed c
+JOIN baseline b USING (source, product_id)
+JOIN products pr USING (source, product_id)
+WHERE drop_vnd > 0
+ORDER BY drop_vnd DESC
+LIMIT :limit
+"""
+
+
+def product_id_of(result: Result) -> str:
+    """Site product id, or the canonical model key for listings without one"""
+    return result.source_id or ProductKey(result).key
+
+
+class PriceHistoryStore:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('PRICE_HISTORY_DB', 'data/price_history.db')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        # Readers (API) and the writer thread do not block each other
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def submit(self, results: List[Result], observed_at: Optional[float] = None):
+        """Queue scraped products for recording; returns immediately"""
+        rows = [
+            (r.source, product_id_of(r), r.name, r.product_link, r.price_vnd)
+            for r in results if r.source and r.price_vnd is not None
+        ]
+        if rows:
+            self._queue.put((rows, observed_at or time.time()))
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            rows, observed_at = self._queue.get()
+            try:
+                self._write(conn, rows, observed_at)
+            except Exception as e:
+                print(f"⚠️ Could not record price history: {e}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, rows: List[tuple], observed_at: float):
+        with conn:
+            for source, product_id, name, link, price in rows:
+                last = conn.execute(
+                    "SELECT last_price_vnd FROM products WHERE source = ? AND product_id = ?",
+                    (source, product_id),
+                ).fetchone()
+                if last is None or last["last_price_vnd"] != price:
+                    conn.execute(
+                        "INSERT INTO price_changes (source, product_id, price_vnd, observed_at) VALUES (?, ?, ?, ?)",
+                        (source, product_id, price, observed_at),
+                    )
+                conn.execute(
+                    """INSERT INTO products (source, product_id, name, product_link, last_price_vnd,
+                                             first_seen_at, last_seen_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (source, product_id) DO UPDATE SET
+                           name = excluded.name, product_link = excluded.product_link,
+                           last_price_vnd = excluded.last_price_vnd, last_seen_at = excluded.last_seen_at""",
+                    (source, product_id, name, link, price, observed_at, observed_at),
+                )
+
+    def flush(self):
+        """Wait until every queued write is on disk"""
+        self._queue.join()
+
+    def history(self, source: str, product_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            product = conn.execute(
+                "SELECT * FROM products WHERE source = ? AND product_id = ?", (source, product_id)
+            ).fetchone()
+            if product is None:
+                return None
+            changes = conn.execute(
+                "SELECT price_vnd, observed_at FROM price_changes "
+                "WHERE source = ? AND product_id = ? ORDER BY observed_at",
+                (source, product_id),
+            ).fetchall()
+        finally:
+            conn.close()
+        return {**dict(product), "history": [dict(c) for c in changes]}
+
+    def biggest_drops(self, days: float = 7, limit: int = 20) -> List[Dict[str, Any]]:
+        """Products whose current price is furthest below their highest price in the window"""
+        since = time.time() - days * 86400
+        conn = self._connect()
+        try:
+            rows = conn.execute(BIGGEST_DROPS_SQL, {"since": since, "limit": limit}).fetchall()
+        finally:
+            conn.close()
+        drops = []
+        for row in rows:
+            drop = dict(row)
+            drop["drop_percent"] = round(100 * drop["drop_vnd"] / drop["high_price_vnd"], 1)
+            drops.append(drop)
+        return drops
+
+    def iter_products(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Every product ever scraped with its latest price, streamed from a cursor"""
+        # A streaming response may resume the generator on another thread
+        conn = self._connect(check_same_thread=False)
+        try:
+            cursor = conn.execute(
+                "SELECT source, product_id, name, product_link, last_price_vnd, first_seen_at, last_seen_at "
+                "FROM products ORDER BY source, product_id"
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+
+# Global instance
+try:
+    price_history = PriceHistoryStore()
+except Exception as e:
+    print(f"⚠️ Price history unavailable: {e}. Prices will not be recorded.")
+    price_history = None
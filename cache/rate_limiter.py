@@ -0,0 +1,204 @@
+"""
+Per-host politeness limiter shared by every scraping process through Redis.
+
+Token bucket with reservations: a caller that finds the bucket empty still takes
+its token (the level goes negative) and sleeps until its slot comes up. Waiting
+callers are therefore spaced out at the configured rate, in arrival order,
+instead of all retrying at once when tokens refill.
+
+Limits come from RATE_LIMITS, e.g. "thegioididong.com=1:3,fptshop.com.vn=1:3"
+(requests per second : burst size).
+"""
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import redis
+
+DEFAULT_LIMITS = "thegioididong.com=1:3,fptshop.com.vn=1:3"
+
+# The bucket refills on the Redis server's clock, so skew between workers' clocks does
+# not change the shared budget. ARGV[5] (a caller's clock) is only passed by tests.
+RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local max_wait = tonumber(ARGV[4])
+local now = tonumber(ARGV[5])
+if not now then
+    local t = redis.call('TIME')
+    now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+end
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local after = tokens - requested
+local wait = 0
+if after < 0 then wait = -after / rate end
+if max_wait >= 0 and wait > max_wait then
+    return {0, tostring(wait), tostring(tokens)}
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(after), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return {1, tostring(wait), tostring(after)}
+"""
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse "host=rate:burst,..." into {host: (rate, burst)}"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        host, value = item.split("=", 1)
+        rate, _, burst = value.partition(":")
+        limits[host.strip().lower()] = (float(rate), float(burst or rate))
+    return limits
+
+
+def host_of(url_or_host: str) -> str:
+    """Normalize a URL or host name to the key used for limits ("www." dropped)"""
+    host = urlparse(url_or_host).netloc or url_or_host
+    host = host.split(":")[0].lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class RateLimiter:
+    KEY = "ratelimit:{}"
+    SLEEP_SLICE = 0.25  # Longest sleep between two cancellation checks while waiting for a slot
+
+    def __init__(
+        self,
+        redis_client: Optional[redis.Redis] = None,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        # clock/sleep are injectable so the limiter can be exercised with a fake clock;
+        # an injected clock also replaces the Redis server time in the shared bucket
+        self.limits = limits if limits is not None else parse_limits(os.getenv('RATE_LIMITS', DEFAULT_LIMITS))
+        self.clock = clock or time.time
+        self._server_time = clock is None
+        self.sleep = sleep
+        self.redis = redis_client
+        self._script = self.redis.register_script(RESERVE_SCRIPT) if self.redis else None
+        # In-process buckets, used when Redis is not available
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def _reserve_local(self, host: str, rate: float, burst: float, now: float,
+                       tokens: float, max_wait: float) -> Tuple[bool, float, float]:
+        with self._lock:
+            level, ts = self._local.get(host, (burst, now))
+            level = min(burst, level + max(0.0, now - ts) * rate)
+            after = level - tokens
+            wait = -after / rate if after < 0 else 0.0
+            if max_wait >= 0 and wait > max_wait:
+                return False, wait, level
+            self._local[host] = (after, now)
+            return True, wait, after
+
+    def reserve(self, url_or_host: str, tokens: float = 1, max_wait: float = -1) -> Tuple[bool, float]:
+        """
+        Reserve `tokens` for a host without sleeping.
+        Returns (granted, seconds to wait before using them). When the wait would
+        exceed `max_wait` (>= 0) nothing is reserved and granted is False.
+        """
+        host = host_of(url_or_host)
+        if host not in self.limits:
+            return True, 0.0
+        rate, burst = self.limits[host]
+        now = self.clock()
+        if self._script:
+            try:
+                args = [rate, burst, tokens, max_wait] + ([] if self._server_time else [now])
+                res = self._script(keys=[self.KEY.format(host)], args=args)
+                granted, wait, level = bool(int(res[0])), float(res[1]), float(res[2])
+            except Exception as e:
+                print(f"⚠️ Rate limiter Redis error, using local bucket: {e}")
+                granted, wait, level = self._reserve_local(host, rate, burst, now, tokens, max_wait)
+        else:
+            granted, wait, level = self._reserve_local(host, rate, burst, now, tokens, max_wait)
+        self._record(host, granted, wait, level)
+        return granted, wait
+
+    def acquire(self, url_or_host: str, tokens: float = 1, max_wait: float = -1,
+                cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Block until the host may be hit again. False if it would take longer than
+        max_wait (inf means no limit) or when `cancelled` turns true while waiting.
+        """
+        if math.isinf(max_wait):
+            max_wait = -1
+        granted, wait = self.reserve(url_or_host, tokens, max_wait)
+        if not granted:
+            return False
+        # Sleep in slices so a cancelled caller does not sit out the whole wait
+        end = self.clock() + wait
+        while True:
+            left = end - self.clock()
+            if left <= 0:
+                return True
+            if cancelled and cancelled():
+                return False
+            self.sleep(min(self.SLEEP_SLICE, left))
+
+    def _record(self, host: str, granted: bool, wait: float, level: float):
+        with self._lock:
+            m = self._metrics.setdefault(host, {
+                "acquired": 0, "rejected": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0, "tokens": 0.0,
+            })
+            if granted:
+                m["acquired"] += 1
+                m["wait_seconds_total"] += wait
+                m["wait_seconds_max"] = max(m["wait_seconds_max"], wait)
+            else:
+                m["rejected"] += 1
+            m["tokens"] = level
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Per-host counters of this process, plus the configured limits"""
+        with self._lock:
+            snapshot = {host: dict(m) for host, m in self._metrics.items()}
+        for host, (rate, burst) in self.limits.items():
+            snapshot.setdefault(host, {}).update({"rate_per_second": rate, "burst": burst})
+        return snapshot
+
+    def prometheus_metrics(self) -> str:
+        """metrics() in the Prometheus text exposition format"""
+        lines = []
+        names = {
+            "acquired": ("scraper_rate_limit_acquired_total", "counter"),
+            "rejected": ("scraper_rate_limit_rejected_total", "counter"),
+            "wait_seconds_total": ("scraper_rate_limit_wait_seconds_total", "counter"),
+            "wait_seconds_max": ("scraper_rate_limit_wait_seconds_max", "gauge"),
+            "tokens": ("scraper_rate_limit_tokens", "gauge"),
+            "rate_per_second": ("scraper_rate_limit_rate_per_second", "gauge"),
+            "burst": ("scraper_rate_limit_burst", "gauge"),
+        }
+        snapshot = self.metrics()
+        for field, (name, kind) in names.items():
+            lines.append(f"# TYPE {name} {kind}")
+            for host, m in sorted(snapshot.items()):
+                if field in m:
+                    lines.append(f'{name}{{host="{host}"}} {m[field]}')
+        return "\n".join(lines) + "\n"
+
+
+def _connect() -> Optional[redis.Redis]:
+    try:
+        client = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"⚠️ Rate limiter Redis unavailable: {e}. Limits apply per process only.")
+        return None
+
+
+# Global instance
+rate_limiter = RateLimiter(_connect())
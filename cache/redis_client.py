@@ -6,6 +6,7 @@ import json
 import uuid
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
+from redis.client import NEVER_DECODE
 import os
 
 class RedisCache:
@@ -65,6 +66,19 @@ class RedisCache:
             return json.loads(data)
         return None
 
+    def has_search_result(self, result_id: str) -> bool:
+        return bool(self.redis and self.redis.exists(f"search:{result_id}"))
+
+    def read_search_result(self, result_id: str, start: int, end: int) -> bytes:
+        """
+        Bytes start..end (inclusive) of a stored result, for exports that decode it
+        piece by piece instead of loading the whole JSON
+        """
+        if not self.redis:
+            return b""
+        return self.redis.execute_command("GETRANGE", f"search:{result_id}", start, end,
+                                          **{NEVER_DECODE: True})
+
     def delete_expired_results(self):
         """
         Clean up expired results (Redis handles TTL automatically, but this can be used for manual cleanup)
@@ -0,0 +1,80 @@
+"""
+Statistics collected from past scrapes, shared by all processes through Redis
+"""
+import os
+from typing import Dict, Optional
+
+import redis
+
+
+class ScrapeStats:
+    COUNTS_KEY = "stats:product_counts:{}"
+    FILTERS_KEY = "stats:filters:{}"
+    EWMA_ALPHA = 0.3  # Weight of the newest measurement of a filter
+
+    def __init__(self):
+        self.redis = None
+        try:
+            self.redis = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+            self.redis.ping()
+        except Exception as e:
+            print(f"⚠️ Scrape stats unavailable: {e}. Using default estimates.")
+            self.redis = None
+
+    def record_count(self, source: str, config_key: str, count: int):
+        """Remember how many products a source reported for a configuration"""
+        if not self.redis:
+            return
+        try:
+            self.redis.hset(self.COUNTS_KEY.format(source), config_key, int(count))
+        except Exception as e:
+            print(f"⚠️ Could not record product count: {e}")
+
+    def expected_count(self, source: str, config_key: str) -> Optional[int]:
+        """Last product count seen for a configuration, or None if never scraped"""
+        if not self.redis:
+            return None
+        try:
+            value = self.redis.hget(self.COUNTS_KEY.format(source), config_key)
+            return int(value) if value is not None else None
+        except Exception:
+            return None
+
+    def record_filter(self, source: str, name: str, latency: float, before: Optional[int], after: Optional[int]):
+        """
+        Fold one on-site filter application into the rolling latency and selectivity
+        (share of products kept) of that filter
+        """
+        if not self.redis:
+            return
+        try:
+            data = self.redis.hmget(self.FILTERS_KEY.format(source),
+                                    f"{name}:latency", f"{name}:selectivity", f"{name}:samples")
+            a = self.EWMA_ALPHA
+            mapping = {f"{name}:latency": latency if data[0] is None else a * latency + (1 - a) * float(data[0])}
+            if before and after is not None:
+                selectivity = min(1.0, after / before)
+                mapping[f"{name}:selectivity"] = (
+                    selectivity if data[1] is None else a * selectivity + (1 - a) * float(data[1])
+                )
+                mapping[f"{name}:samples"] = int(data[2] or 0) + 1
+            self.redis.hset(self.FILTERS_KEY.format(source), mapping=mapping)
+        except Exception as e:
+            print(f"⚠️ Could not record filter stats: {e}")
+
+    def filter_stats(self, source: str) -> Dict[str, Dict[str, float]]:
+        """{filter: {"latency", "selectivity", "samples"}} for the filters seen on a source"""
+        if not self.redis:
+            return {}
+        try:
+            stats: Dict[str, Dict[str, float]] = {}
+            for field, value in self.redis.hgetall(self.FILTERS_KEY.format(source)).items():
+                name, _, metric = field.rpartition(":")
+                stats.setdefault(name, {})[metric] = float(value)
+            return stats
+        except Exception:
+            return {}
+
+
+# Global instance
+scrape_stats = ScrapeStats()
@@ -0,0 +1,168 @@
+"""
+Self-ranking selector fallback chains, per site and field.
+
+Every lookup records whether the selector found something. The chain is tried
+in its declared order (most specific first); a selector whose rolling hit rate
+has collapsed is moved to the end, so the dead ones stop costing a WebDriver
+round trip per product while a broader fallback never overtakes a precise
+selector that still works. Rankings are kept in Redis so they survive restarts and are shared by
+all processes; a selector that was reliable and suddenly stops matching raises
+an alert (usually a site redesign).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SelectorRegistry:
+    KEY = "selectors:{}:{}"
+    ALERTS_KEY = "selectors:alerts"
+    EWMA_ALPHA = 0.2
+    UNKNOWN_RATE = 0.5  # Assumed for selectors never tried
+    MIN_SAMPLES = 20
+    HEALTHY_RATE = 0.8
+    COLLAPSED_RATE = 0.3
+    FLUSH_EVERY = 50
+    # Every Nth lookup of a field walks the chain in declaration order, so demoted
+    # selectors keep being measured (to recover, or to confirm a collapse)
+    PROBE_EVERY = 10
+    MAX_ALERTS = 100
+
+    def __init__(self):
+        self.redis = None
+        try:
+            self.redis = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+            self.redis.ping()
+        except Exception as e:
+            print(f"⚠️ Selector registry unavailable: {e}. Rankings will not be persisted.")
+            self.redis = None
+        self._lock = threading.Lock()
+        # (site, field) -> selector -> [hit rate, samples, peak rate since last alert]
+        self._stats: Dict[Tuple[str, str], Dict[str, List[float]]] = {}
+        self._dirty = set()
+        self._pending = 0
+        self._collapsed = set()
+        self._lookups: Dict[Tuple[str, str], int] = {}
+
+    def _field_stats(self, site: str, field: str) -> Dict[str, List[float]]:
+        key = (site, field)
+        if key not in self._stats:
+            stats = {}
+            if self.redis:
+                try:
+                    stats = {s: json.loads(v) for s, v in self.redis.hgetall(self.KEY.format(site, field)).items()}
+                except Exception as e:
+                    print(f"⚠️ Could not load selector rankings: {e}")
+            self._stats[key] = stats
+        return self._stats[key]
+
+    def _demoted(self, stats: Dict[str, List[float]], selector: str) -> bool:
+        rate, samples = stats.get(selector, [self.UNKNOWN_RATE, 0])[:2]
+        return samples >= self.MIN_SAMPLES and rate < self.COLLAPSED_RATE
+
+    def ranked(self, site: str, field: str, candidates: Sequence[str]) -> List[str]:
+        """Candidates in declaration order, the collapsed ones moved to the end"""
+        with self._lock:
+            stats = self._field_stats(site, field)
+            return sorted(candidates, key=lambda s: self._demoted(stats, s))
+
+    def record(self, site: str, field: str, selector: str, hit: bool):
+        with self._lock:
+            stats = self._field_stats(site, field)
+            rate, samples, peak = stats.get(selector, [self.UNKNOWN_RATE, 0, 0.0])
+            rate = float(hit) if samples == 0 else self.EWMA_ALPHA * hit + (1 - self.EWMA_ALPHA) * rate
+            samples += 1
+            peak = max(peak, rate) if samples >= self.MIN_SAMPLES else 0.0
+            stats[selector] = [rate, samples, peak]
+            self._check_collapse(site, field, selector, rate, peak)
+            self._dirty.add((site, field))
+            self._pending += 1
+            flush = self._pending >= self.FLUSH_EVERY
+        if flush:
+            self.flush()
+
+    def _check_collapse(self, site: str, field: str, selector: str, rate: float, peak: float):
+        key = (site, field, selector)
+        if peak >= self.HEALTHY_RATE and rate < self.COLLAPSED_RATE and key not in self._collapsed:
+            self._collapsed.add(key)
+            alert = {"site": site, "field": field, "selector": selector,
+                     "hit_rate": round(rate, 3), "previous_rate": round(peak, 3), "at": time.time()}
+            logger.warning(f"Selector hit rate collapsed for {site}.{field}: '{selector}' "
+                           f"{peak:.0%} -> {rate:.0%}, the site markup may have changed")
+            if self.redis:
+                try:
+                    pipe = self.redis.pipeline()
+                    pipe.lpush(self.ALERTS_KEY, json.dumps(alert, ensure_ascii=False))
+                    pipe.ltrim(self.ALERTS_KEY, 0, self.MAX_ALERTS - 1)
+                    pipe.execute()
+                except Exception as e:
+                    print(f"⚠️ Could not record selector alert: {e}")
+        elif rate >= self.HEALTHY_RATE:
+            self._collapsed.discard(key)
+
+    def first(self, site: str, field: str, candidates: Sequence[str],
+              lookup: Callable[[str], Optional[T]]) -> Optional[T]:
+        """
+        First non-empty `lookup(selector)` over the ranked candidates. Only the
+        selectors actually tried are recorded; an exception counts as a miss.
+        """
+        with self._lock:
+            count = self._lookups.get((site, field), 0) + 1
+            self._lookups[(site, field)] = count
+        order = candidates if count % self.PROBE_EVERY == 0 else self.ranked(site, field, candidates)
+        for selector in order:
+            try:
+                value = lookup(selector)
+            except Exception:
+                value = None
+            self.record(site, field, selector, bool(value))
+            if value:
+                return value
+        return None
+
+    def flush(self):
+        """Persist the rankings changed since the last flush"""
+        with self._lock:
+            dirty, self._dirty, self._pending = self._dirty, set(), 0
+            snapshot = {key: {s: list(v) for s, v in self._stats[key].items()} for key in dirty}
+        if not self.redis or not snapshot:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            for (site, field), stats in snapshot.items():
+                pipe.hset(self.KEY.format(site, field), mapping={s: json.dumps(v) for s, v in stats.items()})
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ Could not persist selector rankings: {e}")
+
+    def rankings(self) -> Dict[str, Dict[str, List[Dict[str, float]]]]:
+        """{site: {field: [{selector, hit_rate, samples}, best first]}} of this process"""
+        with self._lock:
+            out: Dict[str, Dict[str, List[Dict[str, float]]]] = {}
+            for (site, field), stats in self._stats.items():
+                out.setdefault(site, {})[field] = [
+                    {"selector": s, "hit_rate": round(v[0], 3), "samples": int(v[1])}
+                    for s, v in sorted(stats.items(), key=lambda item: -item[1][0])
+                ]
+            return out
+
+    def alerts(self, limit: int = 20) -> List[Dict[str, object]]:
+        if not self.redis:
+            return []
+        try:
+            return [json.loads(a) for a in self.redis.lrange(self.ALERTS_KEY, 0, limit - 1)]
+        except Exception:
+            return []
+
+
+# Global instance
+selector_registry = SelectorRegistry()
@@ -0,0 +1 @@
+# Export service module
@@ -0,0 +1,229 @@
+"""
+Streaming export of product rows as NDJSON, CSV or Parquet.
+
+Rows are consumed from an iterator and written out in small chunks, so memory
+stays flat whatever the size of the result set. Stored results are read the same
+way: iter_json_array() decodes one product at a time from byte ranges of the
+Redis payload. Parquet needs pyarrow; it is written one row group at a time.
+"""
+import codecs
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from fastapi.responses import StreamingResponse
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = None
+    pq = None
+
+# (column, type) with type one of "str", "int", "float", "list"
+PRODUCT_COLUMNS: List[Tuple[str, str]] = [
+    ("source", "str"), ("source_id", "str"), ("name", "str"), ("price", "str"), ("price_vnd", "int"),
+    ("ram_gb", "float"), ("storage_gb", "float"), ("resolution", "str"), ("refresh_rate_hz", "int"),
+    ("screen_inches", "float"), ("chip", "str"), ("product_link", "str"), ("image_link", "str"),
+    ("details", "list"),
+]
+CATALOG_COLUMNS: List[Tuple[str, str]] = [
+    ("source", "str"), ("product_id", "str"), ("name", "str"), ("product_link", "str"),
+    ("last_price_vnd", "int"), ("first_seen_at", "float"), ("last_seen_at", "float"),
+]
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+BATCH_SIZE = 1000
+READ_CHUNK = 64 * 1024  # Bytes of a stored payload read at a time
+
+
+class _RangeReader:
+    """JSON tokens from a payload fetched in byte ranges, keeping only the unread part"""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, read: Callable[[int, int], bytes], chunk_size: int):
+        self.read = read
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        if self.eof:
+            return False
+        # Inclusive end, like Redis GETRANGE
+        data = self.read(self.offset, self.offset + self.chunk_size - 1) or b""
+        self.offset += len(data)
+        self.eof = len(data) < self.chunk_size
+        self.buffer = self.buffer[self.pos:] + self.text.decode(data, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-blank character, "" at the end of the payload"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Malformed stored JSON: expected {char!r} near byte {self.offset}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may go on in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._more()
+
+
+def iter_json_array(read: Callable[[int, int], bytes], key: str,
+                    chunk_size: int = READ_CHUNK) -> Iterator[Any]:
+    """
+    Elements of the array under the top-level `key` of a stored JSON object, decoded
+    one at a time from `read(start, end)` byte ranges (Redis GETRANGE), so neither
+    the payload nor the decoded list is held in memory. Nothing if the key is absent.
+    """
+    reader = _RangeReader(read, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name != key:
+            reader.value()
+        else:
+            reader.expect("[")
+            if reader.peek() == "]":
+                return
+            while True:
+                yield reader.value()
+                if reader.peek() != ",":
+                    reader.expect("]")
+                    return
+                reader.pos += 1
+        if reader.peek() != ",":
+            reader.expect("}")
+            return
+        reader.pos += 1
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_ndjson(rows: Iterable[Dict[str, Any]], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    names = [name for name, _ in columns]
+    for batch in _batches(rows):
+        yield "".join(
+            json.dumps({n: row.get(n) for n in names}, ensure_ascii=False) + "\n" for row in batch
+        ).encode("utf-8")
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    # BOM so Excel opens the Vietnamese text as UTF-8
+    yield "\ufeff".encode("utf-8") + buffer.getvalue().encode("utf-8")
+    for batch in _batches(rows):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            writer.writerow([
+                "; ".join(row.get(name) or []) if kind == "list" else ("" if row.get(name) is None else row.get(name))
+                for name, kind in columns
+            ])
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file object handing what pyarrow writes back to the generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_parquet(rows: Iterable[Dict[str, Any]], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+    types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(), "list": pa.list_(pa.string())}
+    schema = pa.schema([(name, types[kind]) for name, kind in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in _batches(rows):
+            # Columnar builder: one array per column for the whole row group
+            arrays = [pa.array([row.get(name) for row in batch], type=schema.field(name).type)
+                      for name, _ in columns]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_response(rows: Iterable[Dict[str, Any]], fmt: str, filename: str,
+                    columns: List[Tuple[str, str]] = PRODUCT_COLUMNS) -> StreamingResponse:
+    """StreamingResponse downloading `rows` as `filename`.<fmt>"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+    if fmt == "parquet" and pa is None:
+        raise ValueError("Parquet export is not available on this server (pyarrow is not installed), "
+                         "use format=ndjson or format=csv")
+    body = {"ndjson": iter_ndjson, "csv": iter_csv, "parquet": iter_parquet}[fmt](rows, columns)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -1,27 +1,41 @@
+import asyncio
+import functools
 import logging
 import json
 import uuid
 import os
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
-from typing import List, Optional
-from selenium_.page.tgdd import TGDD
-from selenium_.page.fpt import FPTShop   # <-- Đã được tạo riêng
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
 from selenium_.model.phone_configuration import PhoneConfiguration
-from selenium_.model.filter_list import FilterList
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver import Chrome, ChromeOptions
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium_.model.filter_list import filter_list
+from selenium_.cancellation import CancellationToken
+from selenium_.deadline import Deadline
+from selenium_.driver_pool import driver_pool
+from selenium_.scrape_service import ScrapeService
+from selenium_.count_service import CountService
+from selenium_.product_matcher import group_offers
+from selenium_.scraper.filter_scraper import filter_manager
+from cache.filter_cache import filter_cache
 from cache.redis_client import redis_cache
+from cache.job_queue import job_queue
+from cache.scrape_stats import scrape_stats
+from cache.count_cache import count_cache
+from cache.rate_limiter import rate_limiter
+from cache.circuit_breaker import circuit_breaker
+from cache.selector_registry import selector_registry
+from cache.price_history import price_history
+from cache.catalog_snapshot import catalog_snapshots
+from export_service.streaming import CATALOG_COLUMNS, export_response, iter_json_array
 from email_service.email_sender import email_service
 from auth.google_oauth import get_google_oauth_config
 import uvicorn
 import redis
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
@@ -47,6 +61,18 @@ except Exception as e:
     logger.warning(f"⚠️ Redis connection failed: {e}. Results will not be cached.")
     redis_client = None
 
+scrape_service = ScrapeService(driver_pool, scrape_stats, circuit_breaker, price_history, catalog_snapshots)
+count_service = CountService(driver_pool, count_cache, scrape_stats, circuit_breaker)
+DEFAULT_DEADLINE_SECONDS = float(os.getenv('SCRAPE_DEADLINE_SECONDS', 0)) or None
+COUNT_DEADLINE_SECONDS = float(os.getenv('COUNT_DEADLINE_SECONDS', 20)) or None
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+@app.on_event("startup")
+async def start_background_refresh():
+    # Filter options are re-scraped off the request path
+    filter_cache.start()
+
 
 @app.get("/auth/google/config")
 async def get_google_config():
@@ -71,6 +97,9 @@ class PhoneConfigInput(BaseModel):
     resolutions: Optional[List[str]] = None
     refresh_rates: Optional[List[str]] = None
     email: Optional[str] = None  # Email để gửi kết quả
+    deadline_seconds: Optional[float] = None  # Thời gian tối đa cho lần scrape, hết hạn trả kết quả một phần
+    limit: Optional[int] = Field(None, ge=1)  # Chỉ lấy N sản phẩm đầu tiên (theo thứ tự sort), dừng tải sớm
+    sort: Optional[Literal["price_asc", "price_desc"]] = None  # Sắp xếp trên site trước khi lấy N sản phẩm
 
 
 class ProductOut(BaseModel):
@@ -79,6 +108,46 @@ class ProductOut(BaseModel):
     price: str
     product_link: str
     details: List[str]
+    price_vnd: Optional[int] = None
+    source: str = ""
+    source_id: str = ""  # data-id (TGDD) hoặc slug URL (FPT)
+    ram_gb: Optional[float] = None
+    storage_gb: Optional[float] = None
+    resolution: Optional[str] = None
+    refresh_rate_hz: Optional[int] = None
+    screen_inches: Optional[float] = None
+    chip: Optional[str] = None
+
+
+class SourceStatus(BaseModel):
+    partial: bool
+    expected: Optional[int]
+    collected: int
+    error: Optional[str] = None
+    circuit_open: bool = False  # Nguồn đang bị ngắt do lỗi liên tiếp
+    from_cache: bool = False  # Kết quả lấy từ lần scrape thành công gần nhất
+    filtered_out: int = 0  # Sản phẩm bị loại vì không khớp chính xác cấu hình
+    matched: int = 0  # Sản phẩm khớp cấu hình sau khi lọc (trước giới hạn limit)
+
+
+class OfferOut(BaseModel):
+    source: str
+    source_id: str
+    name: str
+    price: Optional[str]
+    price_vnd: Optional[int]
+    product_link: Optional[str]
+
+
+class ProductGroupOut(BaseModel):
+    key: str
+    name: str
+    brand: str
+    storage_gb: Optional[float]
+    ram_gb: Optional[float]
+    best_price_vnd: Optional[int]
+    sources: List[str]
+    offers: List[OfferOut]
 
 
 class ScrapeResponse(BaseModel):
@@ -90,22 +159,22 @@ class ScrapeResponse(BaseModel):
     selected_resolutions: List[str]
     selected_refresh_rates: List[str]
     products: List[ProductOut]
+    groups: List[ProductGroupOut] = []  # Cùng một mẫu máy gộp theo các nguồn bán
+    sources: Dict[str, SourceStatus] = {}
+    limit: Optional[int] = None
+    sort: Optional[str] = None
+    total_available: Optional[int] = None  # Tổng số sản phẩm các site báo sau khi lọc (None nếu có site không báo)
+    has_more: bool = False  # Còn sản phẩm chưa lấy vì giới hạn limit
 
 
 @app.get("/", response_class=HTMLResponse)
 async def get_index(request: Request):
     logger.info("Rendering index page")
-    filter_list = FilterList()
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "brands": filter_list.get_brands(),
-            "price_ranges": filter_list.get_price_ranges(),
-            "ram_options": filter_list.get_ram_options(),
-            "storage_options": filter_list.get_storage_options(),
-            "resolution_options": filter_list.get_resolution_options(),
-            "refresh_rate_options": filter_list.get_refresh_rate_options(),
+            **filter_cache.index_options(filter_list),
         }
     )
 
@@ -130,120 +199,83 @@ async def send_result_email(email: str, result_id: str, total_phones: int):
     except Exception as e:
         logger.error(f"Error sending email: {e}")
 
-@app.post("/scrape", response_model=ScrapeResponse)
-async def scrape_phones(config: PhoneConfigInput, background_tasks: BackgroundTasks):
-    logger.info(f"Received scrape request with config: {config}")
-
+def build_phone_config(config: PhoneConfigInput) -> PhoneConfiguration:
     # Chuẩn hóa cấu hình
-    phone_config = PhoneConfiguration(
+    return PhoneConfiguration(
         brand=config.brand or [],
         price_range=config.price_range,
         ram=parse_ram_or_storage(config.ram),
         storage=parse_ram_or_storage(config.storage),
         resolutions=config.resolutions or [],
         refresh_rates=config.refresh_rates or [],
-    )
+    ).normalized()
 
-    driver_tgdd = None
-    driver_fpt = None
-    try:
-        def build_options():
-            opts = ChromeOptions()
-            opts.add_argument("--no-sandbox")
-            opts.add_argument("--disable-dev-shm-usage")
-            opts.add_argument("--start-maximized")
-            opts.add_argument("--disable-blink-features=AutomationControlled")
-            opts.add_experimental_option("excludeSwitches", ["enable-automation"])
-            opts.add_experimental_option('useAutomationExtension', False)
-            # Block site permission prompts (notifications, geolocation, media) and run headless
-            opts.add_argument("--disable-notifications")
-            opts.add_argument("--no-first-run")
-            opts.add_argument("--disable-popup-blocking")
-            opts.add_argument("--use-fake-ui-for-media-stream")
-            opts.add_argument("--window-size=1280,720")
-            # Headless mode for both TGDD and FPT
-            opts.add_argument("--headless=new")
-            # Chrome content settings to block prompts
-            opts.add_experimental_option(
-                "prefs",
-                {
-                    "profile.default_content_setting_values.notifications": 2,
-                    "profile.default_content_setting_values.geolocation": 2,
-                    "profile.default_content_setting_values.media_stream_mic": 2,
-                    "profile.default_content_setting_values.media_stream_camera": 2,
-                },
-            )
-            return opts
 
-        # Create two independent drivers for parallel scraping
-        driver_tgdd = Chrome(service=Service(ChromeDriverManager().install()), options=build_options())
-        driver_fpt = Chrome(service=Service(ChromeDriverManager().install()), options=build_options())
+async def run_cancellable(request: Request, token: CancellationToken, func, *args):
+    """Run a blocking scrape in the threadpool, cancelling it when the client disconnects"""
+    task = asyncio.ensure_future(run_in_threadpool(func, *args))
+    while not task.done():
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if not done and await request.is_disconnected():
+            logger.info("Client disconnected, cancelling scrape")
+            token.cancel("client disconnected")
+            break
+    # Scrapers stop at their next checkpoint and hand their drivers back to the pool
+    return await task
 
-        all_results = []
 
-        # Run TGDD and FPT in parallel
-        logger.info("Scraping TGDD and FPT in parallel...")
-        tgdd_error = None
-        fpt_error = None
+@app.post("/scrape", response_model=ScrapeResponse)
+async def scrape_phones(config: PhoneConfigInput, background_tasks: BackgroundTasks, request: Request):
+    logger.info(f"Received scrape request with config: {config}")
 
-        def run_tgdd():
-            nonlocal tgdd_error
-            try:
-                scraper = TGDD(driver_tgdd)
-                tgdd_error = scraper.run(phone_config, all_results)
-            except Exception as e:
-                tgdd_error = str(e)
+    phone_config = build_phone_config(config)
 
-        def run_fpt():
-            nonlocal fpt_error
-            try:
-                scraper = FPTShop(driver_fpt)
-                fpt_error = scraper.run(phone_config, all_results)
-            except Exception as e:
-                fpt_error = str(e)
-
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = [executor.submit(run_tgdd), executor.submit(run_fpt)]
-            for f in futures:
-                f.result()
-
-        if tgdd_error:
-            logger.warning(f"TGDD scrape error (non-fatal): {tgdd_error}")
-        if fpt_error:
-            logger.warning(f"FPT scrape error (non-fatal): {fpt_error}")
-
-        # === Loại bỏ trùng lặp ===
-        seen = set()
-        unique_results = []
-        for r in all_results:
-            key = (r.name.strip().lower(), r.price.strip())
-            if key not in seen:
-                seen.add(key)
-                unique_results.append(r)
+    try:
+        token = CancellationToken()
+        deadline = Deadline(config.deadline_seconds or DEFAULT_DEADLINE_SECONDS, token=token)
+        unique_results, source_reports = await run_cancellable(
+            request, token, scrape_service.scrape, phone_config, deadline, config.limit, config.sort
+        )
+        if token.cancelled:
+            # Nobody is left to read the response
+            raise HTTPException(status_code=499, detail="Client closed request")
 
         # === Chuẩn bị response ===
-        products_out = [
-            ProductOut(
-                image_link=r.image_link or "N/A",
-                name=r.name or "",
-                price=r.price or "Không có thông tin",
-                product_link=r.product_link or "N/A",
-                details=r.details or []
+        # Result.to_dict() already has the ProductOut shape, skip per-product model validation
+        products_out = [r.to_dict() for r in unique_results]
+
+        # The sites' own totals (filter badge / "Xem thêm" button), for a later "load more"
+        expected = [report["expected"] for report in source_reports.values()]
+        total_available = None if None in expected else sum(expected)
+        # More matching products than returned: the limit cut some of the post-filtered
+        # ones, or a source stopped paging before the end of its listing
+        has_more = False
+        if config.limit:
+            matched = sum(report.get("matched", 0) for report in source_reports.values())
+            unloaded = any(
+                report["collected"] < report["expected"] if report["expected"] is not None
+                else report["collected"] >= config.limit
+                for report in source_reports.values() if not report.get("circuit_open")
             )
-            for r in unique_results
-        ]
+            has_more = matched > len(products_out) or unloaded
 
         # Create response
-        response_data = ScrapeResponse(
-            total_products=len(products_out),
-            selected_brands=config.brand or [],
-            selected_price_range=config.price_range,
-            selected_ram=config.ram or [],
-            selected_storage=config.storage or [],
-            selected_resolutions=config.resolutions or [],
-            selected_refresh_rates=config.refresh_rates or [],
-            products=products_out
-        )
+        response_dict = {
+            "total_products": len(products_out),
+            "selected_brands": config.brand or [],
+            "selected_price_range": config.price_range,
+            "selected_ram": config.ram or [],
+            "selected_storage": config.storage or [],
+            "selected_resolutions": config.resolutions or [],
+            "selected_refresh_rates": config.refresh_rates or [],
+            "products": products_out,
+            "groups": [g.to_dict() for g in group_offers(unique_results)],
+            "sources": {name: SourceStatus(**report).dict() for name, report in source_reports.items()},
+            "limit": config.limit,
+            "sort": config.sort,
+            "total_available": total_available,
+            "has_more": has_more,
+        }
         
         # Save to Redis and send email if provided
         result_id = None
@@ -251,7 +283,7 @@ async def scrape_phones(config: PhoneConfigInput, background_tasks: BackgroundTa
             try:
                 # Save to Redis using new cache service
                 result_id = redis_cache.save_search_result(config.email, {
-                    "phones": [p.dict() for p in products_out],
+                    "phones": products_out,
                     "total": len(products_out),
                     "source": "TGDD & FPT",
                     "configuration": {
@@ -276,26 +308,182 @@ async def scrape_phones(config: PhoneConfigInput, background_tasks: BackgroundTa
                 logger.error(f"Failed to save result to Redis: {e}")
                 # Continue without Redis/email if it fails
 
-        # Return response
-        response_dict = response_data.dict()
+        # Return response (JSONResponse bypasses the response_model re-validation)
         if result_id:
             response_dict['result_id'] = result_id
-        return response_dict
+        return JSONResponse(content=response_dict)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error during scraping: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        # Ensure both drivers are closed
-        for drv, name in ((driver_tgdd, "TGDD"), (driver_fpt, "FPT")):
-            if drv:
-                try:
-                    drv.quit()
-                    logger.info(f"{name} WebDriver closed successfully.")
-                except Exception as e:
-                    logger.warning(f"Error closing {name} WebDriver: {e}")
 
 
+@app.post("/count")
+async def count_phones(config: PhoneConfigInput, request: Request):
+    """Number of products matching the filters on each site, without scraping them"""
+    phone_config = build_phone_config(config)
+    token = CancellationToken()
+    deadline = Deadline(config.deadline_seconds or COUNT_DEADLINE_SECONDS, token=token)
+    total, sources = await run_cancellable(request, token, count_service.count, phone_config, deadline)
+    if token.cancelled:
+        raise HTTPException(status_code=499, detail="Client closed request")
+    return {
+        "total": total,
+        "cached": all(s["cached"] for s in sources.values()),
+        "sources": sources,
+    }
+
+
+@app.post("/scrape/jobs")
+async def enqueue_scrape_job(config: PhoneConfigInput):
+    """Queue a scrape for the worker processes and return its job id"""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    try:
+        job_id = job_queue.enqueue(
+            build_phone_config(config).to_dict(),
+            deadline_seconds=config.deadline_seconds or DEFAULT_DEADLINE_SECONDS,
+        )
+        logger.info(f"Queued scrape job {job_id}")
+        return {"job_id": job_id, "status": "queued"}
+    except Exception as e:
+        logger.error(f"Failed to queue scrape job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/scrape/jobs/{job_id}")
+async def get_scrape_job(job_id: str):
+    """Return the status of a queued scrape job, with its products once done"""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@app.delete("/scrape/jobs/{job_id}")
+async def cancel_scrape_job(job_id: str):
+    """Cancel a queued job, or ask the worker running it to stop"""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    status = job_queue.cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    logger.info(f"Cancel requested for scrape job {job_id}: {status}")
+    return {"job_id": job_id, "status": status}
+
+
+@app.get("/scrape/jobs/{job_id}/export")
+async def export_scrape_job(job_id: str, format: str = "ndjson"):
+    """Download the products of a finished job as NDJSON, CSV or Parquet"""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Job queue unavailable")
+    job = job_queue.get(job_id, include_result=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.get("status") != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.get('status')}, no products to export")
+    # Decoded one product at a time from the stored JSON, not loaded whole
+    products = iter_json_array(functools.partial(job_queue.read_result, job_id), "products")
+    try:
+        return export_response(products, format, f"scrape-{job_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/prices/drops")
+async def get_price_drops(days: float = 7, limit: int = 20):
+    """Products with the biggest price drop over the last `days` days"""
+    if not price_history:
+        raise HTTPException(status_code=503, detail="Price history unavailable")
+    return {"days": days, "drops": await run_in_threadpool(price_history.biggest_drops, days, limit)}
+
+
+@app.get("/api/prices/{source}/{product_id:path}")
+async def get_price_history(source: str, product_id: str):
+    """Recorded price changes of one product (TGDD data-id or FPT slug)"""
+    if not price_history:
+        raise HTTPException(status_code=503, detail="Price history unavailable")
+    history = await run_in_threadpool(price_history.history, source, product_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="Product not found in price history")
+    return history
+
+
+@app.get("/api/catalog")
+async def search_catalog(source: Optional[str] = None, brand: Optional[str] = None,
+                         min_price: Optional[int] = None, max_price: Optional[int] = None,
+                         ram: Optional[float] = None, storage: Optional[float] = None, limit: int = 100):
+    """Products of the latest catalog snapshot matching the filters, cheapest first"""
+    snapshot = catalog_snapshots.current() if catalog_snapshots else None
+    if not snapshot:
+        raise HTTPException(status_code=503, detail="Catalog snapshot unavailable")
+    rows = snapshot.find(source=source, brand=brand, min_price=min_price, max_price=max_price,
+                         ram_gb=ram, storage_gb=storage)
+    return {
+        "version": snapshot.version,
+        "created_at": snapshot.created_at,
+        "total": len(rows),
+        "products": [snapshot.record(row) for row in rows[:limit]],
+    }
+
+
+@app.get("/api/catalog/export")
+async def export_catalog(format: str = "ndjson"):
+    """Download every product in the price history with its latest price"""
+    if not price_history:
+        raise HTTPException(status_code=503, detail="Price history unavailable")
+    try:
+        return export_response(price_history.iter_products(), format, "catalog", columns=CATALOG_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/catalog/{source}/{product_id:path}")
+async def get_catalog_product(source: str, product_id: str):
+    """One product of the latest catalog snapshot (TGDD data-id or FPT slug)"""
+    snapshot = catalog_snapshots.current() if catalog_snapshots else None
+    if not snapshot:
+        raise HTTPException(status_code=503, detail="Catalog snapshot unavailable")
+    row = snapshot.lookup(source, product_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Product not found in catalog snapshot")
+    return {"version": snapshot.version, **snapshot.record(row)}
+
+
+@app.get("/api/filters")
+async def get_site_filters(refresh: bool = False):
+    """Filter options of TGDD and FPT from the filter cache; refresh=true re-scrapes them first"""
+    if refresh and not await run_in_threadpool(filter_cache.refresh):
+        raise HTTPException(status_code=502, detail="Could not scrape filters from any source")
+    return {**filter_cache.get(), "timings": filter_manager.get_timings()}
+
+
+@app.get("/api/filters/timings")
+async def get_filter_timings():
+    """Seconds per site and per category of the last filter scrape"""
+    return filter_manager.get_timings()
+
+
+@app.get("/health/sources")
+async def get_source_health():
+    """Circuit breaker state, error / zero-result rates and latency of each retail source"""
+    return circuit_breaker.health(list(ScrapeService.SOURCES))
+
+
+@app.get("/health/selectors")
+async def get_selector_health():
+    """Hit rate of each fallback selector (this process) and recent collapse alerts"""
+    return {"rankings": selector_registry.rankings(), "alerts": selector_registry.alerts()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics of this process (per-host rate limiter)"""
+    return rate_limiter.prometheus_metrics()
 
 
 @app.get("/api/results/{result_id}")
@@ -316,11 +504,25 @@ async def get_result_api(result_id: str):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.get("/api/results/{result_id}/export")
+async def export_result(result_id: str, format: str = "ndjson"):
+    """Download a cached scrape result as NDJSON, CSV or Parquet"""
+    if not redis_cache or not hasattr(redis_cache, 'redis') or redis_cache.redis is None:
+        raise HTTPException(status_code=503, detail="Redis service unavailable")
+    if not redis_cache.has_search_result(result_id):
+        raise HTTPException(status_code=404, detail="Result not found or expired")
+    # Decoded one product at a time from byte ranges of the stored JSON
+    phones = iter_json_array(functools.partial(redis_cache.read_search_result, result_id), "phones")
+    try:
+        return export_response(phones, format, f"result-{result_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/{result_id}", response_class=HTMLResponse)
 async def get_index_with_id(request: Request, result_id: str):
     """Serve the main index UI even when path contains a result_id."""
     logger.info("Rendering index page with result_id path")
-    filter_list = FilterList()
 
     # Try to load result data if result_id is valid
     result_data = None
@@ -334,12 +536,7 @@ async def get_index_with_id(request: Request, result_id: str):
         "index.html",
         {
             "request": request,
-            "brands": filter_list.get_brands(),
-            "price_ranges": filter_list.get_price_ranges(),
-            "ram_options": filter_list.get_ram_options(),
-            "storage_options": filter_list.get_storage_options(),
-            "resolution_options": filter_list.get_resolution_options(),
-            "refresh_rate_options": filter_list.get_refresh_rate_options(),
+            **filter_cache.index_options(filter_list),
             "result_data": result_data,  # Pass result data to template if available
         }
     )
@@ -0,0 +1,34 @@
+"""
+Cooperative cancellation of a running scrape (client gone, job cancelled)
+"""
+import threading
+from typing import Optional
+
+
+class ScrapeCancelled(Exception):
+    """Raised by a scraper at a checkpoint once its scrape has been cancelled"""
+
+
+class CancellationToken:
+    """Thread-safe flag set by the API or worker and polled by the scrapers"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds, waking up early on cancellation"""
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ScrapeCancelled(f"scrape cancelled: {self.reason}")
@@ -0,0 +1,103 @@
+"""
+Count-only fast path: how many products each source lists for a configuration.
+
+Applies the filters on a pooled driver and reads the site's own total, without
+loading or extracting any product. Counts are cached per source and canonical
+configuration, so ticking back to an earlier selection is answered from cache.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from cache.circuit_breaker import CircuitBreaker
+from cache.count_cache import CountCache
+from cache.scrape_stats import ScrapeStats
+from selenium_.deadline import Deadline
+from selenium_.driver_pool import DriverPool
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.scrape_service import ScrapeService
+
+logger = logging.getLogger(__name__)
+
+
+class CountService:
+    """Runs the scrapers' count() on drivers taken from the shared pool"""
+
+    def __init__(self, pool: DriverPool, cache: CountCache, stats: Optional[ScrapeStats] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.pool = pool
+        self.cache = cache
+        self.stats = stats
+        self.breaker = breaker
+
+    def _count_source(self, source: str, phone_config: PhoneConfiguration,
+                      deadline: Deadline) -> Dict[str, Any]:
+        report = {"count": None, "cached": False, "age_seconds": 0.0, "error": "", "latency": 0.0}
+        started = time.monotonic()
+        try:
+            deadline.raise_if_cancelled()
+            with self.pool.driver(timeout=deadline.clamp(30), cancelled=deadline.cancelled) as driver:
+                # A page that fails to count does not make the driver unusable, keep it pooled
+                try:
+                    count = ScrapeService.SOURCES[source](driver).count(phone_config, deadline)
+                except Exception as e:
+                    count, report["error"] = None, str(e)
+            if count is None:
+                report["error"] = report["error"] or "total not shown"
+            else:
+                report["count"] = count
+                self.cache.set(source, phone_config.cache_key(), count)
+                # Same number a full scrape would record, for the splitter and planner
+                if self.stats:
+                    self.stats.record_count(source, phone_config.cache_key(), count)
+        except Exception as e:
+            report["error"] = str(e)
+        report["latency"] = round(time.monotonic() - started, 3)
+        if self.breaker:
+            self._record_health(source, report, deadline)
+        return report
+
+    def _record_health(self, source: str, report: Dict[str, Any], deadline: Deadline):
+        """Feed the circuit breaker like a scrape; a cancelled count frees a half-open trial"""
+        if deadline.cancelled():
+            self.breaker.release(source)
+            return
+        # An uncounted page is a failure unless the deadline cut it short
+        success = report["count"] is not None or deadline.expired()
+        self.breaker.record(source, success, report["latency"], report["count"] == 0)
+
+    def count(self, phone_config: PhoneConfiguration,
+              deadline: Optional[Deadline] = None) -> Tuple[Optional[int], Dict[str, Dict[str, Any]]]:
+        """
+        Total number of matching products over all sources (None when a source could
+        not be counted) and a report per source: count, whether it came from the
+        cache and how old it is, error and latency
+        """
+        deadline = deadline or Deadline()
+        key = phone_config.cache_key()
+        reports: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for source in ScrapeService.SOURCES:
+            entry = self.cache.get(source, key)
+            if entry:
+                reports[source] = {"count": entry["count"], "cached": True,
+                                   "age_seconds": round(time.time() - entry["at"], 1), "error": "", "latency": 0.0}
+            elif self.breaker and not self.breaker.allow(source):
+                # Same gate as a scrape: a source whose circuit is open is not loaded
+                reports[source] = {"count": None, "cached": False, "age_seconds": 0.0,
+                                   "error": "circuit open", "latency": 0.0}
+            else:
+                missing.append(source)
+
+        if missing:
+            logger.info(f"Counting {', '.join(missing)} for {phone_config} ({deadline})")
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                futures = {source: executor.submit(self._count_source, source, phone_config, deadline)
+                           for source in missing}
+                for source, future in futures.items():
+                    reports[source] = future.result()
+
+        counts = [reports[source]["count"] for source in ScrapeService.SOURCES]
+        total = None if None in counts else sum(counts)
+        return total, {source: reports[source] for source in ScrapeService.SOURCES}
@@ -0,0 +1,53 @@
+"""
+Time budget of a scrape request, passed down to the page objects
+"""
+import math
+import time
+from typing import Callable, Optional
+
+from selenium_.cancellation import CancellationToken
+
+
+class Deadline:
+    """
+    Absolute point in time after which a scrape should stop and return what it has.
+    A cancelled token ends the budget immediately, so every deadline check in the
+    scrapers doubles as a cancellation point.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 token: Optional[CancellationToken] = None):
+        self.clock = clock
+        self.seconds = seconds
+        self.token = token or CancellationToken()
+        self._end = clock() + seconds if seconds is not None else math.inf
+
+    def remaining(self) -> float:
+        """Seconds left (inf when there is no budget, 0 once cancelled)"""
+        if self.token.cancelled:
+            return 0.0
+        return max(0.0, self._end - self.clock())
+
+    def expired(self) -> bool:
+        return self.token.cancelled or self.clock() >= self._end
+
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def raise_if_cancelled(self):
+        self.token.raise_if_cancelled()
+
+    def clamp(self, timeout: float) -> float:
+        """Shorten a wait/sleep so it never runs past the deadline"""
+        return min(timeout, self.remaining())
+
+    def sleep(self, seconds: float):
+        # Wakes up as soon as the scrape is cancelled
+        self.token.wait(self.clamp(seconds))
+
+    def __str__(self) -> str:
+        if self.token.cancelled:
+            return f"Deadline(cancelled: {self.token.reason})"
+        if self.seconds is None:
+            return "Deadline(none)"
+        return f"Deadline({self.remaining():.1f}s left of {self.seconds}s)"
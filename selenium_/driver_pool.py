@@ -0,0 +1,164 @@
+"""
+Pool of reusable headless Chrome drivers shared by the API and the scrape workers
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver import Chrome, ChromeOptions
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+def build_chrome_options() -> ChromeOptions:
+    """Chrome options used for every scraping session (TGDD and FPT)"""
+    opts = ChromeOptions()
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--start-maximized")
+    opts.add_argument("--disable-blink-features=AutomationControlled")
+    opts.add_experimental_option("excludeSwitches", ["enable-automation"])
+    opts.add_experimental_option('useAutomationExtension', False)
+    # Block site permission prompts (notifications, geolocation, media) and run headless
+    opts.add_argument("--disable-notifications")
+    opts.add_argument("--no-first-run")
+    opts.add_argument("--disable-popup-blocking")
+    opts.add_argument("--use-fake-ui-for-media-stream")
+    opts.add_argument("--window-size=1280,720")
+    # Headless mode for both TGDD and FPT
+    opts.add_argument("--headless=new")
+    # Chrome content settings to block prompts
+    opts.add_experimental_option(
+        "prefs",
+        {
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.geolocation": 2,
+            "profile.default_content_setting_values.media_stream_mic": 2,
+            "profile.default_content_setting_values.media_stream_camera": 2,
+        },
+    )
+    return opts
+
+
+class DriverPool:
+    """
+    Bounded pool of Chrome drivers.
+    Drivers are created lazily up to `size` and reused between scrapes;
+    a driver that breaks during a scrape (a WebDriver or session error) is
+    discarded and replaced on demand. Cancelled scrapes keep their driver.
+    """
+
+    WAIT_SLICE = 0.25  # Longest wait for an idle driver between two cancellation checks
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or int(os.getenv('DRIVER_POOL_SIZE', 2))
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._driver_path = None
+
+    def _create_driver(self) -> WebDriver:
+        if not self._driver_path:
+            from webdriver_manager.chrome import ChromeDriverManager
+            self._driver_path = ChromeDriverManager().install()
+        return Chrome(service=Service(self._driver_path), options=build_chrome_options())
+
+    def acquire(self, timeout: Optional[float] = None,
+                cancelled: Optional[Callable[[], bool]] = None) -> WebDriver:
+        """
+        Take an idle driver, creating one if the pool is not full yet. Raises
+        TimeoutError after `timeout` seconds, or as soon as `cancelled` turns true.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            # A discarded driver frees a slot, so waiters re-check on every slice
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    driver = self._create_driver()
+                    logger.info(f"Created pooled WebDriver ({self._created}/{self.size})")
+                    return driver
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            if cancelled and cancelled():
+                raise TimeoutError("Cancelled while waiting for a WebDriver")
+            left = None if end is None else end - time.monotonic()
+            if left is not None and left <= 0:
+                raise TimeoutError(f"No WebDriver available after {timeout}s")
+            try:
+                return self._idle.get(timeout=self.WAIT_SLICE if left is None else min(self.WAIT_SLICE, left))
+            except queue.Empty:
+                pass
+
+    def release(self, driver: WebDriver, discard: bool = False):
+        """Return a driver to the pool, or quit it if it is no longer usable"""
+        if driver is None:
+            return
+        if not discard:
+            try:
+                # Reset the session so the next scrape starts from a clean page
+                driver.get("about:blank")
+                driver.delete_all_cookies()
+            except Exception as e:
+                logger.warning(f"Pooled WebDriver unusable, discarding: {e}")
+                discard = True
+        if discard:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Error closing pooled WebDriver: {e}")
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None, cancelled: Optional[Callable[[], bool]] = None):
+        """Context manager yielding a pooled driver"""
+        drv = self.acquire(timeout, cancelled)
+        broken = False
+        try:
+            yield drv
+        except WebDriverException as e:
+            # A shortened wait timing out leaves a healthy session; release() still
+            # checks the session before the driver goes back to the pool
+            broken = not isinstance(e, TimeoutException)
+            raise
+        finally:
+            self.release(drv, discard=broken)
+
+    def close(self):
+        """Quit every idle driver"""
+        while True:
+            try:
+                drv = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                drv.quit()
+            except Exception as e:
+                logger.warning(f"Error closing pooled WebDriver: {e}")
+            with self._lock:
+                self._created -= 1
+
+
+# Global instance
+driver_pool = DriverPool()
@@ -86,32 +86,72 @@
 
 
 #newFile
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+def _parse_memory(value: str) -> float:
+    value = value.strip()
+    if value.endswith("TB"):
+        return float(value.replace(" TB", "")) * 1024
+    return float(value.replace(" GB", ""))
+
+
+def _memory_key(value: str) -> str:
+    """"6GB", "6 gb" và "6 GB" cho cùng một khóa"""
+    return value.replace(" ", "").upper()
+
 
 class FilterList:
+    """
+    Danh mục bộ lọc, biên dịch một lần khi khởi tạo rồi đóng băng: chỉ đọc nên dùng
+    chung được giữa các request và các thread scrape (xem instance `filter_list`).
+    """
+
     def __init__(self):
         # Chuẩn chung: dùng TGDD làm chuẩn
-        self.brands = [
+        self.brands = (
             "Samsung", "iPhone (Apple)", "OPPO", "Xiaomi", "vivo", "realme",
             "HONOR", "TCL", "Tecno", "Nokia", "Masstel", "Mobell", "Viettel", "Benco"
-        ]
-        self.price_ranges = [
+        )
+        self.price_ranges = tuple(MappingProxyType(p) for p in (
             {"name": "Dưới 2 triệu", "data-from": "-1", "data-to": "1999999", "data-href": "duoi-2-trieu"},
             {"name": "Từ 2 - 4 triệu", "data-from": "2000000", "data-to": "4000000", "data-href": "tu-2-4-trieu"},
             {"name": "Từ 4 - 7 triệu", "data-from": "4000000", "data-to": "7000000", "data-href": "tu-4-7-trieu"},
             {"name": "Từ 7 - 13 triệu", "data-from": "7000000", "data-to": "13000000", "data-href": "tu-7-13-trieu"},
             {"name": "Từ 13 - 20 triệu", "data-from": "13000000", "data-to": "20000000", "data-href": "tu-13-20-trieu"},
             {"name": "Trên 20 triệu", "data-from": "20000001", "data-to": "-1", "data-href": "tren-20-trieu"}
-        ]
-        self.ram_options = ["3 GB", "4 GB", "6 GB", "8 GB", "12 GB", "16 GB"]
-        self.storage_options = ["64 GB", "128 GB", "256 GB", "512 GB", "1 TB"]
-        self.resolution_options = [
+        ))
+        self.ram_options = ("3 GB", "4 GB", "6 GB", "8 GB", "12 GB", "16 GB")
+        self.storage_options = ("64 GB", "128 GB", "256 GB", "512 GB", "1 TB")
+        self.resolution_options = (
             "QXGA+", "QQVGA", "QVGA", "HD+", "Full HD+", "1.5K", "1.5K+", "2K+", "Retina (iPhone)"
-        ]
-        self.refresh_rate_options = ["60 Hz", "90 Hz", "120 Hz", "144 Hz"]
+        )
+        self.refresh_rate_options = ("60 Hz", "90 Hz", "120 Hz", "144 Hz")
+
+        # --- Bảng tra cứu biên dịch sẵn ---
+        self._price_by_href = MappingProxyType({p["data-href"]: p for p in self.price_ranges})
+        self._brand_by_key = MappingProxyType({b.lower(): b for b in self.brands})
+        self._memory_by_key = MappingProxyType(
+            {_memory_key(o): o for o in (*self.ram_options, *self.storage_options)}
+        )
+        self._memory_gb = MappingProxyType({o: _parse_memory(o) for o in (*self.ram_options, *self.storage_options)})
+        # Mảng (giá trị GB, nhãn) đã sắp xếp cho tra cứu >= / <= bằng bisect
+        self._memory_tables = MappingProxyType({
+            options: self._compile_memory_table(options) for options in (self.ram_options, self.storage_options)
+        })
+        self._resolution_set = frozenset(self.resolution_options)
+        self._refresh_rate_set = frozenset(self.refresh_rate_options)
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"FilterList is read-only (cannot set {name})")
+        super().__setattr__(name, value)
 
     # --- Mapping từ chuẩn chung sang FPT ---
-    BRAND_TGDD_TO_FPT = {
+    BRAND_TGDD_TO_FPT: Mapping[str, str] = MappingProxyType({
         "iPhone (Apple)": "Apple",
         "realme": "Realme",
         "vivo": "Vivo",
@@ -126,23 +166,23 @@ class FilterList:
         "Mobell": "Mobell",
         "Viettel": "Viettel",
         "Benco": "Benco"
-    }
-    REFRESH_RATE_TGDD_TO_FPT = {
+    })
+    REFRESH_RATE_TGDD_TO_FPT: Mapping[str, str] = MappingProxyType({
         "60 Hz": "60 Hz",
         "90 Hz": "90 Hz",
         "120 Hz": "120 Hz",
         "144 Hz": "Trên 144 Hz"  # Map sang giá trị duy nhất FPT có
-    }
+    })
 
-    STORAGE_TGDD_TO_FPT = {
+    STORAGE_TGDD_TO_FPT: Mapping[str, str] = MappingProxyType({
         "64 GB": "≤128 GB",
         "128 GB": "≤128 GB",
         "256 GB": "256 GB",
         "512 GB": "512 GB",
         "1 TB": "1 TB"
-    }
+    })
 
-    RESOLUTION_TGDD_TO_FPT = {
+    RESOLUTION_TGDD_TO_FPT: Mapping[str, str] = MappingProxyType({
         "Full HD+": "FHD/FHD+",
         "HD+": "HD/HD+",
         "2K+": "2K/2K+",
@@ -152,62 +192,87 @@ class FilterList:
         "1.5K": "1.5K",
         "1.5K+": "1.5K",
         "Retina (iPhone)": "Retina (iPhone)"
-    }
+    })
 
     # --- Getter ---
-    def get_brands(self) -> List[str]:
+    def get_brands(self) -> Tuple[str, ...]:
         return self.brands
 
-    def get_price_ranges(self) -> List[Dict[str, str]]:
+    def get_price_ranges(self) -> Tuple[Mapping[str, str], ...]:
         return self.price_ranges
 
-    def get_ram_options(self) -> List[str]:
+    def get_ram_options(self) -> Tuple[str, ...]:
         return self.ram_options
 
-    def get_storage_options(self) -> List[str]:
+    def get_storage_options(self) -> Tuple[str, ...]:
         return self.storage_options
 
-    def get_resolution_options(self) -> List[str]:
+    def get_resolution_options(self) -> Tuple[str, ...]:
         return self.resolution_options
 
-    def get_refresh_rate_options(self) -> List[str]:
+    def get_refresh_rate_options(self) -> Tuple[str, ...]:
         return self.refresh_rate_options
 
+    def get_price_range(self, href: Optional[str]) -> Optional[Mapping[str, str]]:
+        """Khoảng giá theo data-href, None nếu không có"""
+        return self._price_by_href.get(href) if href else None
+
+    # --- Chuẩn hóa giá trị người dùng gửi lên ---
+    def canonical_brand(self, brand: str) -> str:
+        return self._brand_by_key.get(brand.strip().lower(), brand)
+
+    def canonical_memory(self, value: str) -> str:
+        """"6GB" -> "6 GB"; giá trị lạ giữ nguyên"""
+        return self._memory_by_key.get(_memory_key(value), value)
+
     def _parse_memory_value(self, value: str) -> float:
-        value = value.strip()
-        if value.endswith("TB"):
-            return float(value.replace(" TB", "")) * 1024
-        return float(value.replace(" GB", ""))
+        gb = self._memory_gb.get(value)
+        return gb if gb is not None else _parse_memory(value)
+
+    @staticmethod
+    def _compile_memory_table(options) -> Tuple[Tuple[float, ...], Tuple[str, ...]]:
+        pairs = sorted((_parse_memory(o), o) for o in options)
+        return tuple(v for v, _ in pairs), tuple(o for _, o in pairs)
 
     def get_filtered_memory(self, value: str, operator: str, options: List[str]) -> List[str]:
-        if not value or value not in options:
+        table = self._memory_tables.get(tuple(options))
+        if table is None:
+            table = self._compile_memory_table(options)
+        values, labels = table
+        value = self.canonical_memory(value) if value else value
+        if not value or value not in labels:
             return []
         if operator not in [">=", "<=", "="]:
-            return [value] if value in options else []
+            return [value]
         target = self._parse_memory_value(value)
-        filtered = []
-        for opt in options:
-            opt_value = self._parse_memory_value(opt)
-            if operator == ">=" and opt_value >= target:
-                filtered.append(opt)
-            elif operator == "<=" and opt_value <= target:
-                filtered.append(opt)
-            elif operator == "=" and opt_value == target:
-                filtered.append(opt)
-        return filtered
+        if operator == ">=":
+            return list(labels[bisect_left(values, target):])
+        if operator == "<=":
+            return list(labels[:bisect_right(values, target)])
+        return list(labels[bisect_left(values, target):bisect_right(values, target)])
 
     def get_filtered_resolutions(self, resolutions: List[str]) -> List[str]:
-        return [r for r in resolutions if r in self.resolution_options]
+        return [r for r in resolutions if r in self._resolution_set]
 
     def get_filtered_refresh_rates(self, refresh_rates: List[str]) -> List[str]:
         """Chỉ giữ các refresh rate hợp lệ theo chuẩn chung."""
-        return [r for r in refresh_rates if r in self.refresh_rate_options]
+        return [r for r in refresh_rates if r in self._refresh_rate_set]
 
     # --- Thêm phương thức map sang FPT ---
+    def map_brands_to_fpt(self, brands: List[str]) -> List[str]:
+        return [self.BRAND_TGDD_TO_FPT.get(b, b) for b in brands]
+
+    def map_storages_to_fpt(self, storages: List[str]) -> List[str]:
+        """Nhiều mức TGDD gộp chung một nút FPT ("≤128 GB"), mỗi nút chỉ bấm một lần"""
+        return list(dict.fromkeys(self.STORAGE_TGDD_TO_FPT.get(s, s) for s in storages))
+
+    def map_resolutions_to_fpt(self, resolutions: List[str]) -> List[str]:
+        return list(dict.fromkeys(self.RESOLUTION_TGDD_TO_FPT.get(r, r) for r in resolutions))
+
     def map_refresh_rates_to_fpt(self, refresh_rates: List[str]) -> List[str]:
         """Chuyển đổi refresh rate từ chuẩn chung sang định dạng FPT."""
-        mapped = []
-        for r in refresh_rates:
-            if r in self.REFRESH_RATE_TGDD_TO_FPT:
-                mapped.append(self.REFRESH_RATE_TGDD_TO_FPT[r])
-        return mapped
\ No newline at end of file
+        return [self.REFRESH_RATE_TGDD_TO_FPT[r] for r in refresh_rates if r in self.REFRESH_RATE_TGDD_TO_FPT]
+
+
+# Global instance: built once at import, read-only and shared by every thread
+filter_list = FilterList()
@@ -1,4 +1,7 @@
-from typing import List, Optional, Tuple
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from selenium_.model.filter_list import filter_list
 
 class PhoneConfiguration:
     def __init__(
@@ -35,6 +38,62 @@ class PhoneConfiguration:
     def get_refresh_rates(self) -> List[str]:
         return self._refresh_rates
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form, used to hand a configuration to scrape workers"""
+        return {
+            "brand": list(self._brand),
+            "price_range": self._price_range,
+            "ram": list(self._ram) if self._ram else None,
+            "storage": list(self._storage) if self._storage else None,
+            "resolutions": list(self._resolutions),
+            "refresh_rates": list(self._refresh_rates),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PhoneConfiguration":
+        return cls(
+            brand=data.get("brand") or [],
+            price_range=data.get("price_range"),
+            ram=tuple(data["ram"]) if data.get("ram") else None,
+            storage=tuple(data["storage"]) if data.get("storage") else None,
+            resolutions=data.get("resolutions") or [],
+            refresh_rates=data.get("refresh_rates") or [],
+        )
+
+    def replace(self, **changes) -> "PhoneConfiguration":
+        """Copy of this configuration with some fields changed (e.g. a single brand)"""
+        data = self.to_dict()
+        data.update(changes)
+        return PhoneConfiguration.from_dict(data)
+
+    def normalized(self) -> "PhoneConfiguration":
+        """
+        Same selection spelled the canonical way: brand and memory labels as in
+        FilterList ("samsung" -> "Samsung", "8GB" -> "8 GB"), unknown operators
+        as "=", invalid resolutions / refresh rates dropped, duplicates removed.
+        """
+        def memory(constraint: Optional[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+            if not constraint:
+                return None
+            value, operator = constraint
+            return filter_list.canonical_memory(value), (operator if operator in (">=", "<=", "=") else "=")
+
+        return PhoneConfiguration(
+            brand=list(dict.fromkeys(filter_list.canonical_brand(b) for b in self._brand)),
+            price_range=self._price_range if filter_list.get_price_range(self._price_range) else None,
+            ram=memory(self._ram),
+            storage=memory(self._storage),
+            resolutions=list(dict.fromkeys(filter_list.get_filtered_resolutions(self._resolutions))),
+            refresh_rates=list(dict.fromkeys(filter_list.get_filtered_refresh_rates(self._refresh_rates))),
+        )
+
+    def cache_key(self) -> str:
+        """Canonical key: equal for configurations selecting the same products"""
+        data = self.to_dict()
+        for field in ("brand", "resolutions", "refresh_rates"):
+            data[field] = sorted(data[field])
+        return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
     def __str__(self) -> str:
         return (f"PhoneConfiguration(brand={self._brand}, "
                 f"price_range={self._price_range}, "
@@ -1,13 +1,71 @@
-from typing import List
+import re
+from typing import Any, Dict, List, Optional
+
+from selenium_.model.spec_parser import spec_parser
+
+# "12.990.000₫", "12,990,000 đ", "12990000"
+_PRICE_RE = re.compile(r"\d{1,3}(?:[.,]\d{3})+|\d{4,}")
+
+
+def parse_price_vnd(price: Optional[str]) -> Optional[int]:
+    """Price text as shown by the sites -> integer VND (None when there is no price)"""
+    if not price:
+        return None
+    match = _PRICE_RE.search(price)
+    return int(re.sub(r"\D", "", match.group())) if match else None
+
 
 class Result:
-    def __init__(self, img_url: str, name: str, price: str, product_link: str, details: List[str]):
+    """
+    One scraped product. Numeric fields are parsed once at extraction so sorting,
+    dedup and filtering never go back to the display strings.
+    """
+    __slots__ = (
+        "image_link", "name", "price", "product_link", "details", "source", "source_id",
+        "price_vnd", "ram_gb", "storage_gb", "resolution", "refresh_rate_hz", "screen_inches", "chip",
+    )
+
+    def __init__(self, img_url: str, name: str, price: str, product_link: str, details: List[str],
+                 source: str = "", source_id: str = ""):
         self.image_link = img_url
         self.name = name
         self.price = price
         self.product_link = product_link
         self.details = details
+        self.source = source
+        self.source_id = source_id
+        self.price_vnd = parse_price_vnd(price)
+        # The name often carries the memory ("... 8GB/256GB") when the card details do not
+        (self.ram_gb, self.storage_gb, self.resolution, self.refresh_rate_hz,
+         self.screen_inches, self.chip) = spec_parser.parse([*(details or []), name or ""])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Product as returned by the API (same fields and defaults as ProductOut)"""
+        return {
+            "image_link": self.image_link or "N/A",
+            "name": self.name or "",
+            "price": self.price or "Không có thông tin",
+            "product_link": self.product_link or "N/A",
+            "details": self.details or [],
+            "price_vnd": self.price_vnd,
+            "source": self.source,
+            "source_id": self.source_id,
+            "ram_gb": self.ram_gb,
+            "storage_gb": self.storage_gb,
+            "resolution": self.resolution,
+            "refresh_rate_hz": self.refresh_rate_hz,
+            "screen_inches": self.screen_inches,
+            "chip": self.chip,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Result":
+        # Parsed fields are rebuilt from the display strings
+        return cls(data.get("image_link"), data.get("name", ""), data.get("price"),
+                   data.get("product_link"), data.get("details", []),
+                   source=data.get("source", ""), source_id=data.get("source_id", ""))
 
     def __str__(self):
-        return (f"Result(image_link={self.image_link}, name={self.name}, price={self.price}, "
-                f"product_link={self.product_link}, details={self.details})")
\ No newline at end of file
+        return (f"Result(source={self.source}, source_id={self.source_id}, image_link={self.image_link}, "
+                f"name={self.name}, price={self.price}, price_vnd={self.price_vnd}, "
+                f"product_link={self.product_link}, details={self.details})")
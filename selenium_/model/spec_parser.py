@@ -0,0 +1,153 @@
+"""
+Normalizes the free-form detail strings of TGDD / FPT product cards
+("8 GB", "256 GB", "Full HD+", "120 Hz", '6.7"', "Snapdragon 8 Gen 3") into typed fields.
+
+All patterns are compiled once at import; parsing runs for every scraped product.
+"""
+import re
+from typing import Iterable, List, NamedTuple, Optional
+
+from selenium_.model.filter_list import FilterList, filter_list as default_filter_list
+
+
+class Specs(NamedTuple):
+    ram_gb: Optional[float] = None
+    storage_gb: Optional[float] = None
+    resolution: Optional[str] = None  # Canonical FilterList resolution option
+    refresh_rate_hz: Optional[int] = None
+    screen_inches: Optional[float] = None
+    chip: Optional[str] = None
+
+
+# Spellings seen on the sites that are not FilterList options themselves
+RESOLUTION_ALIASES = {
+    "FHD+": "Full HD+",
+    "FHD": "Full HD+",
+    "Full HD": "Full HD+",
+    "HD": "HD+",
+    "2K": "2K+",
+    # TGDD lists 1440p panels as "Quad HD+ (2K+)", without this "HD+" would match first
+    "Quad HD+": "2K+",
+    "Quad HD": "2K+",
+    "QHD+": "2K+",
+    "QHD": "2K+",
+    "QXGA": "QXGA+",
+    "Retina": "Retina (iPhone)",
+    "Super Retina": "Retina (iPhone)",
+    "Super Retina XDR": "Retina (iPhone)",
+}
+
+CHIP_PATTERN = (
+    r"Snapdragon\s+\d+\w*(?:\s+Gen\s+\d+)?(?:\s+Elite)?"
+    # A bare "A55" is a Galaxy model, Apple chips need the prefix or suffix
+    r"|Apple\s+A\d{2}(?:\s+(?:Bionic|Pro))?|A\d{2}\s+Bionic"
+    r"|(?:MediaTek\s+)?(?:Dimensity\s+\d+\w*(?:\s+Ultra)?|Helio\s+[A-Z]\d+)"
+    r"|Exynos\s+\d+"
+    r"|Unisoc\s+[A-Z]?\d+"
+    r"|Tensor\s+G\d"
+    r"|Kirin\s+\d+"
+)
+
+# Largest RAM size, for a lone size with no label or other size to compare with
+MAX_RAM_GB = 24
+
+
+class SpecParser:
+    def __init__(self, filter_list: Optional[FilterList] = None):
+        filter_list = filter_list or default_filter_list
+        resolutions = {r.lower(): r for r in filter_list.get_resolution_options()}
+        # FPT labels ("FHD/FHD+", "QQVGA/QVGA") map back to our options
+        for ours, fpt in FilterList.RESOLUTION_TGDD_TO_FPT.items():
+            for label in fpt.split("/"):
+                resolutions.setdefault(label.lower(), ours)
+        for alias, ours in RESOLUTION_ALIASES.items():
+            resolutions.setdefault(alias.lower(), ours)
+        self._resolutions = resolutions
+
+        self._ram_values = {self._memory_gb(v) for v in filter_list.get_ram_options()}
+        # Longest label first so "Full HD+" wins over "HD+" and "1.5K+" over "1.5K"
+        labels = sorted(resolutions, key=len, reverse=True)
+        self._resolution_re = re.compile(
+            r"(?<![\w.])(" + "|".join(re.escape(label) for label in labels) + r")(?![\w+])",
+            re.IGNORECASE,
+        )
+        self._memory_re = re.compile(r"(\d+(?:[.,]\d+)?)\s*(GB|TB)\b", re.IGNORECASE)
+        self._ram_hint_re = re.compile(r"\bRAM\b", re.IGNORECASE)
+        self._storage_hint_re = re.compile(r"\bROM\b|bộ nhớ|lưu trữ", re.IGNORECASE)
+        self._refresh_re = re.compile(r"(\d{2,3})\s*Hz\b", re.IGNORECASE)
+        self._inches_re = re.compile(r"(\d{1,2}[.,]\d{1,2}|\d{1,2})\s*(?:\"|”|''|inch(?:es)?\b)", re.IGNORECASE)
+        self._chip_re = re.compile(CHIP_PATTERN, re.IGNORECASE)
+
+    @staticmethod
+    def _memory_gb(text: str) -> float:
+        value, _, unit = text.strip().partition(" ")
+        return float(value) * (1024 if unit.upper() == "TB" else 1)
+
+    def _classify_memory(self, text: str, ram: Optional[float], storage: Optional[float],
+                         loose: List[float]):
+        """
+        Sizes labelled by the text itself ("RAM", "ROM", "bộ nhớ", a "8GB/128GB" pair);
+        a bare size goes to `loose` and is decided once the whole card has been read
+        """
+        matches = self._memory_re.findall(text)
+        if not matches:
+            return ram, storage
+        sizes = [float(v.replace(",", ".")) * (1024 if u.upper() == "TB" else 1) for v, u in matches]
+        if len(sizes) > 1:
+            # "12GB/256GB", "RAM 8 GB - ROM 128 GB": the smaller one is the RAM
+            ram = ram if ram is not None else min(sizes)
+            storage = storage if storage is not None else max(sizes)
+        elif self._ram_hint_re.search(text):
+            ram = ram if ram is not None else sizes[0]
+        elif self._storage_hint_re.search(text):
+            storage = storage if storage is not None else sizes[0]
+        else:
+            loose.append(sizes[0])
+        return ram, storage
+
+    def _resolve_loose(self, loose: List[float], ram: Optional[float], storage: Optional[float]):
+        """Bare sizes: by the other sizes of the card first, by size only as a last resort"""
+        if not loose or (ram is not None and storage is not None):
+            return ram, storage
+        if ram is None and storage is None:
+            if len(loose) > 1:
+                # Cards list "4 GB", "64 GB": RAM is the smaller one, whatever its size
+                return min(loose), max(loose)
+            size = loose[0]
+            # RAM tops out well below the storage of all but the cheapest phones
+            return (size, None) if size <= MAX_RAM_GB or size in self._ram_values else (None, size)
+        if ram is None:
+            return next((size for size in loose if size < storage), None), storage
+        return ram, next((size for size in loose if size > ram), None)
+
+    def parse(self, texts: Iterable[str]) -> Specs:
+        """Typed specs from detail strings (and the product name); first match per field wins"""
+        ram = storage = resolution = refresh = inches = chip = None
+        loose: List[float] = []
+        for text in texts:
+            if not text:
+                continue
+            if "B" in text or "b" in text:
+                ram, storage = self._classify_memory(text, ram, storage, loose)
+            if resolution is None:
+                match = self._resolution_re.search(text)
+                if match:
+                    resolution = self._resolutions[match.group(1).lower()]
+            if refresh is None and ("Hz" in text or "hz" in text):
+                match = self._refresh_re.search(text)
+                if match:
+                    refresh = int(match.group(1))
+            if inches is None:
+                match = self._inches_re.search(text)
+                if match:
+                    inches = float(match.group(1).replace(",", "."))
+            if chip is None:
+                match = self._chip_re.search(text)
+                if match:
+                    chip = " ".join(match.group().split())
+        ram, storage = self._resolve_loose(loose, ram, storage)
+        return Specs(ram, storage, resolution, refresh, inches, chip)
+
+
+# Global instance
+spec_parser = SpecParser()
@@ -1,63 +1,183 @@
+import re
 from typing import List, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import TimeoutException
-import time
-from selenium_.model.filter_list import FilterList
+from cache.rate_limiter import rate_limiter
+from cache.selector_registry import selector_registry
+from selenium_.cancellation import ScrapeCancelled
+from selenium_.deadline import Deadline
+from selenium_.model.filter_list import filter_list
 from selenium_.model.phone_configuration import PhoneConfiguration
 from selenium_.model.result import Result
+from selenium_.page.site_sort import apply_site_sort
 
 
 class FPTShop:
+    # Fallback chains, most specific first; selector_registry moves selectors that stopped matching last
+    NAME_SELECTORS = (".ProductCard_cardTitle__HlwIo", "h3", ".card-title", "a[title]")
+    PRICE_SELECTORS = (".Price_currentPrice__PBYcv", ".price")
+    IMAGE_SELECTORS = ("a.flex-1 img", "img")
+    DETAILS_SELECTORS = (".ProductCard_keySellingPoint__426Jm", ".specification span")
+    PRODUCT_GRID = ".grid.grid-cols-2.gap-2"
+    PRODUCT_ITEMS = ".grid.grid-cols-2.gap-2 .flex-1"
+    SORT_LABELS = {
+        "price_asc": ("Giá thấp - cao", "Giá tăng dần", "Giá thấp đến cao"),
+        "price_desc": ("Giá cao - thấp", "Giá giảm dần", "Giá cao đến thấp"),
+    }
+
     def __init__(self, driver: WebDriver):
         self.driver = driver
-        self.wait = WebDriverWait(self.driver, 15)
+        self.wait_timeout = 15
+        self.deadline = Deadline()
+        self.partial = False
+        # FPT does not expose a filtered total before paging, so filters are not measured either;
+        # COUNT_SCRIPT reads it once the listing is shown
+        self.total_product = None
+        # Top-N mode: stop paging and extracting after `limit` items, in `sort` order
+        self.limit = None
+        self.sort = None
+        self.sorted_on_site = False
+        self.base_total = None
+        self.filter_timings = {}
+        self.measure_filters = False
         self.base_url = "https://fptshop.com.vn"
         self.url = self.base_url + "/dien-thoai"
         self.results = []
-        self.filter_list = FilterList()
+        self.filter_list = filter_list
+
+    @property
+    def wait(self) -> WebDriverWait:
+        # Never wait past the request deadline
+        return WebDriverWait(self.driver, self.deadline.clamp(self.wait_timeout))
 
-    def run(self, phone: PhoneConfiguration, all_results: List[Result]):
+    def run(self, phone: PhoneConfiguration, all_results: List[Result], deadline: Optional[Deadline] = None,
+            limit: Optional[int] = None, sort: Optional[str] = None):
         print("[FPT] Starting run...")
+        self.deadline = deadline or Deadline()
+        self.partial = False
+        self.limit, self.sort = limit, sort
+        self.sorted_on_site = False
+        self.total_product = None
         try:
-            self.driver.get(self.url)
-            print("[FPT] Đang đợi trang load...")
-            time.sleep(2)  # Đợi filter load xong
-            # Scroll nhẹ để kích hoạt lazy-load/render động
-            try:
-                self.driver.execute_script("window.scrollTo(0, 600);")
-                time.sleep(0.5)
-                self.driver.execute_script("window.scrollTo(0, 0);")
-            except Exception:
-                pass
-            
-            # Đợi cho các filter elements load
-            try:
-                self.wait.until(EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, ".accordion-0 .Selection_button__vX7ZX")
-                ))
-                print("[FPT] Filter elements đã load xong")
-            except:
-                print("[FPT] Cảnh báo: Không thể đợi filter elements load")
-
-            # Áp dụng filter theo đúng selector đã kiểm chứng
-            self.filter_brand(phone.get_brand())
-            self.filter_price(phone.get_price_range())
-            self.filter_ram(phone.get_ram())
-            self.filter_storage(phone.get_storage())
-            self.filter_resolutions(phone.get_resolutions())
-            self.filter_refresh_rates(phone.get_refresh_rates())
-
-            time.sleep(3)  # Đợi kết quả cập nhật lâu hơn
-            all_results.extend(self.get_results())
+            self._open_and_filter(phone)
+
+            self.deadline.sleep(3)  # Đợi kết quả cập nhật lâu hơn
+            self.deadline.raise_if_cancelled()
+            if sort:
+                self.sorted_on_site = apply_site_sort(self.driver, self.SORT_LABELS.get(sort, ()),
+                                                      self.PRODUCT_GRID) is not None
+                print(f"[FPT] Sắp xếp {sort} trên trang: {'có' if self.sorted_on_site else 'không'}")
+            results = self.get_results()
+            self.deadline.raise_if_cancelled()
+            all_results.extend(results)
             print(f"[FPT] Đã thu thập {len(self.results)} sản phẩm")
 
+        except ScrapeCancelled as e:
+            print(f"[FPT] {e}")
+            return str(e)
         except Exception as e:
             print(f"[FPT] LỖI: {e}")
             import traceback
             traceback.print_exc()
+            return str(e)
+
+    def _acquire(self, url: str) -> bool:
+        """Wait for the shared rate limiter within the deadline; False when the slot comes too late"""
+        if rate_limiter.acquire(url, max_wait=self.deadline.remaining(), cancelled=self.deadline.expired):
+            return True
+        self.deadline.raise_if_cancelled()
+        self.partial = True
+        return False
+
+    def _open_and_filter(self, phone: PhoneConfiguration):
+        """Load the listing and apply every filter of the configuration"""
+        if not self._acquire(self.url):
+            raise TimeoutException("không kịp lượt truy cập trang trước hạn chót")
+        self.driver.get(self.url)
+        print("[FPT] Đang đợi trang load...")
+        self.deadline.sleep(2)  # Đợi filter load xong
+        # Scroll nhẹ để kích hoạt lazy-load/render động
+        try:
+            self.driver.execute_script("window.scrollTo(0, 600);")
+            self.deadline.sleep(0.5)
+            self.driver.execute_script("window.scrollTo(0, 0);")
+        except Exception:
+            pass
+        
+        # Đợi cho các filter elements load
+        try:
+            self.wait.until(EC.presence_of_element_located(
+                (By.CSS_SELECTOR, ".accordion-0 .Selection_button__vX7ZX")
+            ))
+            print("[FPT] Filter elements đã load xong")
+        except:
+            print("[FPT] Cảnh báo: Không thể đợi filter elements load")
+
+        # Áp dụng filter theo đúng selector đã kiểm chứng
+        self.filter_brand(phone.get_brand())
+        self.deadline.raise_if_cancelled()
+        self.filter_price(phone.get_price_range())
+        self.deadline.raise_if_cancelled()
+        self.filter_ram(phone.get_ram())
+        self.deadline.raise_if_cancelled()
+        self.filter_storage(phone.get_storage())
+        self.deadline.raise_if_cancelled()
+        self.filter_resolutions(phone.get_resolutions())
+        self.deadline.raise_if_cancelled()
+        self.filter_refresh_rates(phone.get_refresh_rates())
+
+    # Total of the filtered listing: the result header ("... N kết quả"), else the cards
+    # shown plus the N of the "Xem thêm N kết quả" button; `empty` when the site says
+    # nothing matches ("Không tìm thấy sản phẩm")
+    COUNT_SCRIPT = """
+        const [itemSelector] = arguments;
+        const number = (text) => parseInt(text.replace(/[.,]/g, '').match(/(\\d+)\\s*kết quả/)[1], 10);
+        let header = null, more = null, empty = false;
+        for (const el of document.querySelectorAll('h1, h2, h3, p, span, div, button')) {
+            const text = (el.textContent || '').replace(/\\s+/g, ' ').trim();
+            if (text.length > 80 || el.querySelector('h1, h2, h3, p, span, div, button')) continue;
+            if (/không (tìm thấy|có) sản phẩm/i.test(text)) empty = true;
+            if (text.length > 60 || !/\\d+\\s*kết quả/.test(text)) continue;
+            if (/xem thêm/i.test(text)) more = more === null ? number(text) : more;
+            else if (header === null) header = number(text);
+        }
+        return {header: header, shown: document.querySelectorAll(itemSelector).length, more: more, empty: empty};
+    """
+
+    def count(self, phone: PhoneConfiguration, deadline: Optional[Deadline] = None) -> Optional[int]:
+        """Apply the filters and read the listing total, without loading or extracting products"""
+        self.deadline = deadline or Deadline()
+        self.total_product = None
+        self._open_and_filter(phone)
+        counts = self._read_total()
+        print(f"[FPT] Count for {phone}: {self.total_product} ({counts})")
+        return self.total_product
+
+    def _read_total(self) -> dict:
+        """
+        Set total_product from the listing (COUNT_SCRIPT); returns the raw counts.
+        None when the page shows neither products nor a confirmed empty result
+        (blocked, still loading, out of time): only a confirmed 0 is "nothing matches".
+        """
+        # The header and button update after the filters' requests return
+        def read_counts(driver):
+            counts = driver.execute_script(self.COUNT_SCRIPT, self.PRODUCT_ITEMS)
+            return counts if counts["header"] is not None or counts["shown"] or counts["empty"] else False
+
+        try:
+            counts = self.wait.until(read_counts)
+        except TimeoutException:
+            counts = {"header": None, "shown": 0, "more": None, "empty": False}
+        if counts["header"] is not None:
+            self.total_product = counts["header"]
+        elif counts["shown"]:
+            self.total_product = counts["shown"] + (counts["more"] or 0)
+        else:
+            self.total_product = 0 if counts["empty"] else None
+        return counts
 
     def _click_button_by_text(self, buttons: List, target: str) -> bool:
         """Click nút có text chính xác bằng target (case-sensitive)."""
@@ -65,7 +185,7 @@ class FPTShop:
             try:
                 if btn.text.strip() == target:
                     self.driver.execute_script("arguments[0].click();", btn)
-                    time.sleep(0.5)
+                    self.deadline.sleep(0.5)
                     return True
             except:
                 continue
@@ -79,7 +199,7 @@ class FPTShop:
         
         print(f"[FPT] Filtering brands: {brands}")
         # Mapping từ TGDD → FPT
-        fpt_brands = [self.filter_list.BRAND_TGDD_TO_FPT.get(b, b) for b in brands]
+        fpt_brands = self.filter_list.map_brands_to_fpt(brands)
         print(f"[FPT] Mapped FPT brands: {fpt_brands}")
         
         # Sử dụng selector đã được verify từ debug
@@ -98,7 +218,7 @@ class FPTShop:
                         
                         if self._fpt_brand_matches(b, brand_text):
                             self.driver.execute_script("arguments[0].click();", btn)
-                            time.sleep(0.5)
+                            self.deadline.sleep(0.5)
                             print(f"[FPT] Đã chọn hãng: {brand_text}")
                             found = True
                             break
@@ -107,7 +227,7 @@ class FPTShop:
                         button_text = btn.text.strip()
                         if button_text and self._fpt_brand_matches(b, button_text):
                             self.driver.execute_script("arguments[0].click();", btn)
-                            time.sleep(0.5)
+                            self.deadline.sleep(0.5)
                             print(f"[FPT] Đã chọn hãng (text): {button_text}")
                             found = True
                             break
@@ -132,11 +252,8 @@ class FPTShop:
             
         print(f"[FPT] Filtering price: {price_href}")
         # Lấy tên hiển thị từ FilterList
-        price_name = ""
-        for p in self.filter_list.price_ranges:
-            if p["data-href"] == price_href:
-                price_name = p["name"]
-                break
+        price_range = self.filter_list.get_price_range(price_href)
+        price_name = price_range["name"] if price_range else ""
         if not price_name:
             print(f"[FPT] Không tìm thấy price name cho href: {price_href}")
             return
@@ -159,7 +276,7 @@ class FPTShop:
                     if label_text == price_name:
                         self.driver.execute_script("arguments[0].click();", checkbox)
                         print(f"[FPT] Đã chọn khoảng giá: {price_name}")
-                        time.sleep(0.5)
+                        self.deadline.sleep(0.5)
                         break
             except Exception as ex:
                 print(f"[FPT] Error processing price checkbox: {ex}")
@@ -188,7 +305,7 @@ class FPTShop:
         print(f"[FPT] Filtering Storage: {value} {op}")
         valid_storages = self.filter_list.get_filtered_memory(value, op, self.filter_list.storage_options)
         # Map sang định dạng FPT
-        fpt_storages = {self.filter_list.STORAGE_TGDD_TO_FPT.get(s, s) for s in valid_storages}
+        fpt_storages = self.filter_list.map_storages_to_fpt(valid_storages)
         print(f"[FPT] Valid FPT storage options: {fpt_storages}")
         
         # Selector chính xác theo thông tin bạn cung cấp: nhóm thứ 2
@@ -203,7 +320,7 @@ class FPTShop:
         if not resolutions:
             return
         print(f"[FPT] Filtering Resolutions: {resolutions}")
-        fpt_resolutions = [self.filter_list.RESOLUTION_TGDD_TO_FPT.get(r, r) for r in resolutions]
+        fpt_resolutions = self.filter_list.map_resolutions_to_fpt(resolutions)
         print(f"[FPT] FPT resolution options: {fpt_resolutions}")
         
         # Selector chính xác theo thông tin bạn cung cấp: nhóm thứ 6
@@ -218,7 +335,7 @@ class FPTShop:
         if not refresh_rates:
             return
         print(f"[FPT] Filtering Refresh Rates: {refresh_rates}")
-        fpt_rates = [self.filter_list.REFRESH_RATE_TGDD_TO_FPT.get(r, r) for r in refresh_rates]
+        fpt_rates = self.filter_list.map_refresh_rates_to_fpt(refresh_rates)
         print(f"[FPT] FPT refresh rate options: {fpt_rates}")
         
         # Selector chính xác theo thông tin bạn cung cấp: nhóm thứ 7
@@ -229,124 +346,124 @@ class FPTShop:
             if self._click_button_by_text(rate_buttons, r):
                 print(f"[FPT] Đã chọn Refresh Rate: {r}")
 
+    def _wanted(self) -> Optional[int]:
+        """Items needed in top-N mode, None when the whole listing is (no limit, or not in the requested order)"""
+        if self.limit and (not self.sort or self.sorted_on_site):
+            return self.limit
+        return None
+
     # =============== GET RESULTS ===============
     def get_results(self) -> List[Result]:
         self.results.clear()
+        # A listing that never loads propagates to run(): it is the source's error, for the circuit breaker
         try:
             # Đợi grid container load
-            self.wait.until(EC.presence_of_element_located(
-                (By.CSS_SELECTOR, ".grid.grid-cols-2.gap-2")
-            ))
-            time.sleep(2)  # Đợi thêm để sản phẩm load hết
+            try:
+                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.PRODUCT_GRID)))
+            except TimeoutException:
+                # No grid is an error unless the site confirms that nothing matches
+                self._read_total()
+                if self.total_product == 0:
+                    print("[FPT] Không có sản phẩm phù hợp")
+                    return self.results
+                raise
+            self.deadline.sleep(2)  # Đợi thêm để sản phẩm load hết
+            # Known even when every product fits on the first page (no "Xem thêm" button)
+            self._read_total()
 
             # Tự động click "Xem thêm" để load hết sản phẩm
             self._load_all_products()
 
             # Lấy tất cả sản phẩm theo selector từ hướng dẫn
-            items = self.driver.find_elements(By.CSS_SELECTOR, ".grid.grid-cols-2.gap-2 .flex-1")
+            items = self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_ITEMS)
             print(f"[FPT] Tìm thấy {len(items)} sản phẩm")
+            if self._wanted():
+                items = items[:self._wanted()]
 
             for i, item in enumerate(items, 1):
+                if self.deadline.expired():
+                    reason = "Đã hủy" if self.deadline.cancelled() else "Hết thời gian cho phép"
+                    print(f"[FPT] {reason}, dừng ở sản phẩm {i}/{len(items)}")
+                    self.partial = True
+                    break
                 try:
                     if i == 1:  # Debug item đầu tiên
                         print(f"[FPT] Debug item 1 HTML: {item.get_attribute('outerHTML')[:500]}...")
                     
-                    # Tên sản phẩm
-                    name = "N/A"
-                    try:
-                        name_elem = item.find_element(By.CSS_SELECTOR, ".ProductCard_cardTitle__HlwIo")
-                        name = name_elem.text.strip()
-                    except:
-                        # Fallback selector - thử nhiều selector khác
-                        try:
-                            name_elem = item.find_element(By.CSS_SELECTOR, "h3")
-                            name = name_elem.text.strip()
-                        except:
-                            try:
-                                name_elem = item.find_element(By.CSS_SELECTOR, ".card-title")
-                                name = name_elem.text.strip()
-                            except:
-                                try:
-                                    name_elem = item.find_element(By.CSS_SELECTOR, "a[title]")
-                                    name = name_elem.get_attribute("title").strip()
-                                except:
-                                    print(f"[FPT] Không tìm thấy tên cho sản phẩm")
-                                    continue
+                    # Tên sản phẩm (chuỗi selector dự phòng, selector không còn khớp bị đẩy xuống cuối)
+                    name = selector_registry.first(
+                        "FPT", "name", self.NAME_SELECTORS,
+                        lambda selector: self._first_text(item, selector, "title" if selector == "a[title]" else None),
+                    ) or "N/A"
+                    if name == "N/A":
+                        print(f"[FPT] Không tìm thấy tên cho sản phẩm")
+                        continue
 
                     # Link sản phẩm
                     link = "N/A"
-                    try:
-                        link_elem = item.find_element(By.CSS_SELECTOR, "a")
-                        link = link_elem.get_attribute("href") or "N/A"
+                    links = item.find_elements(By.CSS_SELECTOR, "a")
+                    if links:
+                        link = links[0].get_attribute("href") or "N/A"
                         if link.startswith("/"):
                             link = self.base_url + link
-                    except:
-                        pass
 
                     # Giá sản phẩm
-                    price = "Không có thông tin"
-                    try:
-                        price_elem = item.find_element(By.CSS_SELECTOR, ".Price_currentPrice__PBYcv")
-                        price = price_elem.text.strip()
-                    except:
-                        # Fallback selectors
-                        try:
-                            price_elem = item.find_element(By.CSS_SELECTOR, ".price")
-                            price = price_elem.text.strip()
-                        except:
-                            pass
+                    price = selector_registry.first(
+                        "FPT", "price", self.PRICE_SELECTORS,
+                        lambda selector: self._first_text(item, selector),
+                    ) or "Không có thông tin"
 
                     # Hình ảnh sản phẩm
-                    img = "N/A"
-                    try:
-                        img_elem = item.find_element(By.CSS_SELECTOR, "a.flex-1 img")
-                        img = img_elem.get_attribute("src") or img_elem.get_attribute("data-src") or "N/A"
-                    except:
-                        # Fallback
-                        try:
-                            img_elem = item.find_element(By.TAG_NAME, "img")
-                            img = img_elem.get_attribute("src") or img_elem.get_attribute("data-src") or "N/A"
-                        except:
-                            pass
+                    img = selector_registry.first(
+                        "FPT", "image", self.IMAGE_SELECTORS,
+                        lambda selector: next((e.get_attribute("src") or e.get_attribute("data-src")
+                                               for e in item.find_elements(By.CSS_SELECTOR, selector)), None),
+                    ) or "N/A"
 
                     # Thông số kỹ thuật
-                    details = []
-                    try:
-                        specs = item.find_elements(By.CSS_SELECTOR, ".ProductCard_keySellingPoint__426Jm")
-                        details = [s.text.strip() for s in specs if s.text.strip()]
-                    except:
-                        # Fallback
-                        try:
-                            specs = item.find_elements(By.CSS_SELECTOR, ".specification span")
-                            details = [s.text.strip() for s in specs if s.text.strip()]
-                        except:
-                            pass
+                    details = selector_registry.first(
+                        "FPT", "details", self.DETAILS_SELECTORS,
+                        lambda selector: [e.text.strip() for e in item.find_elements(By.CSS_SELECTOR, selector) if e.text.strip()],
+                    ) or []
 
                     if name != "N/A":
-                        self.results.append(Result(img, name, price, link, details))
+                        # FPT cards carry no product id, the URL slug identifies the product
+                        source_id = link.split("?")[0].rstrip("/").rsplit("/", 1)[-1] if link != "N/A" else ""
+                        self.results.append(Result(img, name, price, link, details, source="FPT", source_id=source_id))
                         print(f"[FPT] Đã thêm: {name} - {price}")
 
                 except Exception as e:
                     print(f"[FPT] Lỗi xử lý sản phẩm: {e}")
                     continue
 
-        except Exception as e:
-            print(f"[FPT] Lỗi get_results: {e}")
-            import traceback
-            traceback.print_exc()
-        
+        finally:
+            selector_registry.flush()
         return self.results
 
+    @staticmethod
+    def _first_text(item, selector: str, attribute: Optional[str] = None) -> Optional[str]:
+        """Text (or attribute) of the first element matching selector inside item, None if absent/empty"""
+        for e in item.find_elements(By.CSS_SELECTOR, selector):
+            value = ((e.get_attribute(attribute) if attribute else e.text) or "").strip()
+            if value:
+                return value
+        return None
+
     def _load_all_products(self):
         """Tự động click nút 'Xem thêm' để load hết sản phẩm"""
         max_clicks = 10  # Giới hạn số lần click để tránh vòng lặp vô hạn
         clicks = 0
         
         while clicks < max_clicks:
+            if self.deadline.expired():
+                reason = "Đã hủy" if self.deadline.cancelled() else "Hết thời gian cho phép"
+                print(f"[FPT] {reason}, dừng click 'Xem thêm'")
+                self.partial = True
+                break
             try:
                 # Scroll xuống cuối trang trước khi tìm nút "Xem thêm"
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
+                self.deadline.sleep(1)
                 
                 # Tìm nút "Xem thêm" với selector chính xác theo HTML bạn cung cấp
                 load_more_selectors = [
@@ -391,21 +508,30 @@ class FPTShop:
                     
                     # Chỉ click nếu là nút "Xem thêm", không click "Thu gọn"
                     if "Xem thêm" in button_text and "kết quả" in button_text:
-                        print(f"[FPT] Click nút 'Xem thêm' lần {clicks + 1}: '{button_text}'")
-                        
                         # Đếm số sản phẩm trước khi click
-                        products_before = len(self.driver.find_elements(By.CSS_SELECTOR, ".grid.grid-cols-2.gap-2 .flex-1"))
+                        products_before = len(self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_ITEMS))
+                        # "Xem thêm N kết quả": N products are still to come
+                        remaining = re.search(r"\d+", button_text.replace(".", ""))
+                        if remaining:
+                            self.total_product = products_before + int(remaining.group())
+                        if self._wanted() and products_before >= self._wanted():
+                            print(f"[FPT] Đã đủ {products_before}/{self._wanted()} sản phẩm cần lấy")
+                            break
+                        print(f"[FPT] Click nút 'Xem thêm' lần {clicks + 1}: '{button_text}'")
                         
                         # Scroll đến nút trước khi click
                         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", load_more_button)
-                        time.sleep(0.5)
+                        self.deadline.sleep(0.5)
                         
                         # Click nút
+                        if not self._acquire(self.base_url):
+                            print("[FPT] Không kịp lượt tải trang tiếp theo trước hạn chót, dừng lại")
+                            break
                         self.driver.execute_script("arguments[0].click();", load_more_button)
-                        time.sleep(3)  # Đợi content load lâu hơn
+                        self.deadline.sleep(3)  # Đợi content load lâu hơn
                         
                         # Kiểm tra có load thêm sản phẩm không
-                        products_after = len(self.driver.find_elements(By.CSS_SELECTOR, ".grid.grid-cols-2.gap-2 .flex-1"))
+                        products_after = len(self.driver.find_elements(By.CSS_SELECTOR, self.PRODUCT_ITEMS))
                         
                         if products_after > products_before:
                             print(f"[FPT] Đã load thêm {products_after - products_before} sản phẩm ({products_before} → {products_after})")
@@ -428,4 +554,4 @@ class FPTShop:
         
         # Scroll về đầu trang để chuẩn bị scrape
         self.driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
\ No newline at end of file
+        self.deadline.sleep(1)
\ No newline at end of file
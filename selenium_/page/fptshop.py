@@ -12,10 +12,9 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.chrome.options import Options
 
 from ..model.phone_configuration import PhoneConfiguration
-from ..model.result import Phone
-
-logger = logging.getLogger(__name__)
-from ..model.result import Phone
+from ..model.result import Result
+from cache.rate_limiter import rate_limiter
+from cache.selector_registry import selector_registry
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +45,7 @@ class FPTShopScraper:
             self.driver.quit()
             self.driver = None
     
-    def scrape_phones(self, config: PhoneConfiguration) -> List[Phone]:
+    def scrape_phones(self, config: PhoneConfiguration) -> List[Result]:
         """Main scraping method"""
         try:
             self.setup_driver()
@@ -56,6 +55,8 @@ class FPTShopScraper:
             filtered_url = self._build_filtered_url(config)
             logger.info(f"Loading FPTShop with filters: {filtered_url}")
             
+            # Same per-host budget as the page objects' navigations
+            rate_limiter.acquire(filtered_url)
             self.driver.get(filtered_url)
             time.sleep(5)
             
@@ -84,403 +85,260 @@ class FPTShopScraper:
             return []
         finally:
             self.cleanup()
+            selector_registry.flush()
     
-    def get_available_brands(self) -> List[str]:
-        """Scrape available brands from FPTShop dynamically"""
+    # One round trip: open the filter panel, expand every collapsed group, then read
+    # the brand links and the short texts of the whole page once
+    FILTER_HARVEST_SCRIPT = """
+        const done = arguments[arguments.length - 1];
+        const clickAll = (nodes) => nodes.forEach(n => { try { n.click(); } catch (e) {} });
+        const byText = (re) => Array.from(document.querySelectorAll('button, span, div'))
+            .filter(n => n.children.length === 0 && re.test((n.textContent || '').trim()));
+        const panel = Array.from(document.querySelectorAll('button'))
+            .find(b => /filter/.test(b.className) || (b.textContent || '').includes('Bộ lọc'));
+        if (panel) panel.click();
+        setTimeout(() => {
+            clickAll(Array.from(document.querySelectorAll('[aria-expanded="false"]')));
+            clickAll(byText(/^Xem thêm/));
+            setTimeout(() => {
+                const links = Array.from(document.querySelectorAll("a[href*='/dien-thoai/']"))
+                    .map(a => a.href)
+                    .filter(h => h && !h.includes('?') && !/\\/dien-thoai\\/?$/.test(h));
+                const texts = [];
+                for (const el of document.querySelectorAll('body *')) {
+                    let own = '';
+                    for (const n of el.childNodes) if (n.nodeType === 3) own += n.textContent;
+                    own = own.trim();
+                    if (own && own.length <= 80) texts.push([el.tagName.toLowerCase(), own]);
+                }
+                done({links: links, texts: texts});
+            }, arguments[0]);
+        }, arguments[0]);
+    """
+    EXPAND_WAIT_MS = 800
+
+    def harvest_filters(self) -> dict:
+        """
+        Load the listing once and read every filter category from it.
+        Returns {"links": [brand hrefs], "texts": [(tag, own text)]}.
+        """
+        started = time.monotonic()
         try:
             self.setup_driver()
-            logger.info("Scraping available brands from FPTShop")
-            
+            logger.info("Harvesting FPTShop filter options in one page load")
+            # Background filter refreshes share the per-host budget with the scrapes
+            rate_limiter.acquire(self.BASE_URL)
             self.driver.get(self.BASE_URL)
-            time.sleep(3)
-            
-            brands = []
-            
-            # Get the full brand list from the carousel area - most reliable method
-            try:
-                logger.info("Looking for brand carousel links...")
-                # Target the main brand carousel
-                brand_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/dien-thoai/') and not(contains(@href, '?')) and not(@href='/dien-thoai')]")
-                logger.info(f"Found {len(brand_links)} brand carousel links")
-                
-                seen_brands = set()
-                for link in brand_links:
-                    try:
-                        href = link.get_attribute('href')
-                        if href and '/dien-thoai/' in href:
-                            # Extract brand name from URL like /dien-thoai/samsung -> samsung
-                            parts = href.split('/dien-thoai/')
-                            if len(parts) > 1:
-                                brand_part = parts[1].split('/')[0].split('?')[0]  # Remove any params
-                                
-                                # Filter out category pages and specific models
-                                exclude_terms = {
-                                    'dien-thoai-5g', 'ai', '5g', 'gap', 'gaming', 'pho-thong', 
-                                    'dien-thoai-gap', 'dien-thoai-gaming', 'dien-thoai-ai'
-                                }
-                                
-                                if brand_part and len(brand_part) > 2 and brand_part not in exclude_terms:
-                                    # Handle special cases
-                                    if brand_part == 'apple-iphone':
-                                        if 'apple' not in seen_brands:
-                                            brands.append('apple')
-                                            seen_brands.add('apple')
-                                    elif '-' not in brand_part or brand_part.startswith(('samsung-galaxy', 'iphone-')):
-                                        # These are specific models, extract brand
-                                        if brand_part.startswith('samsung-galaxy'):
-                                            if 'samsung' not in seen_brands:
-                                                brands.append('samsung')
-                                                seen_brands.add('samsung')
-                                        elif brand_part.startswith('iphone-'):
-                                            if 'apple' not in seen_brands:
-                                                brands.append('apple') 
-                                                seen_brands.add('apple')
-                                    else:
-                                        # Regular brand name
-                                        clean_brand = brand_part.lower()
-                                        if clean_brand not in seen_brands and len(clean_brand) > 2:
-                                            brands.append(clean_brand)
-                                            seen_brands.add(clean_brand)
-                                            
-                    except Exception as e:
-                        logger.debug(f"Error processing brand link: {e}")
-                        continue
-                        
-            except Exception as e:
-                logger.error(f"Error extracting brand carousel: {e}")
-            
-            # Remove duplicates and filter 
-            brands = list(dict.fromkeys(brands))  # Preserve order while removing duplicates
-            
-            # Filter out invalid entries and specific models
-            valid_brands = []
-            processed_brands = set()
-            
-            for brand in brands:
-                # Check if it's a valid brand name (not a model or category)
-                if brand and len(brand) > 2:
-                    # Extract base brand from complex names
-                    base_brand = brand.lower()
-                    
-                    # Handle specific cases first
-                    if any(term in base_brand for term in ['iphone-', 'apple-iphone']):
-                        base_brand = 'apple'
-                    elif any(term in base_brand for term in ['samsung-galaxy', 'galaxy-']):
-                        base_brand = 'samsung'  
-                    elif any(term in base_brand for term in ['xiaomi-redmi', 'xiaomi-poco', 'redmi-', 'poco-']):
-                        base_brand = 'xiaomi'
-                    elif any(term in base_brand for term in ['oppo-reno', 'oppo-a']):
-                        base_brand = 'oppo'
-                    elif any(term in base_brand for term in ['honor-magic', 'honor-x']):
-                        base_brand = 'honor'
-                    elif any(term in base_brand for term in ['tecno-spark', 'tecno-pova']):
-                        base_brand = 'tecno'
-                    elif any(term in base_brand for term in ['realme-', 'realme-c', 'realme-gt']):
-                        base_brand = 'realme'
-                    elif any(term in base_brand for term in ['vivo-', 'vivo-v', 'vivo-y']):
-                        base_brand = 'vivo'
-                    elif any(term in base_brand for term in ['redmagic-']):
-                        base_brand = 'redmagic'
-                    elif any(term in base_brand for term in ['nubia-']):
-                        base_brand = 'nubia'
-                    elif any(term in base_brand for term in ['tcl-']):
-                        base_brand = 'tcl'
-                    
-                    # Skip specific model numbers and series names
-                    skip_patterns = [
-                        '-series', '-pro-', '-max', '-fold', '-flip', '-ultra',
-                        'galaxy-s-series', 'galaxy-a-series', 'galaxy-z-series',
-                        'iphone-14-series', 'iphone-15-series', 'iphone-16-series'
-                    ]
-                    
-                    # Skip if it contains model-specific patterns but isn't a base brand
-                    if any(pattern in base_brand for pattern in skip_patterns):
-                        # Only keep if it's exactly these series names
-                        if base_brand not in {'galaxy-s-series', 'galaxy-a-series', 'galaxy-z-series'}:
-                            continue
-                        else:
-                            base_brand = 'samsung'  # Convert series to base brand
-                    
-                    # Skip if contains model numbers or specific product codes
-                    if (any(char.isdigit() for char in base_brand) and 
-                        not base_brand in {'redmagic', 'tecno', 'honor', 'vivo'} and
-                        not any(base_brand.startswith(prefix) for prefix in ['tcl', 'honor', 'redmagic'])):
-                        # Check if it's a model number pattern like "a5i-6gb", "14t-pro"
-                        parts = base_brand.split('-')
-                        if len(parts) > 1:
-                            first_part = parts[0]
-                            # If first part is a known brand, use that
-                            known_brands = {'samsung', 'apple', 'xiaomi', 'oppo', 'honor', 'tecno', 'realme', 'vivo', 'nokia', 'zte', 'redmagic', 'nubia', 'tcl', 'itel', 'mobell', 'viettel', 'masstel', 'benco', 'inoi'}
-                            if first_part in known_brands:
-                                base_brand = first_part
-                            else:
-                                continue  # Skip model numbers
-                        else:
-                            continue  # Skip single-word model numbers
-                    
-                    # Only add if we haven't seen this brand yet
-                    if base_brand not in processed_brands and base_brand and len(base_brand) > 1:
-                        valid_brands.append(base_brand)
-                        processed_brands.add(base_brand)
-            
-            brands = valid_brands
-            
-            logger.info(f"Found {len(brands)} available brands: {brands}")
-            
-            # Return only what we actually found from the website
-            return brands
-            
+            self.wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+            self.driver.set_script_timeout(15)
+            raw = self.driver.execute_async_script(self.FILTER_HARVEST_SCRIPT, self.EXPAND_WAIT_MS) or {}
+            harvest = {
+                'links': raw.get('links') or [],
+                'texts': [tuple(t) for t in raw.get('texts') or []],
+            }
+            logger.info(f"Harvested {len(harvest['links'])} links and {len(harvest['texts'])} texts "
+                        f"in {time.monotonic() - started:.1f}s")
+            return harvest
         except Exception as e:
-            logger.error(f"Error getting available brands: {e}")
-            # Return empty list if scraping fails - no hardcode fallback
-            return []
+            logger.error(f"Error harvesting filter options: {e}")
+            return {'links': [], 'texts': []}
         finally:
             self.cleanup()
 
+    def get_available_brands(self) -> List[str]:
+        """Scrape available brands from FPTShop dynamically"""
+        return self._parse_brands(self.harvest_filters())
+
     def get_available_price_ranges(self) -> List[dict]:
         """Scrape available price ranges from FPTShop dynamically"""
-        try:
-            self.setup_driver()
-            logger.info("Scraping available price ranges from FPTShop")
-            
-            self.driver.get(self.BASE_URL)
-            time.sleep(3)
-            
-            price_ranges = []
-            
-            # Look for price filter elements
-            try:
-                # Click on filter area to expand
-                filter_buttons = self.driver.find_elements(By.XPATH, "//button[contains(@class, 'filter') or contains(text(), 'Bộ lọc')]")
-                if filter_buttons:
-                    filter_buttons[0].click()
-                    time.sleep(2)
-                
-                # Look for price range options
-                price_selectors = [
-                    "//label[contains(text(), 'triệu')]",
-                    "//span[contains(text(), 'triệu')]",
-                    "//div[contains(@class, 'price')]//label",
-                    "//input[@type='checkbox']/following-sibling::*[contains(text(), 'triệu')]"
-                ]
-                
-                for selector in price_selectors:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        try:
-                            text = element.text.strip()
-                            if 'triệu' in text and text not in [p['label'] for p in price_ranges]:
-                                price_ranges.append({
-                                    'label': text,
-                                    'value': text.lower().replace(' ', '_').replace('triệu', 'trieu')
-                                })
-                        except:
-                            continue
-                            
-            except Exception as e:
-                logger.error(f"Error extracting price ranges: {e}")
-            
-            logger.info(f"Found {len(price_ranges)} price ranges: {[p['label'] for p in price_ranges]}")
-            return price_ranges
-            
-        except Exception as e:
-            logger.error(f"Error getting price ranges: {e}")
-            return []
-        finally:
-            self.cleanup()
+        return self._parse_price_ranges(self.harvest_filters())
 
     def get_available_ram_options(self) -> List[str]:
         """Scrape available RAM options from FPTShop dynamically"""
-        try:
-            self.setup_driver()
-            logger.info("Scraping available RAM options from FPTShop")
-            
-            self.driver.get(self.BASE_URL)
-            time.sleep(3)
-            
-            ram_options = []
-            
-            try:
-                # Look for RAM filter elements
-                ram_selectors = [
-                    "//label[contains(text(), 'GB') and (contains(text(), 'RAM') or contains(., 'RAM'))]",
-                    "//span[contains(text(), 'GB') and contains(text(), 'RAM')]",
-                    "//div[contains(@class, 'ram')]//label",
-                    "//*[contains(text(), 'GB') and contains(text(), 'RAM')]"
-                ]
-                
-                for selector in ram_selectors:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        try:
-                            text = element.text.strip()
-                            if 'GB' in text and any(char.isdigit() for char in text):
-                                # Extract RAM value like "8 GB"
-                                import re
-                                ram_match = re.search(r'(\d+)\s*GB', text)
-                                if ram_match and f"{ram_match.group(1)} GB" not in ram_options:
-                                    ram_options.append(f"{ram_match.group(1)} GB")
-                        except:
-                            continue
-                            
-            except Exception as e:
-                logger.error(f"Error extracting RAM options: {e}")
-            
-            logger.info(f"Found {len(ram_options)} RAM options: {ram_options}")
-            return ram_options
-            
-        except Exception as e:
-            logger.error(f"Error getting RAM options: {e}")
-            return []
-        finally:
-            self.cleanup()
+        return self._parse_ram_options(self.harvest_filters())
 
     def get_available_storage_options(self) -> List[str]:
         """Scrape available storage options from FPTShop dynamically"""
-        try:
-            self.setup_driver()
-            logger.info("Scraping available storage options from FPTShop")
-            
-            self.driver.get(self.BASE_URL)
-            time.sleep(3)
-            
-            storage_options = []
-            
-            try:
-                # Look for storage filter elements
-                storage_selectors = [
-                    "//label[contains(text(), 'GB') or contains(text(), 'TB')]",
-                    "//span[contains(text(), 'GB') or contains(text(), 'TB')]",
-                    "//div[contains(@class, 'storage')]//label",
-                    "//*[contains(text(), 'GB') or contains(text(), 'TB')]"
-                ]
-                
-                for selector in storage_selectors:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        try:
-                            text = element.text.strip()
-                            if ('GB' in text or 'TB' in text) and any(char.isdigit() for char in text):
-                                # Extract storage value like "256 GB" or "1 TB"
-                                import re
-                                storage_match = re.search(r'(\d+)\s*(GB|TB)', text)
-                                if storage_match:
-                                    value = f"{storage_match.group(1)} {storage_match.group(2)}"
-                                    if value not in storage_options:
-                                        storage_options.append(value)
-                        except:
-                            continue
-                            
-            except Exception as e:
-                logger.error(f"Error extracting storage options: {e}")
-            
-            logger.info(f"Found {len(storage_options)} storage options: {storage_options}")
-            return storage_options
-            
-        except Exception as e:
-            logger.error(f"Error getting storage options: {e}")
-            return []
-        finally:
-            self.cleanup()
+        return self._parse_storage_options(self.harvest_filters())
 
     def get_available_os_options(self) -> List[str]:
         """Scrape available OS options from FPTShop dynamically"""
-        try:
-            self.setup_driver()
-            logger.info("Scraping available OS options from FPTShop")
-            
-            self.driver.get(self.BASE_URL)
-            time.sleep(3)
-            
-            os_options = []
-            
-            try:
-                # Look for OS filter elements
-                os_selectors = [
-                    "//label[contains(text(), 'iOS') or contains(text(), 'Android')]",
-                    "//span[contains(text(), 'iOS') or contains(text(), 'Android')]",
-                    "//*[contains(text(), 'iOS') or contains(text(), 'Android')]"
-                ]
-                
-                for selector in os_selectors:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        try:
-                            text = element.text.strip()
-                            if 'iOS' in text and 'iOS' not in os_options:
-                                os_options.append('iOS')
-                            elif 'Android' in text and 'Android' not in os_options:
-                                os_options.append('Android')
-                        except:
-                            continue
-                            
-            except Exception as e:
-                logger.error(f"Error extracting OS options: {e}")
-            
-            logger.info(f"Found {len(os_options)} OS options: {os_options}")
-            return os_options
-            
-        except Exception as e:
-            logger.error(f"Error getting OS options: {e}")
-            return []
-        finally:
-            self.cleanup()
+        return self._parse_os_options(self.harvest_filters())
 
     def get_available_network_options(self) -> List[str]:
         """Scrape available network options from FPTShop dynamically"""
-        try:
-            self.setup_driver()
-            logger.info("Scraping available network options from FPTShop")
-            
-            self.driver.get(self.BASE_URL)
-            time.sleep(3)
-            
-            network_options = []
-            
-            try:
-                # Look for network filter elements
-                network_selectors = [
-                    "//label[contains(text(), '4G') or contains(text(), '5G')]",
-                    "//span[contains(text(), '4G') or contains(text(), '5G')]",
-                    "//*[contains(text(), '4G') or contains(text(), '5G')]"
-                ]
-                
-                for selector in network_selectors:
-                    elements = self.driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        try:
-                            text = element.text.strip()
-                            if '5G' in text and '5G' not in network_options:
-                                network_options.append('5G')
-                            elif '4G' in text and '4G' not in network_options:
-                                network_options.append('4G')
-                        except:
-                            continue
-                            
-            except Exception as e:
-                logger.error(f"Error extracting network options: {e}")
-            
-            logger.info(f"Found {len(network_options)} network options: {network_options}")
-            return network_options
-            
-        except Exception as e:
-            logger.error(f"Error getting network options: {e}")
-            return []
-        finally:
-            self.cleanup()
+        return self._parse_network_options(self.harvest_filters())
 
     def get_all_filter_options(self) -> dict:
-        """Get all available filter options from FPTShop"""
+        """Get all available filter options from FPTShop (a single page load)"""
         logger.info("Getting all FPTShop filter options...")
-        
+        harvest = self.harvest_filters()
+
         return {
-            'brands': self.get_available_brands(),
-            'price_ranges': self.get_available_price_ranges(),
-            'ram_options': self.get_available_ram_options(),
-            'storage_options': self.get_available_storage_options(),
-            'os_options': self.get_available_os_options(),
-            'network_options': self.get_available_network_options()
+            'brands': self._parse_brands(harvest),
+            'price_ranges': self._parse_price_ranges(harvest),
+            'ram_options': self._parse_ram_options(harvest),
+            'storage_options': self._parse_storage_options(harvest),
+            'os_options': self._parse_os_options(harvest),
+            'network_options': self._parse_network_options(harvest)
+        }
+
+    # =============== HARVEST PARSERS ===============
+    def _parse_brands(self, harvest: dict) -> List[str]:
+        brands = []
+        seen_brands = set()
+        # Filter out category pages and specific models
+        exclude_terms = {
+            'dien-thoai-5g', 'ai', '5g', 'gap', 'gaming', 'pho-thong',
+            'dien-thoai-gap', 'dien-thoai-gaming', 'dien-thoai-ai'
         }
+        for href in harvest['links']:
+            # Extract brand name from URL like /dien-thoai/samsung -> samsung
+            parts = href.split('/dien-thoai/')
+            if len(parts) < 2:
+                continue
+            brand_part = parts[1].split('/')[0].split('?')[0]  # Remove any params
+            if not brand_part or len(brand_part) <= 2 or brand_part in exclude_terms:
+                continue
+            # Handle special cases
+            if brand_part == 'apple-iphone':
+                if 'apple' not in seen_brands:
+                    brands.append('apple')
+                    seen_brands.add('apple')
+            elif brand_part.startswith(('samsung-galaxy', 'iphone-')):
+                # These are specific models, extract brand
+                if brand_part.startswith('samsung-galaxy'):
+                    if 'samsung' not in seen_brands:
+                        brands.append('samsung')
+                        seen_brands.add('samsung')
+                elif 'apple' not in seen_brands:
+                    brands.append('apple')
+                    seen_brands.add('apple')
+            else:
+                # Regular brand name
+                clean_brand = brand_part.lower()
+                if clean_brand not in seen_brands and len(clean_brand) > 2:
+                    brands.append(clean_brand)
+                    seen_brands.add(clean_brand)
+
+        # Filter out invalid entries and specific models
+        valid_brands = []
+        processed_brands = set()
+        known_brands = {'samsung', 'apple', 'xiaomi', 'oppo', 'honor', 'tecno', 'realme', 'vivo', 'nokia', 'zte', 'redmagic', 'nubia', 'tcl', 'itel', 'mobell', 'viettel', 'masstel', 'benco', 'inoi'}
+        skip_patterns = [
+            '-series', '-pro-', '-max', '-fold', '-flip', '-ultra',
+            'galaxy-s-series', 'galaxy-a-series', 'galaxy-z-series',
+            'iphone-14-series', 'iphone-15-series', 'iphone-16-series'
+        ]
+        for brand in brands:
+            # Extract base brand from complex names
+            base_brand = brand.lower()
+
+            # Handle specific cases first
+            if any(term in base_brand for term in ['iphone-', 'apple-iphone']):
+                base_brand = 'apple'
+            elif any(term in base_brand for term in ['samsung-galaxy', 'galaxy-']):
+                base_brand = 'samsung'
+            elif any(term in base_brand for term in ['xiaomi-redmi', 'xiaomi-poco', 'redmi-', 'poco-']):
+                base_brand = 'xiaomi'
+            elif any(term in base_brand for term in ['oppo-reno', 'oppo-a']):
+                base_brand = 'oppo'
+            elif any(term in base_brand for term in ['honor-magic', 'honor-x']):
+                base_brand = 'honor'
+            elif any(term in base_brand for term in ['tecno-spark', 'tecno-pova']):
+                base_brand = 'tecno'
+            elif any(term in base_brand for term in ['realme-', 'realme-c', 'realme-gt']):
+                base_brand = 'realme'
+            elif any(term in base_brand for term in ['vivo-', 'vivo-v', 'vivo-y']):
+                base_brand = 'vivo'
+            elif any(term in base_brand for term in ['redmagic-']):
+                base_brand = 'redmagic'
+            elif any(term in base_brand for term in ['nubia-']):
+                base_brand = 'nubia'
+            elif any(term in base_brand for term in ['tcl-']):
+                base_brand = 'tcl'
+
+            # Skip if it contains model-specific patterns but isn't a base brand
+            if any(pattern in base_brand for pattern in skip_patterns):
+                # Only keep if it's exactly these series names
+                if base_brand not in {'galaxy-s-series', 'galaxy-a-series', 'galaxy-z-series'}:
+                    continue
+                base_brand = 'samsung'  # Convert series to base brand
+
+            # Skip if contains model numbers or specific product codes
+            if (any(char.isdigit() for char in base_brand) and
+                    base_brand not in {'redmagic', 'tecno', 'honor', 'vivo'} and
+                    not any(base_brand.startswith(prefix) for prefix in ['tcl', 'honor', 'redmagic'])):
+                # Check if it's a model number pattern like "a5i-6gb", "14t-pro"
+                first_part = base_brand.split('-')[0]
+                # If first part is a known brand, use that, else skip model numbers
+                if '-' in base_brand and first_part in known_brands:
+                    base_brand = first_part
+                else:
+                    continue
+
+            # Only add if we haven't seen this brand yet
+            if base_brand not in processed_brands and len(base_brand) > 1:
+                valid_brands.append(base_brand)
+                processed_brands.add(base_brand)
+
+        logger.info(f"Found {len(valid_brands)} available brands: {valid_brands}")
+        # Return only what we actually found from the website
+        return valid_brands
+
+    def _parse_price_ranges(self, harvest: dict) -> List[dict]:
+        price_ranges = []
+        for tag, text in harvest['texts']:
+            if tag in ('label', 'span') and 'triệu' in text and text not in [p['label'] for p in price_ranges]:
+                price_ranges.append({
+                    'label': text,
+                    'value': text.lower().replace(' ', '_').replace('triệu', 'trieu')
+                })
+        logger.info(f"Found {len(price_ranges)} price ranges: {[p['label'] for p in price_ranges]}")
+        return price_ranges
+
+    def _parse_ram_options(self, harvest: dict) -> List[str]:
+        ram_options = []
+        for _, text in harvest['texts']:
+            if 'GB' in text and 'RAM' in text:
+                # Extract RAM value like "8 GB"
+                ram_match = re.search(r'(\d+)\s*GB', text)
+                if ram_match and f"{ram_match.group(1)} GB" not in ram_options:
+                    ram_options.append(f"{ram_match.group(1)} GB")
+        logger.info(f"Found {len(ram_options)} RAM options: {ram_options}")
+        return ram_options
+
+    def _parse_storage_options(self, harvest: dict) -> List[str]:
+        storage_options = []
+        for _, text in harvest['texts']:
+            # Storage options read "256 GB" or "1 TB"; product names and RAM options mention sizes too
+            storage_match = re.fullmatch(r'(\d+)\s*(GB|TB)', text)
+            if storage_match:
+                value = f"{storage_match.group(1)} {storage_match.group(2)}"
+                if value not in storage_options:
+                    storage_options.append(value)
+        logger.info(f"Found {len(storage_options)} storage options: {storage_options}")
+        return storage_options
+
+    def _parse_os_options(self, harvest: dict) -> List[str]:
+        os_options = []
+        for _, text in harvest['texts']:
+            if 'iOS' in text and 'iOS' not in os_options:
+                os_options.append('iOS')
+            elif 'Android' in text and 'Android' not in os_options:
+                os_options.append('Android')
+        logger.info(f"Found {len(os_options)} OS options: {os_options}")
+        return os_options
+
+    def _parse_network_options(self, harvest: dict) -> List[str]:
+        network_options = []
+        for _, text in harvest['texts']:
+            if '5G' in text and '5G' not in network_options:
+                network_options.append('5G')
+            elif '4G' in text and '4G' not in network_options:
+                network_options.append('4G')
+        logger.info(f"Found {len(network_options)} network options: {network_options}")
+        return network_options
 
     def _build_filtered_url(self, config: PhoneConfiguration) -> str:
         """Build URL with filters applied"""
@@ -625,46 +483,43 @@ class FPTShopScraper:
                 
         logger.info(f"Pagination completed after {attempts} attempts")
 
+    SEARCH_AREA_SELECTORS = (
+        # Target the Samsung search results section specifically
+        "//div[contains(text(), 'Tìm thấy') and contains(text(), 'kết quả')]/following-sibling::div//a[contains(@href, '/dien-thoai/')]",
+        # Samsung results container 
+        "//button[text()='Samsung']/../..//div[contains(@class, 'generic')]//a[contains(@href, '/dien-thoai/')]",
+        # Main Samsung products section
+        "//div[contains(@class, 'generic') and .//strong[text()='24']]//a[contains(@href, '/dien-thoai/')]",
+        # Fallback: all product links in main content, filtered by position
+        "//main//a[contains(@href, '/dien-thoai/')]"
+    )
+
     def _get_search_area_products(self):
         """Get products ONLY from Samsung search results area, not carousel"""
-        search_selectors = [
-            # Target the Samsung search results section specifically
-            "//div[contains(text(), 'Tìm thấy') and contains(text(), 'kết quả')]/following-sibling::div//a[contains(@href, '/dien-thoai/')]",
-            # Samsung results container 
-            "//button[text()='Samsung']/../..//div[contains(@class, 'generic')]//a[contains(@href, '/dien-thoai/')]",
-            # Main Samsung products section
-            "//div[contains(@class, 'generic') and .//strong[text()='24']]//a[contains(@href, '/dien-thoai/')]",
-            # Fallback: all product links in main content, filtered by position
-            "//main//a[contains(@href, '/dien-thoai/')]"
-        ]
-        
-        for selector in search_selectors:
+        return selector_registry.first("FPTShop", "search_area", self.SEARCH_AREA_SELECTORS,
+                                       self._search_area_products) or []
+
+    def _search_area_products(self, selector: str) -> list:
+        elements = self.driver.find_elements(By.XPATH, selector)
+        if not elements:
+            return []
+        logger.info(f"Found {len(elements)} products using selector: {selector}")
+
+        # Filter by position to exclude carousel/banner items
+        filtered_elements = []
+        for elem in elements:
             try:
-                elements = self.driver.find_elements(By.XPATH, selector)
-                if elements:
-                    logger.info(f"Found {len(elements)} products using selector: {selector}")
-                    
-                    # Filter by position to exclude carousel/banner items
-                    filtered_elements = []
-                    for elem in elements:
-                        try:
-                            elem_location = elem.location
-                            # Only include elements in main content area (y > 1000)
-                            if elem_location['y'] > 1000:
-                                filtered_elements.append(elem)
-                        except:
-                            pass
-                    
-                    logger.info(f"After position filtering: {len(filtered_elements)} products")
-                    if filtered_elements:
-                        return filtered_elements
-            except Exception as e:
-                logger.warning(f"Error with selector '{selector}': {e}")
-                continue
-        
-        return []
+                elem_location = elem.location
+                # Only include elements in main content area (y > 1000)
+                if elem_location['y'] > 1000:
+                    filtered_elements.append(elem)
+            except:
+                pass
+
+        logger.info(f"After position filtering: {len(filtered_elements)} products")
+        return filtered_elements
 
-    def _extract_phones_from_search_area(self, target_brands: List[str]) -> List[Phone]:
+    def _extract_phones_from_search_area(self, target_brands: List[str]) -> List[Result]:
         """Extract phones from the main search results area (avoiding carousel ads)"""
         try:
             # Target the main product grid (avoiding carousels)
@@ -772,11 +627,7 @@ class FPTShopScraper:
                             logger.debug(f"FILTERED OUT (not {target_brands}): {name}")
                             continue
                     
-                    phones.append(Phone(
-                        name=name,
-                        price=price,
-                        url=url
-                    ))
+                    phones.append(Result("", name, price, url, [], source="FPT"))
                     
                 except Exception as e:
                     logger.debug(f"Error processing product element: {e}")
@@ -827,7 +678,7 @@ class FPTShopScraper:
                 
         return 'other'
 
-    def _extract_phone_info(self, element) -> Optional[Phone]:
+    def _extract_phone_info(self, element) -> Optional[Result]:
         """Extract phone information from product element"""
         try:
             name = ""
@@ -947,17 +798,7 @@ class FPTShopScraper:
             
             # Only return if we have meaningful data
             if name or url:
-                return Phone(
-                    name=name if name else "Unknown Phone",
-                    price=price,
-                    ram="N/A",
-                    storage="N/A", 
-                    screen="N/A",
-                    camera="N/A",
-                    battery="N/A",
-                    os="",
-                    url=url
-                )
+                return Result("", name if name else "Unknown Phone", price, url, [], source="FPT")
             else:
                 return None
                 
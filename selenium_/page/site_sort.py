@@ -0,0 +1,65 @@
+"""
+Site-side sorting of a product listing, shared by the page objects.
+
+Clicking the site's own sort option lets a scrape asking for the cheapest N
+phones stop paging after N items instead of loading the whole catalog.
+"""
+from typing import Optional, Sequence
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+SORTS = ("price_asc", "price_desc")
+
+# Clicks the first element whose own text is one of the labels (opening a "Xếp theo"
+# dropdown first when the option is hidden), then waits for the listing to change;
+# null when the listing did not change in time, so the caller does not trust the order.
+# arguments: labels (lowercase), listing selector, timeout (ms)
+SORT_SCRIPT = """
+    const [labels, listSelector, timeoutMs] = arguments;
+    const done = arguments[arguments.length - 1];
+    const textOf = (el) => (el.textContent || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+    const leaves = () => Array.from(document.querySelectorAll('a, button, span, p, li, div, label'))
+        .filter(el => el.children.length === 0 || ['A', 'BUTTON', 'LABEL'].includes(el.tagName));
+    const findOption = () => leaves().find(el => labels.includes(textOf(el)));
+    let option = findOption();
+    if (!option || option.offsetParent === null) {
+        const toggle = leaves().find(el => /^(xếp theo|sắp xếp)/.test(textOf(el)));
+        if (toggle) toggle.click();
+        option = findOption();
+    }
+    if (!option) return done(null);
+    const list = document.querySelector(listSelector);
+    const before = list ? list.innerHTML : '';
+    option.click();
+    const started = Date.now();
+    const poll = () => {
+        const now = document.querySelector(listSelector);
+        if (now && now.innerHTML !== before) return setTimeout(() => done(textOf(option)), 300);
+        if (Date.now() - started >= timeoutMs) return done(null);
+        setTimeout(poll, 100);
+    };
+    poll();
+"""
+
+
+def apply_site_sort(driver: WebDriver, labels: Sequence[str], list_selector: str,
+                    timeout: float = 5.0) -> Optional[str]:
+    """
+    Click the site's sort option; returns the label clicked, None when the site has
+    none or the listing was not re-sorted in time
+    """
+    if not labels:
+        return None
+    # Pooled drivers outlive this page, leave their script timeout as it was
+    original = None
+    try:
+        original = driver.timeouts.script
+        driver.set_script_timeout(timeout + 5)
+        return driver.execute_async_script(
+            SORT_SCRIPT, [label.lower() for label in labels], list_selector, int(timeout * 1000))
+    except Exception as e:
+        print(f"⚠️ Could not sort the listing on the site: {e}")
+        return None
+    finally:
+        if original is not None:
+            driver.set_script_timeout(original)
@@ -4,14 +4,26 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+import hashlib
+import math
+import os
 import time
 
-from selenium_.model.filter_list import FilterList
+from cache.item_cache import item_cache
+from cache.rate_limiter import rate_limiter
+from cache.selector_registry import selector_registry
+from selenium_.cancellation import ScrapeCancelled
+from selenium_.deadline import Deadline
+from selenium_.model.filter_list import filter_list
 from selenium_.model.phone_configuration import PhoneConfiguration
 from selenium_.model.result import Result
+from selenium_.page.site_sort import apply_site_sort
 
 class TGDD:
     PRODUCT_LOCATOR = (By.CSS_SELECTOR, "ul.listproduct li.item.ajaxed.__cate_42")
+    # Fallback chains, most specific first; selector_registry moves selectors that stopped matching last
+    PRICE_SELECTORS = ("strong.price", "span.price", "div.price")
+    DETAILS_SELECTORS = (".utility p", ".item-compare span")
     VIEW_RESULTS_LOCATOR = (
         By.XPATH,
         "//div[contains(@class, 'filter-button') and contains(@class, 'total')]//a[contains(@class, 'btn-filter-readmore')]"
@@ -23,41 +35,172 @@ class TGDD:
     STORAGE_FILTER_LOCATOR = (By.CSS_SELECTOR, ".filter-list.filter-list--dung-luong-luu-tru a")
     RESOLUTION_FILTER_LOCATOR = (By.CSS_SELECTOR, ".filter-list.filter-list--do-phan-giai a")
     REFRESH_RATE_FILTER_LOCATOR = (By.CSS_SELECTOR, ".filter-list.filter-list--tan-so-quet a")
+    # Name, price, specs and link of each item: what collect_product extracts
+    FINGERPRINT_SCRIPT = """
+        return Array.from(document.querySelectorAll(arguments[0])).map(function (li) {
+            var text = function (sel) {
+                return Array.from(li.querySelectorAll(sel)).map(function (e) { return e.textContent.trim(); }).join('|');
+            };
+            var link = li.querySelector('a.main-contain');
+            return [li.getAttribute('data-id'),
+                    [text('a.main-contain h3'), text('.price'), text('.utility p'), text('.item-compare span'),
+                     link ? link.getAttribute('href') : ''].join('#')];
+        });
+    """
+    BRAND_FILTER_SELECTOR = "div[class='filter-list filter-list--hang manu'] > a"
+    TOTAL_BADGE_SELECTOR = ".filter-button.total b.total-reloading"
+    # Clicks every wanted filter option in order, then waits for the total badge to settle.
+    # Options are looked up right before their click since the panel may re-render.
+    # When measuring, the badge also settles after each group of options (brand + price as
+    # "base", then each spec filter) and the group's total and latency are returned.
+    # arguments: targets [{label, group, selector, any: [[attr, mode, value], ...]}], gap between
+    # clicks, how long the badge must stay unchanged, overall timeout (ms), badge selector, measure
+    BATCH_FILTER_SCRIPT = """
+        const [targets, gapMs, settleMs, timeoutMs, badgeSelector, measure] = arguments;
+        const done = arguments[arguments.length - 1];
+        const norm = (s) => (s || '').trim();
+        const matches = (el, [attr, mode, value]) => {
+            const got = attr === 'text' ? norm(el.textContent) : norm(el.getAttribute(attr));
+            if (mode === 'contains') return got.toLowerCase().includes(value);
+            if (mode === 'lower') return got.toLowerCase() === value;
+            if (mode === 'nospace') return got.replace(/\\s/g, '') === value;
+            return got === value;
+        };
+        const find = (target) => {
+            const els = Array.from(document.querySelectorAll(target.selector));
+            for (const alt of target.any) {
+                const el = els.find(e => matches(e, alt));
+                if (el) return el;
+            }
+            return null;
+        };
+        const badge = () => {
+            const b = document.querySelector(badgeSelector);
+            const text = b ? norm(b.textContent) : '';
+            return /^\\d+$/.test(text) ? parseInt(text, 10) : null;
+        };
+        const busy = () => !!(window.jQuery && window.jQuery.active);
+        const clicked = [], missing = [], groups = [];
+        const initial = badge();
+        const started = Date.now();
+        let groupStarted = started;
+        const finish = (total, extra) => done(Object.assign(
+            {total: total, initial: initial, clicked: clicked, missing: missing, groups: groups}, extra));
+        // Calls then(total) once the badge has stayed unchanged for settleMs; the group's
+        // latency runs until the badge's last change
+        const settle = (group, then) => {
+            let last = badge(), since = Date.now();
+            const poll = () => {
+                const now = badge();
+                if (now !== last || busy()) { last = now; since = Date.now(); }
+                if (now !== null && Date.now() - since >= settleMs) {
+                    if (group) groups.push({group: group, total: now, ms: since - groupStarted});
+                    groupStarted = Date.now();
+                    return then(now);
+                }
+                if (Date.now() - started >= timeoutMs) return finish(now, {timed_out: true});
+                setTimeout(poll, 100);
+            };
+            poll();
+        };
+        const step = (i) => {
+            const group = i > 0 ? targets[i - 1].group : null;
+            if (i >= targets.length) return settle(measure && group, (total) => finish(total, {}));
+            if (measure && group && targets[i].group !== group) {
+                return settle(group, () => click(i));
+            }
+            click(i);
+        };
+        const click = (i) => {
+            const el = find(targets[i]);
+            if (!el) {
+                missing.push(targets[i].label);
+                return step(i + 1);
+            }
+            el.scrollIntoView({block: 'center'});
+            el.click();
+            clicked.push(targets[i].label);
+            setTimeout(() => step(i + 1), gapMs);
+        };
+        step(0);
+    """
+    # Clicks "Xem thêm" once and waits for the next page of items to arrive.
+    # arguments: item selector, button selector, how long the page may take (ms)
+    LOAD_PAGE_SCRIPT = """
+        const [itemSelector, moreSelector, timeoutMs] = arguments;
+        const done = arguments[arguments.length - 1];
+        const count = () => document.querySelectorAll(itemSelector).length;
+        const have = count();
+        const more = document.querySelector(moreSelector);
+        if (!more || more.offsetParent === null) return done({count: have, exhausted: true});
+        more.scrollIntoView({block: 'center'});
+        more.click();
+        const clickedAt = Date.now();
+        const arrived = () => {
+            const now = count();
+            if (now > have) return done({count: now});
+            if (Date.now() - clickedAt >= timeoutMs) return done({count: now, stalled: true});
+            setTimeout(arrived, 100);
+        };
+        arrived();
+    """
+    SORT_LABELS = {
+        "price_asc": ("Giá thấp đến cao",),
+        "price_desc": ("Giá cao đến thấp",),
+    }
+    PAGE_TIMEOUT = 10
+    BATCH_CLICK_GAP_MS = 150
+    BATCH_SETTLE_MS = 1200
+    BATCH_TIMEOUT = 20
 
     def __init__(self, driver: WebDriver):
         self.driver = driver
         self.js = driver
-        self.wait = WebDriverWait(self.driver, 10)
+        self.wait_timeout = 10
+        self.deadline = Deadline()
+        self.partial = False
         self.base_url = "https://www.thegioididong.com/"
         self.url = self.base_url + "dtdd"
         self.default_number = 20
         self.total_product = 0
+        # Top-N mode: stop paging and extracting after `limit` items, in `sort` order
+        self.limit = None
+        self.sort = None
+        self.sorted_on_site = False
+        # Total after brand + price, and (latency, total before, total after) per spec filter
+        self.base_total = None
+        self.filter_timings = {}
         self.results = []
         self.seen_ids = set()
-        self.filter_list = FilterList()
-
-    def run(self, phone: PhoneConfiguration, all_results: List[Result]) -> str:
+        self.filter_list = filter_list
+        # Reuse unchanged products from the previous scrape instead of re-extracting them
+        self.incremental = os.getenv('SCRAPE_INCREMENTAL', '1') == '1'
+        # Apply all filters in one in-page script instead of one round trip (and wait) each
+        self.batch_filters = os.getenv('TGDD_BATCH_FILTERS', '1') == '1'
+        # Batched filters also settle after each group to measure it; the scrape service turns
+        # this off once the query planner has enough samples
+        self.measure_filters = True
+
+    @property
+    def wait(self) -> WebDriverWait:
+        # Never wait past the request deadline
+        return WebDriverWait(self.driver, self.deadline.clamp(self.wait_timeout))
+
+    def run(self, phone: PhoneConfiguration, all_results: List[Result], deadline: Optional[Deadline] = None,
+            limit: Optional[int] = None, sort: Optional[str] = None) -> str:
         print("Starting run method with config:", str(phone))
+        self.deadline = deadline or Deadline()
+        self.partial = False
+        self.limit, self.sort = limit, sort
+        self.sorted_on_site = False
         try:
             self.connect(self.url)
             self.get_filter_elements()
             
-            # Apply filters theo thứ tự tối ưu: brand → price → specs
-            self.filter_brand(phone.get_brand())
-            time.sleep(1)  # Đợi brand filter apply
-            
-            self.filter_price(phone.get_price_range())
-            time.sleep(1)  # Đợi price filter apply
-            
-            self.filter_ram(phone.get_ram())
-            self.filter_storage(phone.get_storage())
-            self.filter_resolutions(phone.get_resolutions())
-            self.filter_refresh_rates(phone.get_refresh_rates())
-            
-            # Đợi tất cả filters apply xong
-            time.sleep(2)
-            
-            result_button, total_count = self.get_product_count()
+            applied = self.apply_filters_batched(phone, measure=self.measure_filters) if self.batch_filters else None
+            if applied is None:
+                applied = self.apply_filters_stepwise(phone)
+            result_button, total_count = applied
             self.total_product = total_count
             print(f"[TGDD] Total products found after all filters: {self.total_product}")
             
@@ -66,17 +209,176 @@ class TGDD:
                 return ""
                 
             self.click_view_products(result_button)
+            if sort:
+                self.sorted_on_site = apply_site_sort(
+                    self.driver, self.SORT_LABELS.get(sort, ()), self.LIST_CONTAINER_LOCATOR[1]) is not None
+                print(f"[TGDD] Sắp xếp {sort} trên trang: {'có' if self.sorted_on_site else 'không'}")
             self.load_all_product()
-            all_results.extend(self.get_results(phone))
+            self.deadline.raise_if_cancelled()
+            results = self.get_results(phone)
+            # Nobody reads the results of a cancelled scrape
+            self.deadline.raise_if_cancelled()
+            all_results.extend(results)
             self.print_results()
             return ""
+        except ScrapeCancelled as e:
+            print(f"[TGDD] {e}")
+            return str(e)
         except Exception as e:
             print("Error in run method:", str(e))
             return str(e)
         finally:
             print("Closing WebDriver")
 
+    def count(self, phone: PhoneConfiguration, deadline: Optional[Deadline] = None) -> Optional[int]:
+        """Apply the filters and read the filter total, without loading or extracting products"""
+        self.deadline = deadline or Deadline()
+        self.connect(self.url)
+        self.get_filter_elements()
+        applied = self.apply_filters_batched(phone) if self.batch_filters else None
+        if applied is None:
+            applied = self.apply_filters_stepwise(phone)
+        _, self.total_product = applied
+        print(f"[TGDD] Count for {phone}: {self.total_product}")
+        return self.total_product
+
+    def apply_filters_stepwise(self, phone: PhoneConfiguration):
+        """Apply the filters one by one; returns get_product_count()"""
+        # Apply filters theo thứ tự tối ưu: brand → price → specs
+        self.filter_brand(phone.get_brand())
+        self.deadline.sleep(1)  # Đợi brand filter apply
+        self.deadline.raise_if_cancelled()
+        
+        self.filter_price(phone.get_price_range())
+        self.deadline.sleep(1)  # Đợi price filter apply
+        self.deadline.raise_if_cancelled()
+        
+        # Spec filters are timed and their effect on the total measured for the query planner
+        self.base_total = self._read_filter_total()
+        count = self.base_total
+        for name, apply_filter, value in (
+            ("ram", self.filter_ram, phone.get_ram()),
+            ("storage", self.filter_storage, phone.get_storage()),
+            ("resolutions", self.filter_resolutions, phone.get_resolutions()),
+            ("refresh_rates", self.filter_refresh_rates, phone.get_refresh_rates()),
+        ):
+            if not value:
+                continue
+            started = time.monotonic()
+            apply_filter(value)
+            after = self._read_filter_total(previous=count)
+            self.filter_timings[name] = (time.monotonic() - started, count, after)
+            count = after if after is not None else count
+            self.deadline.raise_if_cancelled()
+        
+        # Đợi tất cả filters apply xong
+        self.deadline.sleep(2)
+        self.deadline.raise_if_cancelled()
+        
+        return self.get_product_count()
+
+    def _filter_targets(self, phone: PhoneConfiguration) -> List[dict]:
+        """The filter options the step-by-step methods would click, for BATCH_FILTER_SCRIPT"""
+        targets = []
+        for brand in phone.get_brand():
+            target = brand.lower().strip()
+            # Same rules as _brand_matches
+            match = ["data-name", "contains", "apple"] if target == "iphone (apple)" else ["data-name", "lower", target]
+            targets.append({"label": f"brand:{brand}", "group": "base", "selector": self.BRAND_FILTER_SELECTOR,
+                            "any": [match]})
+        if phone.get_price_range():
+            targets.append({"label": f"price:{phone.get_price_range()}", "group": "base",
+                            "selector": self.PRICE_FILTER_LOCATOR[1],
+                            "any": [["data-href", "exact", phone.get_price_range()]]})
+        if phone.get_ram():
+            value, operator = phone.get_ram()
+            for ram_value in self.filter_list.get_filtered_memory(value, operator, self.filter_list.ram_options):
+                targets.append({"label": f"ram:{ram_value}", "group": "ram",
+                                "selector": self.RAM_FILTER_LOCATOR[1],
+                                "any": [["text", "nospace", ram_value.replace(" ", "")]]})
+        if phone.get_storage():
+            value, operator = phone.get_storage()
+            for storage_value in self.filter_list.get_filtered_memory(value, operator, self.filter_list.storage_options):
+                targets.append({"label": f"storage:{storage_value}", "group": "storage",
+                                "selector": self.STORAGE_FILTER_LOCATOR[1],
+                                "any": [["text", "exact", storage_value]]})
+        for resolution in self.filter_list.get_filtered_resolutions(phone.get_resolutions()):
+            targets.append({"label": f"resolution:{resolution}", "group": "resolutions",
+                            "selector": self.RESOLUTION_FILTER_LOCATOR[1],
+                            "any": [["data-href", "exact", self._resolution_href(resolution)]]})
+        for refresh_rate in self.filter_list.get_filtered_refresh_rates(phone.get_refresh_rates()):
+            targets.append({"label": f"refresh_rate:{refresh_rate}", "group": "refresh_rates",
+                            "selector": self.REFRESH_RATE_FILTER_LOCATOR[1],
+                            "any": [["text", "exact", refresh_rate],
+                                    ["data-href", "exact", self._refresh_rate_href(refresh_rate)]]})
+        return targets
+
+    def apply_filters_batched(self, phone: PhoneConfiguration, measure: bool = False):
+        """
+        Apply every filter in one execute_async_script call and read the final total
+        once. Returns get_product_count()'s (result button, total), or None when the
+        script failed; the page is then reloaded for the step-by-step path.
+        With `measure`, the badge settles after each filter group so base_total and
+        filter_timings are filled as the step-by-step path does.
+        """
+        targets = self._filter_targets(phone)
+        if not targets:
+            return self.get_product_count()
+        timeout = self.deadline.clamp(self.BATCH_TIMEOUT)
+        started = time.monotonic()
+        original = None
+        try:
+            original = self.driver.timeouts.script
+            self.driver.set_script_timeout(timeout + 5)
+            outcome = self.driver.execute_async_script(
+                self.BATCH_FILTER_SCRIPT, targets, self.BATCH_CLICK_GAP_MS, self.BATCH_SETTLE_MS,
+                int(timeout * 1000), self.TOTAL_BADGE_SELECTOR, measure) or {}
+        except Exception as e:
+            print(f"[TGDD] Batched filters failed ({e}), applying them one by one")
+            self.deadline.raise_if_cancelled()
+            self.connect(self.url)
+            self.get_filter_elements()
+            return None
+        finally:
+            # Pooled drivers outlive this page, leave their script timeout as it was
+            if original is not None:
+                self.driver.set_script_timeout(original)
+        self.deadline.raise_if_cancelled()
+        print(f"[TGDD] Applied {len(outcome.get('clicked') or [])}/{len(targets)} filters in one batch "
+              f"({time.monotonic() - started:.1f}s)")
+        for label in outcome.get("missing") or []:
+            print(f"[TGDD] Không tìm thấy bộ lọc: {label}")
+        if measure:
+            self._record_groups(outcome)
+        total = outcome.get("total")
+        if total is None:
+            return self.get_product_count()
+        buttons = self.driver.find_elements(*self.VIEW_RESULTS_LOCATOR)
+        return (buttons[0] if buttons else None), int(total)
+
+    def _record_groups(self, outcome: dict):
+        """base_total and filter_timings from the per-group totals of a measured batch"""
+        # Without brand or price the base is the listing's own total
+        before = outcome.get("initial")
+        self.base_total = before
+        for group in outcome.get("groups") or []:
+            if group["group"] == "base":
+                self.base_total = before = group["total"]
+                continue
+            self.filter_timings[group["group"]] = (group["ms"] / 1000, before, group["total"])
+            before = group["total"]
+
+    def _acquire(self, url: str) -> bool:
+        """Wait for the shared rate limiter within the deadline; False when the slot comes too late"""
+        if rate_limiter.acquire(url, max_wait=self.deadline.remaining(), cancelled=self.deadline.expired):
+            return True
+        self.deadline.raise_if_cancelled()
+        self.partial = True
+        return False
+
     def connect(self, url: str):
+        if not self._acquire(url):
+            raise TimeoutException("không kịp lượt truy cập trang trước hạn chót")
         self.driver.get(url)
 
     def get_filter_elements(self):
@@ -176,13 +478,13 @@ class TGDD:
                     self.js.execute_script("arguments[0].click();", e)
                     
                     # Đợi URL thay đổi hoặc page update
-                    time.sleep(3)
+                    self.deadline.sleep(3)
                     url_after = self.driver.current_url
                     print(f"[TGDD] URL after price filter: {url_after}")
                     
                     # Đợi list container update
                     self.wait.until(EC.presence_of_element_located(self.LIST_CONTAINER_LOCATOR))
-                    time.sleep(2)  # Đợi thêm để content update
+                    self.deadline.sleep(2)  # Đợi thêm để content update
                     
                     print(f"[TGDD] Successfully applied price filter: {price_text}")
                     found = True
@@ -220,7 +522,7 @@ class TGDD:
                         self.scroll_to_element(e)
                         self.js.execute_script("arguments[0].click();", e)
                         print(f"Clicked RAM filter: {ram_value}")
-                        time.sleep(1)  # Allow page to update
+                        self.deadline.sleep(1)  # Allow page to update
                         self.wait.until(EC.presence_of_element_located(self.LIST_CONTAINER_LOCATOR))
                         found = True
                         break
@@ -254,7 +556,7 @@ class TGDD:
         try:
             valid_resolutions = self.filter_list.get_filtered_resolutions(resolutions)
             for resolution in valid_resolutions:
-                resolution_href = resolution.lower().replace(" ", "-").replace("+", "-plus").replace("(", "").replace(")", "")
+                resolution_href = self._resolution_href(resolution)
                 for e in self.driver.find_elements(*self.RESOLUTION_FILTER_LOCATOR):
                     if e.get_attribute("data-href") == resolution_href:
                         self.wait.until(EC.element_to_be_clickable(e))
@@ -280,10 +582,7 @@ class TGDD:
             valid_refresh_rates = self.filter_list.get_filtered_refresh_rates(refresh_rates)
             for refresh_rate in valid_refresh_rates:
                 # Use the mapping if available, else fallback to manual conversion
-                refresh_rate_href = href_mapping.get(
-                    refresh_rate,
-                    refresh_rate.lower().replace(" ", "-").replace("hz", "hz")  # Fallback: "120 Hz" -> "120-hz"
-                )
+                refresh_rate_href = href_mapping.get(refresh_rate, self._refresh_rate_href(refresh_rate))
                 print(f"Attempting to filter refresh rate: {refresh_rate} (href: {refresh_rate_href})")
                 for e in filter_elements:
                     if e.get_attribute("data-href") == refresh_rate_href:
@@ -291,7 +590,7 @@ class TGDD:
                         self.scroll_to_element(e)
                         self.js.execute_script("arguments[0].click();", e)
                         print(f"Clicked refresh rate filter: {refresh_rate}")
-                        time.sleep(1)  # Allow page to update
+                        self.deadline.sleep(1)  # Allow page to update
                         self.wait.until(EC.presence_of_element_located(self.LIST_CONTAINER_LOCATOR))
                         break
                 else:
@@ -301,6 +600,40 @@ class TGDD:
             raise  # Raise for debugging, revert to pass in production
 
 
+    @staticmethod
+    def _resolution_href(resolution: str) -> str:
+        return resolution.lower().replace(" ", "-").replace("+", "-plus").replace("(", "").replace(")", "")
+
+    @staticmethod
+    def _refresh_rate_href(refresh_rate: str) -> str:
+        # Fallback when the panel has no option with this text: "120 Hz" -> "120-hz"
+        return refresh_rate.lower().replace(" ", "-")
+
+    def _badge_total(self) -> Optional[int]:
+        """Number currently on the filter panel button, None while it is not shown"""
+        try:
+            for elem in self.driver.find_elements(By.CSS_SELECTOR, self.TOTAL_BADGE_SELECTOR):
+                text = elem.text.strip()
+                if text.isdigit():
+                    return int(text)
+        except Exception:
+            pass  # Badge re-rendered mid-read
+        return None
+
+    def _read_filter_total(self, previous: Optional[int] = None, timeout: float = 3.0) -> Optional[int]:
+        """
+        Total shown on the filter panel button once it has reloaded, None if unavailable.
+        With `previous` (the total before the last click) waits for the badge to change;
+        a filter that removes nothing leaves it unchanged, read once the wait runs out.
+        """
+        try:
+            def total(driver):
+                now = self._badge_total()
+                return now if now is not None and now != previous else False
+            return WebDriverWait(self.driver, self.deadline.clamp(timeout)).until(total)
+        except Exception:
+            return self._badge_total() if previous is not None else None
+
     def get_product_count(self):
         try:
             result_button = self.wait.until(EC.presence_of_element_located(self.VIEW_RESULTS_LOCATOR))
@@ -314,15 +647,15 @@ class TGDD:
             total_count = int(total_text_elem.text.strip())
             return result_button, total_count
         except:
-            product_items = self.driver.find_elements(*self.PRODUCT_LOCATOR)
-            return None, len(product_items)
+            # The cards listed so far are not the filter total; unknown, so nothing caches it
+            return None, None
 
     def click_view_products(self, result_button):
         try:
             if result_button:
                 self.wait.until(EC.element_to_be_clickable(self.VIEW_RESULTS_LOCATOR))
                 print("Waiting 1-2 seconds before clicking 'Xem kết quả' button")
-                time.sleep(1)
+                self.deadline.sleep(1)
                 self.scroll_to_element(result_button)
                 self.js.execute_script("arguments[0].click();", result_button)
                 self.wait.until(EC.presence_of_element_located(self.LIST_CONTAINER_LOCATOR))
@@ -330,59 +663,121 @@ class TGDD:
             print(f"Error clicking view products: {str(e)}")
             raise
 
+    def _wanted(self) -> Optional[int]:
+        """
+        Items to load and extract: the filter total, capped by the limit when the
+        listing is in the requested order (otherwise the top N could be on any page).
+        None when the site showed no total and there is no usable limit.
+        """
+        if self.limit and (not self.sort or self.sorted_on_site):
+            return self.limit if self.total_product is None else min(self.total_product, self.limit)
+        return self.total_product
+
     def load_all_product(self):
-        time.sleep(2)
-        if self.total_product <= 0:
+        if self.total_product == 0:
             print("Không có sản phẩm để tải.")
             return
         try:
+            self.wait.until(EC.presence_of_element_located(self.PRODUCT_LOCATOR))
             current = len(self.driver.find_elements(*self.PRODUCT_LOCATOR))
-            target = self.total_product
-            attempts_without_growth = 0
-            max_attempts = 5
-            print(f"Bắt đầu tải sản phẩm. Hiện tại: {current}, Mục tiêu: {target}")
-
-            if target <= self.default_number:
-                print(f"Số sản phẩm ({target}) nhỏ hơn hoặc bằng {self.default_number}, không cần tải thêm.")
+            target = self._wanted()
+            if target is None:
+                # No total shown: page until the site has no "Xem thêm" left
+                target = pages = math.inf
+                print(f"Bắt đầu tải sản phẩm. Hiện tại: {current}, chưa rõ tổng số")
+            elif current >= target:
+                print(f"Đã có đủ {current}/{target} sản phẩm, không cần tải thêm.")
                 return
+            else:
+                # The filter total is exact, so the number of "Xem thêm" pages is known up front
+                pages = math.ceil((target - current) / self.default_number)
+                print(f"Bắt đầu tải sản phẩm. Hiện tại: {current}, Mục tiêu: {target}, cần {pages} trang")
+
+            loaded = self._load_pages_in_page(target, pages)
+            if loaded is None:
+                loaded = self._load_pages_by_click(current, target, pages)
+            if loaded < target and self.deadline.expired():
+                self.partial = True
+            print(f"Tải hoàn tất với {loaded} sản phẩm")
+        except Exception as e:
+            print(f"Lỗi khi tải sản phẩm: {str(e)}")
 
-            while current < target:
+    def _load_pages_in_page(self, target: int, pages: int) -> Optional[int]:
+        """
+        Load the remaining pages with one execute_async_script call each (click and wait
+        for the items inside the browser), every page taking its own token from the
+        shared rate limiter. Returns the number of listed items, None if the script
+        failed before any page was loaded.
+        """
+        count = len(self.driver.find_elements(*self.PRODUCT_LOCATOR))
+        clicks = 0
+        original = None
+        try:
+            original = self.driver.timeouts.script
+            while count < target and clicks < pages:
+                if self.deadline.expired():
+                    break
+                if not self._acquire(self.base_url):
+                    print(f"Không kịp lượt tải trang tiếp theo trước hạn chót, dừng với {count}/{target} sản phẩm")
+                    break
+                timeout = self.deadline.clamp(self.PAGE_TIMEOUT)
                 try:
-                    more_btns = self.driver.find_elements(*self.SEE_MORE_LINK)
-                    if more_btns and more_btns[0].is_displayed() and more_btns[0].is_enabled():
-                        print("Nhấp nút 'Xem thêm'")
-                        self.scroll_to_element(more_btns[0])
-                        self.js.execute_script("arguments[0].click();", more_btns[0])
-                        self.wait.until(EC.presence_of_element_located(self.LIST_CONTAINER_LOCATOR))
-                        time.sleep(2)
-                    else:
-                        print("Không tìm thấy hoặc không nhấp được nút 'Xem thêm'")
-                        attempts_without_growth += 1
-                        if attempts_without_growth >= max_attempts:
-                            print(f"Dừng tải vì không có sản phẩm mới sau {max_attempts} lần thử.")
-                            break
+                    self.driver.set_script_timeout(timeout + 5)
+                    outcome = self.driver.execute_async_script(
+                        self.LOAD_PAGE_SCRIPT, self.PRODUCT_LOCATOR[1], self.SEE_MORE_LINK[1], int(timeout * 1000)) or {}
                 except Exception as e:
-                    print(f"Lỗi khi nhấp nút 'Xem thêm': {str(e)}")
-                    attempts_without_growth += 1
-                    if attempts_without_growth >= max_attempts:
-                        print(f"Dừng tải vì không có sản phẩm mới sau {max_attempts} lần thử.")
-                        break
-
-                self.js.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                new_count = len(self.driver.find_elements(*self.PRODUCT_LOCATOR))
-                print(f"Số sản phẩm hiện tại: {new_count}")
-                if new_count <= current:
-                    attempts_without_growth += 1
-                    if attempts_without_growth >= max_attempts:
-                        print(f"Dừng tải vì không có sản phẩm mới sau {max_attempts} lần thử.")
-                        break
-                else:
-                    attempts_without_growth = 0
-                    current = new_count
-            print(f"Tải hoàn tất với {current} sản phẩm")
-        except Exception as e:
-            print(f"Lỗi khi tải sản phẩm: {str(e)}")
+                    if clicks == 0:
+                        print(f"Lỗi khi tải trang trong trình duyệt ({e}), chuyển sang nhấp từng trang")
+                        return None
+                    print(f"Lỗi khi tải trang trong trình duyệt ({e}), dừng tải")
+                    break
+                clicks += 1
+                count = int(outcome.get("count") or count)
+                if outcome.get("exhausted") or outcome.get("stalled"):
+                    print("Trang không trả thêm sản phẩm trước khi đạt tổng số")
+                    break
+        finally:
+            # Pooled drivers outlive this page, leave their script timeout as it was
+            if original is not None:
+                self.driver.set_script_timeout(original)
+        print(f"Đã nhấp 'Xem thêm' {clicks}/{pages} lần, có {count}/{target} sản phẩm")
+        return count
+
+    def _load_pages_by_click(self, current: int, target: int, pages: int) -> int:
+        """Click "Xem thêm" from Python, each click waiting for the next page to arrive"""
+        attempts_without_growth = 0
+        max_attempts = 3
+        clicks = 0
+        while current < target and clicks < pages + max_attempts:
+            if self.deadline.expired():
+                reason = "Đã hủy" if self.deadline.cancelled() else "Hết thời gian cho phép"
+                print(f"{reason}, dừng tải với {current}/{target} sản phẩm")
+                self.partial = True
+                break
+            try:
+                more_btns = self.driver.find_elements(*self.SEE_MORE_LINK)
+                if not (more_btns and more_btns[0].is_displayed() and more_btns[0].is_enabled()):
+                    raise TimeoutException("không tìm thấy nút 'Xem thêm'")
+                if not self._acquire(self.base_url):
+                    print(f"Không kịp lượt tải trang tiếp theo trước hạn chót, dừng với {current}/{target} sản phẩm")
+                    break
+                self.scroll_to_element(more_btns[0])
+                self.js.execute_script("arguments[0].click();", more_btns[0])
+                clicks += 1
+                before = current
+                WebDriverWait(self.driver, self.deadline.clamp(self.PAGE_TIMEOUT)).until(
+                    lambda d: len(d.find_elements(*self.PRODUCT_LOCATOR)) > before)
+                current = len(self.driver.find_elements(*self.PRODUCT_LOCATOR))
+                attempts_without_growth = 0
+                print(f"Số sản phẩm hiện tại: {current}")
+            except Exception as e:
+                attempts_without_growth += 1
+                print(f"Không tải thêm được sản phẩm ({attempts_without_growth}/{max_attempts}): {str(e)}")
+                if attempts_without_growth >= max_attempts:
+                    print(f"Dừng tải vì không có sản phẩm mới sau {max_attempts} lần thử.")
+                    break
+                self.deadline.sleep(1)
+        return current
 
     def _abs_url(self, url: str) -> str:
         if not url:
@@ -441,37 +836,23 @@ class TGDD:
             except Exception as e:
                 print(f"Lỗi lấy liên kết cho {name}: {str(e)}")
 
-            price = "Không có thông tin"
-            try:
-                for selector in [
-                    "strong.price",
-                    "span.price",
-                    "div.price"
-                ]:
-                    try:
-                        price_elem = element.find_element(By.CSS_SELECTOR, selector)
-                        price = price_elem.text.strip() if price_elem.text.strip() else "Không có thông tin"
-                        if price != "Không có thông tin":
-                            break
-                    except:
-                        continue
-                if price == "Không có thông tin":
-                    print(f"Không tìm thấy giá cho {name} với các bộ chọn đã thử")
-            except Exception as e:
-                print(f"Lỗi lấy giá cho {name}: {str(e)}")
-
-            details = []
-            try:
-                details = [p.text.strip() for p in element.find_elements(By.CSS_SELECTOR, ".utility p") if p.text.strip()]
-                if not details:
-                    print(f"Không tìm thấy thông số trong .utility p cho {name}, thử bộ chọn khác")
-                    details = [p.text.strip() for p in element.find_elements(By.CSS_SELECTOR, ".item-compare span") if p.text.strip()]
-                if not details:
-                    print(f"Vẫn không tìm thấy thông số cho {name}")
-            except Exception as e:
-                print(f"Lỗi lấy thông số cho {name}: {str(e)}")
-
-            self.results.append(Result(img_url, name, price, link, details))
+            # find_elements: a selector that does not match costs no exception
+            price = selector_registry.first(
+                "TGDD", "price", self.PRICE_SELECTORS,
+                lambda selector: next((e.text.strip() for e in element.find_elements(By.CSS_SELECTOR, selector)
+                                       if e.text.strip()), None),
+            ) or "Không có thông tin"
+            if price == "Không có thông tin":
+                print(f"Không tìm thấy giá cho {name} với các bộ chọn đã thử")
+
+            details = selector_registry.first(
+                "TGDD", "details", self.DETAILS_SELECTORS,
+                lambda selector: [p.text.strip() for p in element.find_elements(By.CSS_SELECTOR, selector) if p.text.strip()],
+            ) or []
+            if not details:
+                print(f"Không tìm thấy thông số cho {name}")
+
+            self.results.append(Result(img_url, name, price, link, details, source="TGDD", source_id=data_id))
             print(f"Đã thêm sản phẩm: {name}, Giá: {price}, Link: {link}, Hình ảnh: {img_url}, Thông số: {details}")
         except StaleElementReferenceException:
             print(f"Phần tử cũ cho sản phẩm: {name}")
@@ -484,10 +865,34 @@ class TGDD:
         try:
             self.load_all_product()
             self.js.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            self._wait_for_product_list_stable(self.total_product)
+            self._wait_for_product_list_stable(self._wanted())
             result_elements = self.driver.find_elements(*self.PRODUCT_LOCATOR)
             print(f"Tìm thấy {len(result_elements)} sản phẩm trong ul.listproduct")
+            fingerprints = self._fingerprint_items(len(result_elements)) if self.incremental else []
+            wanted = self._wanted()
+            if wanted is not None and wanted < len(result_elements):
+                # Top-N: the listing is in the requested order, the rest is not needed
+                result_elements = result_elements[:wanted]
+                fingerprints = fingerprints[:wanted]
+            cached = item_cache.get_many("TGDD", [data_id for data_id, _ in fingerprints])
+            extracted = []
+            reused = 0
             for i, element in enumerate(result_elements, 1):
+                if self.deadline.expired():
+                    reason = "Đã hủy" if self.deadline.cancelled() else "Hết thời gian cho phép"
+                    print(f"{reason}, dừng thu thập ở sản phẩm {i}/{len(result_elements)}")
+                    self.partial = True
+                    break
+                data_id, fingerprint = fingerprints[i - 1] if fingerprints else ("", "")
+                hit = cached.get(data_id)
+                if hit and hit["fingerprint"] == fingerprint:
+                    # Unchanged since the last scrape: reuse it without touching the element
+                    if data_id not in self.seen_ids:
+                        self.seen_ids.add(data_id)
+                        self.results.append(Result.from_dict(hit["result"]))
+                        reused += 1
+                    continue
+                count_before = len(self.results)
                 try:
                     name = "Không có tên"
                     try:
@@ -507,13 +912,33 @@ class TGDD:
                         print(f"Không thể tìm lại sản phẩm {name}")
                 except Exception as e:
                     print(f"Lỗi xử lý sản phẩm số {i}: {str(e)}")
+                if data_id and len(self.results) > count_before:
+                    extracted.append((data_id, fingerprint, self.results[-1].to_dict()))
+            item_cache.set_many("TGDD", extracted)
+            selector_registry.flush()
+            if self.incremental:
+                print(f"Dùng lại {reused} sản phẩm không đổi, trích xuất {len(extracted)} sản phẩm mới/thay đổi")
             print(f"Tổng cộng thu thập được {len(self.results)} sản phẩm")
         except Exception as e:
             print(f"Lỗi trong get_results: {str(e)}")
         return self.results
 
-    def _wait_for_product_list_stable(self, expected_total: int, timeout: float = 20.0, poll: float = 0.5):
-        end = time.time() + timeout
+    def _fingerprint_items(self, expected: int) -> List[Tuple[str, str]]:
+        """
+        (data-id, fingerprint) of every listed item in one in-browser pass, in the
+        same order as find_elements(PRODUCT_LOCATOR); empty if the list changed meanwhile
+        """
+        try:
+            items = self.js.execute_script(self.FINGERPRINT_SCRIPT, self.PRODUCT_LOCATOR[1]) or []
+        except Exception as e:
+            print(f"Không tính được fingerprint sản phẩm: {str(e)}")
+            return []
+        if len(items) != expected:
+            return []
+        return [(data_id or "", hashlib.sha1(text.encode("utf-8")).hexdigest()) for data_id, text in items]
+
+    def _wait_for_product_list_stable(self, expected_total: Optional[int], timeout: float = 20.0, poll: float = 0.5):
+        end = time.time() + self.deadline.clamp(timeout)
         last = -1
         stable_ticks = 0
         try:
@@ -530,13 +955,17 @@ class TGDD:
                     stable_ticks = 0
                 else:
                     stable_ticks += 1
-                if (expected_total == 0 or count >= expected_total) and stable_ticks >= int(2.0 / poll):
+                # The filter total is exact: every product is listed, nothing more will arrive
+                if expected_total and count >= expected_total:
+                    print(f"Đã có đủ {count}/{expected_total} sản phẩm")
+                    return
+                if not expected_total and stable_ticks >= int(2.0 / poll):
                     print(f"Danh sách sản phẩm ổn định với {count} sản phẩm")
                     return
-                time.sleep(poll)
+                self.deadline.sleep(poll)
             except Exception as e:
                 print(f"Lỗi khi kiểm tra danh sách sản phẩm: {str(e)}")
-                time.sleep(poll)
+                self.deadline.sleep(poll)
 
     def _print_product(self, r: Result, idx: int):
         print(f"[{idx}] {r.name}")
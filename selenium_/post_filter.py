@@ -0,0 +1,110 @@
+"""
+Local post-filtering: checks every scraped product against the full configuration.
+
+Site filters are coarser than ours (FPT maps 64 and 128 GB to "≤128 GB", merges
+1.5K and 1.5K+, approximates RAM), so products are re-checked on their parsed
+fields before dedup. A field the card does not show only excludes a product when
+its filter was left off the site (QueryPlanner), since then nothing else vouches for it.
+"""
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from selenium_.model.filter_list import FilterList, filter_list as default_filter_list
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.model.result import Result
+
+Predicate = Callable[[Result], bool]
+
+# Words of the product name that identify each brand (lower case)
+BRAND_KEYWORDS = {
+    "iPhone (Apple)": ("iphone", "apple"),
+}
+
+
+def _compare(value: float, operator: str, target: float) -> bool:
+    if operator == ">=":
+        return value >= target
+    if operator == "<=":
+        return value <= target
+    return value == target
+
+
+class PostFilter:
+    def __init__(self, phone: PhoneConfiguration, filter_list: Optional[FilterList] = None,
+                 strict: Iterable[str] = ()):
+        """`strict`: the spec filters (QueryPlanner names) that were not applied on the site"""
+        self.filter_list = filter_list or default_filter_list
+        self.strict = frozenset(strict)
+        self.predicates: List[Tuple[str, Predicate]] = []
+        self._build(phone)
+
+    def _brand_keywords(self, brand: str) -> Tuple[str, ...]:
+        return BRAND_KEYWORDS.get(brand, (brand.lower(),))
+
+    def _build(self, phone: PhoneConfiguration):
+        """Compile the configuration into one predicate per constrained field"""
+        if phone.get_brand():
+            selected = {kw for b in phone.get_brand() for kw in self._brand_keywords(b)}
+            others = {kw for b in self.filter_list.get_brands() for kw in self._brand_keywords(b)} - selected
+
+            def brand_ok(r: Result) -> bool:
+                words = set((r.name or "").lower().split())
+                # Unknown brand names are kept, only another known brand excludes
+                return bool(words & selected) or not (words & others)
+
+            self.predicates.append(("brand", brand_ok))
+
+        price_range = self.filter_list.get_price_range(phone.get_price_range())
+        if price_range:
+            low, high = int(price_range["data-from"]), int(price_range["data-to"])
+
+            def price_ok(r: Result) -> bool:
+                if r.price_vnd is None:
+                    return True
+                return (low < 0 or r.price_vnd >= low) and (high < 0 or r.price_vnd <= high)
+
+            self.predicates.append(("price", price_ok))
+
+        for name, field, constraint in (("ram", "ram_gb", phone.get_ram()),
+                                        ("storage", "storage_gb", phone.get_storage())):
+            if not constraint:
+                continue
+            value, operator = constraint
+            try:
+                target = self.filter_list._parse_memory_value(value)
+            except ValueError:
+                continue
+
+            def memory_ok(r: Result, field=field, operator=operator, target=target,
+                          missing_ok=name not in self.strict) -> bool:
+                size = getattr(r, field)
+                return missing_ok if size is None else _compare(size, operator, target)
+
+            self.predicates.append((field, memory_ok))
+
+        resolutions = set(self.filter_list.get_filtered_resolutions(phone.get_resolutions()))
+        if resolutions:
+            self.predicates.append(("resolution", lambda r, missing_ok="resolutions" not in self.strict:
+                                    missing_ok if r.resolution is None else r.resolution in resolutions))
+
+        rates = {int(r.split()[0]) for r in self.filter_list.get_filtered_refresh_rates(phone.get_refresh_rates())}
+        if rates:
+            # The top option is a floor on FPT ("Trên 144 Hz")
+            top = max(int(r.split()[0]) for r in self.filter_list.get_refresh_rate_options())
+            missing_ok = "refresh_rates" not in self.strict
+
+            def refresh_ok(r: Result) -> bool:
+                hz = r.refresh_rate_hz
+                if hz is None:
+                    return missing_ok
+                return hz in rates or (top in rates and hz >= top)
+
+            self.predicates.append(("refresh_rate", refresh_ok))
+
+    def matches(self, result: Result) -> bool:
+        return all(predicate(result) for _, predicate in self.predicates)
+
+    def apply(self, results: List[Result]) -> List[Result]:
+        """Products satisfying every constraint, in their original order"""
+        if not self.predicates:
+            return results
+        return [r for r in results if self.matches(r)]
@@ -0,0 +1,170 @@
+"""
+Cross-retailer product identity: groups the TGDD and FPT listings of the same model.
+
+Names are normalized into a canonical key (brand aliases merged, colour words and
+filler dropped, memory sizes taken from the parsed fields). Listings with equal keys
+are the same product; the remaining ones are compared only within a block of the
+same brand and model number, so matching stays roughly linear. The network (5G/4G)
+and storage are often left out of a name: they only tell listings apart when both
+name them.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from selenium_.model.filter_list import filter_list
+from selenium_.model.result import Result
+
+_TOKEN_RE = re.compile(r"[a-z0-9+]+")
+_MEMORY_RE = re.compile(r"^\d+(?:gb|tb)$|^\d+gb\d+gb$")
+
+COLOUR_WORDS = {
+    "den", "trang", "xanh", "duong", "la", "tim", "vang", "hong", "bac", "xam", "do", "cam", "kem",
+    "titan", "tu", "nhien", "sa", "mac", "ngoc", "bich", "reu", "nhat", "dam",
+    "black", "white", "blue", "green", "purple", "violet", "gold", "silver", "gray", "grey",
+    "pink", "red", "orange", "yellow", "natural", "titanium", "desert", "midnight", "starlight",
+}
+FILLER_WORDS = {"dien", "thoai", "chinh", "hang", "vn", "a", "moi", "new"}
+# Tokens that distinguish models and must agree for a fuzzy match
+VARIANT_WORDS = {"pro", "max", "plus", "ultra", "lite", "mini", "fe", "edge", "neo", "prime", "flip", "fold", "e"}
+NETWORK_WORDS = {"5g", "4g", "lte"}
+SIMILARITY_THRESHOLD = 0.6
+
+
+def _fold(text: str) -> str:
+    """Lower case without Vietnamese diacritics ("Điện thoại" -> "dien thoai")"""
+    text = text.lower().replace("đ", "d")
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def _brand_aliases() -> Dict[str, str]:
+    """Folded brand word -> canonical (TGDD) brand, FPT names included"""
+    aliases = {}
+    for brand in filter_list.get_brands():
+        for name in (brand, filter_list.BRAND_TGDD_TO_FPT.get(brand, brand)):
+            for token in _TOKEN_RE.findall(_fold(name)):
+                aliases.setdefault(token, brand)
+    return aliases
+
+
+BRAND_ALIASES = _brand_aliases()
+
+
+class ProductKey:
+    __slots__ = ("brand", "model_tokens", "network", "storage_gb", "key", "block")
+
+    def __init__(self, result: Result):
+        tokens = _TOKEN_RE.findall(_fold(result.name or ""))
+        self.brand = next((BRAND_ALIASES[t] for t in tokens if t in BRAND_ALIASES), "")
+        # "iphone" names the product line as well as the brand, keep it in the model
+        self.model_tokens = tuple(
+            t for t in tokens
+            if (t not in BRAND_ALIASES or t == "iphone")
+            and t not in COLOUR_WORDS and t not in FILLER_WORDS and t not in NETWORK_WORDS
+            and not _MEMORY_RE.match(t)
+        )
+        self.network = next((t for t in tokens if t in NETWORK_WORDS), "")
+        self.storage_gb = result.storage_gb
+        storage = f"{self.storage_gb:g}" if self.storage_gb is not None else ""
+        self.key = f"{self.brand}|{' '.join(self.model_tokens)}|{self.network}|{storage}"
+        model_number = next((t for t in self.model_tokens if any(c.isdigit() for c in t)),
+                            self.model_tokens[0] if self.model_tokens else "")
+        self.block = (self.brand, model_number)
+
+    def variant(self) -> Set[str]:
+        return {t for t in self.model_tokens if t in VARIANT_WORDS or any(c.isdigit() for c in t)}
+
+
+def _compatible(a, b) -> bool:
+    """Equal, or left out of one of the names"""
+    return not a or not b or a == b
+
+
+def _similar(a: ProductKey, b: ProductKey) -> bool:
+    if a.variant() != b.variant() or not _compatible(a.network, b.network):
+        return False
+    if not _compatible(a.storage_gb, b.storage_gb):
+        return False
+    ta, tb = set(a.model_tokens), set(b.model_tokens)
+    return len(ta & tb) / max(1, len(ta | tb)) >= SIMILARITY_THRESHOLD
+
+
+class ProductGroup:
+    """One model with its offers from every source"""
+
+    def __init__(self, key: ProductKey, offers: List[Result]):
+        self.key = key
+        self.offers = sorted(offers, key=lambda r: (r.price_vnd is None, r.price_vnd or 0))
+
+    @property
+    def best_price_vnd(self) -> Optional[int]:
+        return self.offers[0].price_vnd if self.offers else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        best = self.offers[0]
+        return {
+            "key": self.key.key,
+            "name": best.name,
+            "brand": self.key.brand,
+            "storage_gb": self.key.storage_gb,
+            "ram_gb": best.ram_gb,
+            "best_price_vnd": self.best_price_vnd,
+            "sources": sorted({r.source for r in self.offers if r.source}),
+            "offers": [
+                {
+                    "source": r.source,
+                    "source_id": r.source_id,
+                    "name": r.name,
+                    "price": r.price,
+                    "price_vnd": r.price_vnd,
+                    "product_link": r.product_link,
+                }
+                for r in self.offers
+            ],
+        }
+
+
+def group_offers(results: List[Result]) -> List[ProductGroup]:
+    """Group listings of the same model across sources, cheapest groups first"""
+    keys = [ProductKey(r) for r in results]
+
+    # Exact canonical keys first
+    by_key: Dict[str, List[int]] = {}
+    for i, k in enumerate(keys):
+        by_key.setdefault(k.key, []).append(i)
+
+    # Then fuzzy merging of the distinct keys, only within a block
+    blocks: Dict[Tuple[str, str], List[str]] = {}
+    for key, members in by_key.items():
+        blocks.setdefault(keys[members[0]].block, []).append(key)
+    parent = {key: key for key in by_key}
+
+    def find(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def key_of(key: str) -> ProductKey:
+        return keys[by_key[key][0]]
+
+    for block_keys in blocks.values():
+        known = [k for k in block_keys if key_of(k).storage_gb is not None]
+        unknown = [k for k in block_keys if key_of(k).storage_gb is None]
+        for group in (known, unknown):
+            for i, a in enumerate(group):
+                for b in group[i + 1:]:
+                    if find(a) != find(b) and _similar(key_of(a), key_of(b)):
+                        parent[find(b)] = find(a)
+        # A name without storage joins a model only when a single storage size matches,
+        # it must not chain the 128 GB and 256 GB groups together
+        for a in unknown:
+            matches = {find(b) for b in known if _similar(key_of(a), key_of(b))}
+            if len(matches) == 1:
+                parent[find(a)] = matches.pop()
+
+    merged: Dict[str, List[int]] = {}
+    for key, members in by_key.items():
+        merged.setdefault(find(key), []).extend(members)
+    groups = [ProductGroup(keys[members[0]], [results[i] for i in members]) for members in merged.values()]
+    return sorted(groups, key=lambda g: (g.best_price_vnd is None, g.best_price_vnd or 0))
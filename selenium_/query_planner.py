@@ -0,0 +1,118 @@
+"""
+Chooses which spec filters to click on the site and which to leave to the local post-filter
+"""
+import itertools
+import logging
+import math
+import random
+from typing import Dict, List, NamedTuple, Tuple
+
+from cache.scrape_stats import ScrapeStats
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.query_splitter import QuerySplitter
+
+logger = logging.getLogger(__name__)
+
+# Spec filters that PostFilter can enforce on its own; brand and price stay on-site
+PLANNABLE_FILTERS = ("ram", "storage", "resolutions", "refresh_rates")
+CLEARED = {"ram": None, "storage": None, "resolutions": [], "refresh_rates": []}
+
+
+class QueryPlan(NamedTuple):
+    site_config: PhoneConfiguration  # What the scraper applies on the site
+    on_site: Tuple[str, ...]
+    local: Tuple[str, ...]
+    estimated_seconds: float
+
+    def __str__(self) -> str:
+        return (f"on-site={list(self.on_site) or '-'} local={list(self.local) or '-'} "
+                f"est={self.estimated_seconds:.1f}s")
+
+
+class QueryPlanner:
+    """
+    Cost model (seconds): every on-site filter costs its measured click latency;
+    every product left after the on-site filters costs paging ("Xem thêm") plus
+    extraction. A filter is moved to the local post-filter when clicking it
+    takes longer than the products it would remove.
+
+    Filters with fewer than MIN_SAMPLES measurements stay on-site, which is both
+    the safe default and how their statistics get collected.
+    """
+
+    PRODUCT_COST = 0.25
+    MIN_SAMPLES = 3
+    # Assumed for filters that have not been measured yet
+    DEFAULT_LATENCY = 2.0
+    DEFAULT_SELECTIVITY = 0.5
+    # Share of scrapes that re-measure well-sampled filters, so the estimates follow the site
+    REMEASURE_RATE = 0.1
+
+    def __init__(self, stats: ScrapeStats):
+        self.stats = stats
+
+    @staticmethod
+    def _active_filters(phone: PhoneConfiguration) -> List[str]:
+        values = {
+            "ram": phone.get_ram(),
+            "storage": phone.get_storage(),
+            "resolutions": phone.get_resolutions(),
+            "refresh_rates": phone.get_refresh_rates(),
+        }
+        return [name for name in PLANNABLE_FILTERS if values[name]]
+
+    def _base_count(self, source: str, phone: PhoneConfiguration) -> int:
+        """Expected products with only brand and price applied"""
+        base = phone.replace(**CLEARED)
+        count = self.stats.expected_count(source, base.cache_key())
+        if count is not None:
+            return count
+        brands = phone.get_brand()
+        if brands:
+            return QuerySplitter.DEFAULT_BRAND_COUNT * len(brands)
+        return QuerySplitter.DEFAULT_CATALOG_COUNT
+
+    def _cost(self, on_site: Tuple[str, ...], base_count: int, filters: Dict[str, Dict[str, float]]) -> float:
+        per_product = self.PRODUCT_COST + QuerySplitter.PAGE_COST / QuerySplitter.PAGE_SIZE
+        remaining = base_count * math.prod(filters[f]["selectivity"] for f in on_site)
+        return sum(filters[f]["latency"] for f in on_site) + remaining * per_product
+
+    def needs_measurement(self, source: str, phone: PhoneConfiguration) -> bool:
+        """Whether a scrape applying `phone` on the site should measure its filters"""
+        active = self._active_filters(phone)
+        if not active:
+            return False
+        stats = self.stats.filter_stats(source)
+        if any(stats.get(name, {}).get("samples", 0) < self.MIN_SAMPLES for name in active):
+            return True
+        if self.stats.expected_count(source, phone.replace(**CLEARED).cache_key()) is None:
+            return True
+        return random.random() < self.REMEASURE_RATE
+
+    def plan(self, source: str, phone: PhoneConfiguration) -> QueryPlan:
+        active = self._active_filters(phone)
+        stats = self.stats.filter_stats(source)
+        measured = {
+            name: stats[name] for name in active
+            if stats.get(name, {}).get("samples", 0) >= self.MIN_SAMPLES and "latency" in stats[name]
+        }
+        forced = tuple(name for name in active if name not in measured)
+        filters = dict(measured)
+        for name in forced:
+            filters[name] = {"latency": self.DEFAULT_LATENCY, "selectivity": self.DEFAULT_SELECTIVITY}
+        base_count = self._base_count(source, phone)
+
+        # At most 4 plannable filters: 16 candidate plans, enumerate them all
+        best_on_site, best_cost = tuple(active), self._cost(tuple(active), base_count, filters)
+        for k in range(len(measured)):
+            for subset in itertools.combinations(measured, k):
+                cost = self._cost(forced + subset, base_count, filters)
+                if cost < best_cost:
+                    best_on_site, best_cost = forced + subset, cost
+
+        on_site = tuple(name for name in active if name in best_on_site)
+        local = tuple(name for name in active if name not in on_site)
+        site_config = phone.replace(**{name: CLEARED[name] for name in local}) if local else phone
+        plan = QueryPlan(site_config, on_site, local, best_cost)
+        logger.info(f"Query plan for {source} {phone}: {plan}")
+        return plan
@@ -0,0 +1,108 @@
+"""
+Splits wide queries into independent sub-scrapes that can run on parallel drivers
+"""
+import logging
+import math
+from typing import List, Optional
+
+from cache.scrape_stats import ScrapeStats
+from selenium_.model.filter_list import filter_list
+from selenium_.model.phone_configuration import PhoneConfiguration
+
+logger = logging.getLogger(__name__)
+
+
+class QuerySplitter:
+    """
+    Decides whether a PhoneConfiguration is worth splitting and how.
+
+    Cost model (seconds): a scrape session pays SESSION_COST for page load and
+    filter clicks, then PAGE_COST per "Xem thêm" page of PAGE_SIZE products.
+    Splitting adds sessions but shortens the longest paging chain, so it is only
+    done when the estimated wall time drops below SPLIT_GAIN of the single scrape.
+    A top-N scrape (and each of its sub-scrapes) stops paging after `limit`
+    products, so counts are capped at the limit: a small N is never split.
+    """
+
+    SESSION_COST = 12.0
+    PAGE_COST = 4.0
+    PAGE_SIZE = 20
+    SPLIT_GAIN = 0.8
+    # Used when a brand / price bucket has never been scraped
+    DEFAULT_BRAND_COUNT = 20
+    DEFAULT_CATALOG_COUNT = 150
+
+    def __init__(self, stats: ScrapeStats, source: str = "TGDD"):
+        self.stats = stats
+        self.source = source
+        self.filter_list = filter_list
+
+    def _expected(self, phone: PhoneConfiguration, default: int) -> int:
+        count = self.stats.expected_count(self.source, phone.cache_key())
+        return default if count is None else count
+
+    def _session_cost(self, count: int) -> float:
+        return self.SESSION_COST + max(0, math.ceil(count / self.PAGE_SIZE) - 1) * self.PAGE_COST
+
+    def _wall_time(self, part_counts: List[int], parallelism: int) -> float:
+        """Longest-first scheduling of the parts onto `parallelism` drivers"""
+        lanes = [0.0] * max(1, parallelism)
+        for count in sorted(part_counts, reverse=True):
+            i = lanes.index(min(lanes))
+            lanes[i] += self._session_cost(count)
+        return max(lanes)
+
+    def _pack(self, parts: List[PhoneConfiguration], counts: List[int], bins: int) -> List[List[int]]:
+        """Group part indexes into at most `bins` groups with balanced product counts"""
+        groups: List[List[int]] = [[] for _ in range(min(bins, len(parts)))]
+        totals = [0] * len(groups)
+        for i in sorted(range(len(parts)), key=lambda k: counts[k], reverse=True):
+            g = totals.index(min(totals))
+            groups[g].append(i)
+            totals[g] += counts[i]
+        return [g for g in groups if g]
+
+    def split(self, phone: PhoneConfiguration, parallelism: int,
+              limit: Optional[int] = None) -> List[PhoneConfiguration]:
+        """Return the sub-configurations to scrape (the query itself when not splitting)"""
+        if parallelism < 2:
+            return [phone]
+
+        def capped(count: int) -> int:
+            return min(count, limit) if limit else count
+
+        brands = phone.get_brand()
+        if len(brands) > 1:
+            parts = [phone.replace(brand=[b]) for b in brands]
+            counts = [self._expected(p, self.DEFAULT_BRAND_COUNT) for p in parts]
+            total = self.stats.expected_count(self.source, phone.cache_key()) or sum(counts)
+            groups = self._pack(parts, counts, parallelism)
+            if len(groups) < 2:
+                return [phone]
+            group_counts = [capped(sum(counts[i] for i in g)) for g in groups]
+            split_time = self._wall_time(group_counts, parallelism)
+            single_time = self._session_cost(capped(total))
+            if split_time >= single_time * self.SPLIT_GAIN:
+                logger.info(f"Not splitting brands {brands}: ~{total} products, "
+                            f"{single_time:.0f}s single vs {split_time:.0f}s split")
+                return [phone]
+            sub_configs = [phone.replace(brand=[brands[i] for i in sorted(g)]) for g in groups]
+            logger.info(f"Split {len(brands)} brands into {len(sub_configs)} sub-scrapes "
+                        f"(~{total} products, {single_time:.0f}s -> {split_time:.0f}s)")
+            return sub_configs
+
+        if not phone.get_price_range():
+            # Whole catalog of at most one brand: fan out over the price buckets
+            buckets = [p["data-href"] for p in self.filter_list.get_price_ranges()]
+            default_bucket = max(1, self.DEFAULT_CATALOG_COUNT // len(buckets))
+            parts = [phone.replace(price_range=b) for b in buckets]
+            counts = [self._expected(p, default_bucket) for p in parts]
+            total = self.stats.expected_count(self.source, phone.cache_key()) or sum(counts)
+            split_time = self._wall_time([capped(c) for c in counts], parallelism)
+            single_time = self._session_cost(capped(total))
+            if split_time < single_time * self.SPLIT_GAIN:
+                logger.info(f"Split price range into {len(parts)} sub-scrapes "
+                            f"(~{total} products, {single_time:.0f}s -> {split_time:.0f}s)")
+                return parts
+
+        return [phone]
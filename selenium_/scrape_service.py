@@ -0,0 +1,258 @@
+"""
+Scrape orchestration shared by the API process and the scrape workers
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache.catalog_snapshot import CatalogSnapshotStore
+from cache.circuit_breaker import CircuitBreaker
+from cache.price_history import PriceHistoryStore
+from cache.scrape_stats import ScrapeStats
+from selenium_.deadline import Deadline
+from selenium_.driver_pool import DriverPool
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.model.result import Result
+from selenium_.page.fpt import FPTShop
+from selenium_.page.site_sort import SORTS
+from selenium_.page.tgdd import TGDD
+from selenium_.post_filter import PostFilter
+from selenium_.product_matcher import ProductKey
+from selenium_.query_planner import CLEARED, QueryPlanner
+from selenium_.query_splitter import QuerySplitter
+
+logger = logging.getLogger(__name__)
+
+
+def dedupe_results(results: List[Result]) -> List[Result]:
+    """
+    Drop listings scraped twice from the same source (overlapping sub-scrapes, paging
+    repeats), keeping the first one. The same model sold by several sources is kept
+    once per source; group_offers() merges those.
+    """
+    seen = set()
+    unique_results = []
+    for r in results:
+        key = (r.source, r.source_id) if r.source_id else (r.source, ProductKey(r).key, r.price_vnd)
+        if key not in seen:
+            seen.add(key)
+            unique_results.append(r)
+    return unique_results
+
+
+def sort_results(results: List[Result], sort: Optional[str]) -> List[Result]:
+    """Order merged results the way the sites were asked to (products without a price last)"""
+    if sort not in SORTS:
+        return results
+    priced = [r for r in results if r.price_vnd is not None]
+    unpriced = [r for r in results if r.price_vnd is None]
+    return sorted(priced, key=lambda r: r.price_vnd, reverse=sort == "price_desc") + unpriced
+
+
+class ScrapeService:
+    """Runs every retail source for a configuration on drivers taken from a pool"""
+
+    SOURCES = {
+        "TGDD": TGDD,
+        "FPT": FPTShop,
+    }
+    DEADLINE_GRACE = 5.0
+    DRIVER_WAIT = 60.0  # Longest wait for a pooled driver when the request has no deadline
+
+    def __init__(self, pool: DriverPool, stats: Optional[ScrapeStats] = None,
+                 breaker: Optional[CircuitBreaker] = None, history: Optional[PriceHistoryStore] = None,
+                 snapshots: Optional[CatalogSnapshotStore] = None):
+        self.pool = pool
+        self.stats = stats
+        self.breaker = breaker
+        self.history = history
+        self.snapshots = snapshots
+        self.splitter = QuerySplitter(stats) if stats else None
+        self.planner = QueryPlanner(stats) if stats else None
+
+    def _run_source(self, source: str, phone_config: PhoneConfiguration, deadline: Deadline,
+                    limit: Optional[int] = None, sort: Optional[str] = None) -> Tuple[List[Result], Dict[str, Any]]:
+        results: List[Result] = []
+        report = {"partial": False, "expected": None, "collected": 0, "error": "", "latency": 0.0,
+                  "timed_out": False}
+        started = time.monotonic()
+        try:
+            # A sub-scrape still waiting for a driver never starts once cancelled
+            deadline.raise_if_cancelled()
+            with self.pool.driver(timeout=deadline.clamp(self.DRIVER_WAIT), cancelled=deadline.cancelled) as driver:
+                scraper = self.SOURCES[source](driver)
+                if self.planner:
+                    scraper.measure_filters = self.planner.needs_measurement(source, phone_config)
+                report["error"] = scraper.run(phone_config, results, deadline, limit=limit, sort=sort) or ""
+            report["partial"] = scraper.partial
+            report["expected"] = scraper.total_product
+            # The site's own totals and filter timings feed the splitter and planner estimates
+            if self.stats and not report["error"]:
+                if scraper.total_product is not None:
+                    self.stats.record_count(source, phone_config.cache_key(), scraper.total_product)
+                if scraper.base_total is not None:
+                    self.stats.record_count(source, phone_config.replace(**CLEARED).cache_key(), scraper.base_total)
+                for name, (latency, before, after) in scraper.filter_timings.items():
+                    self.stats.record_filter(source, name, latency, before, after)
+        except TimeoutError as e:
+            # Every pooled driver busy until the deadline (or the scrape was cancelled while
+            # waiting): nothing was scraped, and the source is not to blame
+            report["partial"] = True
+            report["error"] = str(e)
+        except Exception as e:
+            report["error"] = str(e)
+        # Errors of a scrape cut short by the deadline or a cancellation (a shortened wait
+        # timing out, a rate-limit slot beyond the deadline) are not the source's fault
+        report["timed_out"] = report["partial"] or deadline.expired()
+        report["collected"] = len(results)
+        report["latency"] = time.monotonic() - started
+        return results, report
+
+    @staticmethod
+    def _merge_reports(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine the reports of one source's sub-scrapes"""
+        expected = [r["expected"] for r in reports]
+        return {
+            "partial": any(r["partial"] for r in reports),
+            "expected": None if None in expected else sum(expected),
+            "collected": sum(r["collected"] for r in reports),
+            "error": "; ".join(r["error"] for r in reports if r["error"]),
+            "timed_out": any(r["timed_out"] for r in reports),
+            "circuit_open": False,
+            "from_cache": False,
+        }
+
+    def _serve_cached(self, source: str, phone_config: PhoneConfiguration) -> Tuple[List[Result], Dict[str, Any]]:
+        """Results of a source whose circuit is open: its last good scrape of this configuration"""
+        cached = self.breaker.cached_results(source, phone_config.cache_key())
+        results = [Result.from_dict(p) for p in cached or []]
+        logger.warning(f"{source} circuit open, serving {len(results) if cached is not None else 'no'} cached products")
+        return results, {
+            "partial": True,
+            "expected": None,
+            "collected": len(results),
+            "error": "" if cached is not None else "circuit open, no cached results",
+            "timed_out": False,
+            "circuit_open": True,
+            "from_cache": cached is not None,
+        }
+
+    def _record_health(self, source: str, phone_config: PhoneConfiguration, results: List[Result],
+                       reports: List[Dict[str, Any]], report: Dict[str, Any], complete: bool = True):
+        """Feed the circuit breaker and keep the results of a complete scrape as fallback"""
+        zero_result = report["collected"] == 0
+        # A scrape cut short by the caller's deadline says nothing about the source's health
+        errors = [r["error"] for r in reports if r["error"] and not r["timed_out"]]
+        # No products unless the site confirmed an empty listing (a total of 0) points at
+        # a broken page: a blocked or changed page shows neither products nor a total
+        broken_page = zero_result and report["expected"] != 0 and not report["timed_out"]
+        success = not errors and not broken_page
+        latency = max((r.get("latency", 0.0) for r in reports), default=0.0)
+        self.breaker.record(source, success, latency, zero_result)
+        # A top-N scrape is healthy but not a fallback for the full configuration
+        if success and not report["partial"] and complete:
+            self.breaker.save_results(source, phone_config.cache_key(), [r.to_dict() for r in results])
+
+    def scrape(self, phone_config: PhoneConfiguration, deadline: Optional[Deadline] = None,
+               limit: Optional[int] = None,
+               sort: Optional[str] = None) -> Tuple[List[Result], Dict[str, Dict[str, Any]]]:
+        """
+        Scrape all sources in parallel, fanning wide queries out into sub-scrapes.
+        Returns the deduplicated products and a report per source:
+        partial (stopped by the deadline), expected / collected product counts, error,
+        whether the source was skipped by its circuit breaker (served from cache) and
+        how many collected products the local post-filter dropped and how many
+        distinct products matched (before the limit).
+        With `limit`, only the first `limit` products in `sort` order (one of SORTS,
+        else the sites' own order) are returned; the scrapers sort on the site and
+        stop paging early where they can. `expected` stays the site's full total.
+        """
+        deadline = deadline or Deadline()
+        sources = [s for s in self.SOURCES if not self.breaker or self.breaker.allow(s)]
+        skipped = [s for s in self.SOURCES if s not in sources]
+
+        results_by_source: Dict[str, List[Result]] = {source: [] for source in self.SOURCES}
+        # Each sub-scrape's results with the spec filters it left to the post-filter
+        chunks: Dict[str, List[Tuple[List[Result], Tuple[str, ...]]]] = {source: [] for source in self.SOURCES}
+        final_reports: Dict[str, Dict[str, Any]] = {}
+        for source in skipped:
+            results_by_source[source], final_reports[source] = self._serve_cached(source, phone_config)
+            chunks[source].append((results_by_source[source], ()))
+
+        if sources:
+            # One driver per source for every sub-scrape running at the same time
+            parallelism = max(1, self.pool.size // len(sources))
+            sub_configs = self.splitter.split(phone_config, parallelism, limit) if self.splitter else [phone_config]
+            # Spec filters the planner leaves off the site are enforced by the post-filter below.
+            # A top-N scrape stops paging after `limit` cards, so it keeps every filter on the
+            # site: cards dropped locally would leave it short of `limit`
+            tasks = []
+            for sub in sub_configs:
+                for source in sources:
+                    plan = self.planner.plan(source, sub) if self.planner and not limit else None
+                    tasks.append((source, plan.site_config if plan else sub, plan.local if plan else ()))
+
+            logger.info(f"Scraping {', '.join(sources)} in parallel ({len(sub_configs)} sub-scrapes, {deadline})...")
+            reports: Dict[str, List[Dict[str, Any]]] = {source: [] for source in sources}
+
+            executor = ThreadPoolExecutor(max_workers=min(len(tasks), self.pool.size))
+            try:
+                futures = [(source, local, executor.submit(self._run_source, source, sub, deadline, limit, sort))
+                           for source, sub, local in tasks]
+                for source, local, future in futures:
+                    # Scrapers stop on their own at the deadline; the grace covers the last round-trip
+                    timeout = None if deadline.seconds is None else deadline.remaining() + self.DEADLINE_GRACE
+                    try:
+                        results, report = future.result(timeout=timeout)
+                    except FutureTimeoutError:
+                        results = []
+                        error = f"scrape cancelled: {deadline.token.reason}" if deadline.cancelled() else "deadline exceeded"
+                        report = {"partial": True, "expected": None, "collected": 0, "error": error,
+                                  "latency": deadline.seconds or 0.0, "timed_out": True}
+                    results_by_source[source].extend(results)
+                    chunks[source].append((results, local))
+                    reports[source].append(report)
+                    if report["error"]:
+                        logger.warning(f"{source} scrape error (non-fatal): {report['error']}")
+            finally:
+                # Do not block on a scraper that overran its deadline
+                executor.shutdown(wait=False)
+
+            for source, source_reports in reports.items():
+                final_reports[source] = self._merge_reports(source_reports)
+                # A cancelled scrape says nothing about the source's health
+                if self.breaker and deadline.cancelled():
+                    self.breaker.release(source)
+                elif self.breaker:
+                    self._record_health(source, phone_config, results_by_source[source],
+                                        source_reports, final_reports[source], complete=limit is None)
+
+        # Fresh listings only, cached ones from an open circuit are not new observations
+        fresh = [r for source in sources for r in results_by_source[source]]
+        if self.history:
+            self.history.submit(fresh)
+        if self.snapshots:
+            self.snapshots.submit(fresh)
+
+        # Enforce the exact constraints the coarser site filters let through, and the
+        # filters left off the site strictly
+        post_filters: Dict[Tuple[str, ...], PostFilter] = {}
+        all_results: List[Result] = []
+        for source in self.SOURCES:
+            kept = []
+            for results, local in chunks[source]:
+                if local not in post_filters:
+                    post_filters[local] = PostFilter(phone_config, strict=local)
+                kept.extend(post_filters[local].apply(results))
+            final_reports[source]["filtered_out"] = len(results_by_source[source]) - len(kept)
+            all_results.extend(kept)
+        results = sort_results(dedupe_results(all_results), sort)
+        for source in self.SOURCES:
+            final_reports[source]["matched"] = 0
+        for r in results:
+            final_reports[r.source]["matched"] += 1
+        if limit:
+            results = results[:limit]
+        return results, {source: final_reports[source] for source in self.SOURCES}
@@ -1,20 +1,52 @@
 """
 Adaptive filter applier that dynamically finds and applies filters
-based on current page structure rather than hardcoded selectors
+based on current page structure rather than hardcoded selectors.
+
+The element that worked for each (source, filter type, value) is remembered in
+the locator memo, so later runs skip the adaptive search while the page keeps
+the same structure.
 """
 
 import logging
+import re
 import time
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from cache.locator_memo import locator_memo
 from ..model.phone_configuration import PhoneConfiguration
 
 logger = logging.getLogger(__name__)
 
+# Exact CSS path of an element, anchored at the nearest ancestor with an id, and its
+# visible text (whitespace collapsed, lower case)
+LOCATE_SCRIPT = """
+let el = arguments[0];
+const label = (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+const parts = [];
+while (el && el.nodeType === 1) {
+    if (el.id) { parts.unshift('#' + CSS.escape(el.id)); break; }
+    let index = 1;
+    for (let sib = el.previousElementSibling; sib; sib = sib.previousElementSibling) {
+        if (sib.tagName === el.tagName) index++;
+    }
+    parts.unshift(el.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+    el = el.parentElement;
+}
+return [parts.join(' > '), label];
+"""
+
+# The remembered element, if it is still there and still shows the same option label
+VALIDATE_LOCATOR_SCRIPT = """
+const el = document.querySelector(arguments[0]);
+if (!el) return null;
+const label = (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+return label === arguments[1] ? el : null;
+"""
+
 
 class AdaptiveFilterApplier:
     """Dynamically applies filters based on current page structure"""
@@ -29,37 +61,37 @@ class AdaptiveFilterApplier:
             success_count = 0
             
             # Apply brand filters
-            if config.brands:
-                if self._apply_brand_filters_adaptive(config.brands):
+            if config.get_brand():
+                if self._apply_brand_filters_adaptive(config.get_brand()):
                     success_count += 1
             
             # Apply price filters
-            if config.price_ranges:
-                if self._apply_price_filters_adaptive(config.price_ranges):
+            if config.get_price_range():
+                if self._apply_price_filters_adaptive([config.get_price_range()]):
                     success_count += 1
                     
-            # Apply RAM filters  
-            if config.ram:
-                if self._apply_ram_filters_adaptive(config.ram):
+            # Apply RAM filters (value only, the operator is not a page element)
+            if config.get_ram():
+                if self._apply_ram_filters_adaptive([config.get_ram()[0]]):
                     success_count += 1
                     
             # Apply storage filters
-            if config.storage:
-                if self._apply_storage_filters_adaptive(config.storage):
+            if config.get_storage():
+                if self._apply_storage_filters_adaptive([config.get_storage()[0]]):
                     success_count += 1
                     
             # Source-specific filters
             if self.source == 'tgdd':
-                if config.resolutions and self._apply_resolution_filters_adaptive(config.resolutions):
+                if config.get_resolutions() and self._apply_resolution_filters_adaptive(config.get_resolutions()):
                     success_count += 1
-                if config.refresh_rates and self._apply_refresh_rate_filters_adaptive(config.refresh_rates):
+                if config.get_refresh_rates() and self._apply_refresh_rate_filters_adaptive(config.get_refresh_rates()):
                     success_count += 1
             elif self.source == 'fptshop':
-                if config.os and self._apply_os_filters_adaptive(config.os):
+                if getattr(config, 'os', None) and self._apply_os_filters_adaptive(config.os):
                     success_count += 1
-                if config.network and self._apply_network_filters_adaptive(config.network):
+                if getattr(config, 'network', None) and self._apply_network_filters_adaptive(config.network):
                     success_count += 1
-                if config.battery and self._apply_battery_filters_adaptive(config.battery):
+                if getattr(config, 'battery', None) and self._apply_battery_filters_adaptive(config.battery):
                     success_count += 1
             
             logger.info(f"Applied {success_count} filter categories successfully")
@@ -75,22 +107,16 @@ class AdaptiveFilterApplier:
             applied_count = 0
             
             for brand in brands:
-                # Strategy 1: Look for buttons/links with brand images
-                brand_elements = self._find_brand_elements_with_images(brand)
-                
-                # Strategy 2: Look for text-based brand elements
-                if not brand_elements:
-                    brand_elements = self._find_brand_elements_with_text(brand)
-                    
-                # Strategy 3: Look for brand in any clickable element
-                if not brand_elements:
-                    brand_elements = self._find_brand_elements_generic(brand)
-                
-                # Try to click the brand element
-                for element in brand_elements[:1]:  # Take first match
-                    if self._safe_click(element, f"brand filter: {brand}"):
-                        applied_count += 1
-                        break
+                strategies = [
+                    # Strategy 1: Look for buttons/links with brand images
+                    ("image", lambda b=brand: self._find_brand_elements_with_images(b)),
+                    # Strategy 2: Look for text-based brand elements
+                    ("text", lambda b=brand: self._find_brand_elements_with_text(b)),
+                    # Strategy 3: Look for brand in any clickable element
+                    ("generic", lambda b=brand: self._find_brand_elements_generic(b)),
+                ]
+                if self._apply_memoized("brand", brand, brand.lower(), strategies):
+                    applied_count += 1
                         
             logger.info(f"Applied {applied_count}/{len(brands)} brand filters")
             return applied_count > 0
@@ -159,13 +185,9 @@ class AdaptiveFilterApplier:
                 price_keywords = self._extract_price_keywords(price_range)
                 
                 # Find price filter elements
-                price_elements = self._find_price_elements(price_keywords)
-                
-                # Try to apply filter
-                for element in price_elements[:1]:
-                    if self._safe_click(element, f"price filter: {price_range}"):
-                        applied_count += 1
-                        break
+                strategies = [("price_text", lambda k=price_keywords: self._find_price_elements(k))]
+                if self._apply_memoized("price", price_range, strategies):
+                    applied_count += 1
                         
             logger.info(f"Applied {applied_count}/{len(price_ranges)} price filters")
             return applied_count > 0
@@ -189,7 +211,6 @@ class AdaptiveFilterApplier:
             keywords.append('million')
             
         # Extract number ranges
-        import re
         numbers = re.findall(r'\d+', price_range)
         keywords.extend(numbers)
         
@@ -231,32 +252,9 @@ class AdaptiveFilterApplier:
             applied_count = 0
             
             for option in options:
-                # Extract numeric value
-                import re
-                numbers = re.findall(r'\d+', option)
-                
-                # Find spec filter elements
-                spec_elements = []
-                for keyword in keywords:
-                    for number in numbers:
-                        selectors = [
-                            f"//*[contains(text(), '{number}') and contains(text(), '{keyword}')]",
-                            f"//label[contains(text(), '{number}') and contains(text(), '{keyword}')]",
-                            f"//button[contains(text(), '{number}') and contains(text(), '{keyword}')]"
-                        ]
-                        
-                        for selector in selectors:
-                            try:
-                                found = self.driver.find_elements(By.XPATH, selector)
-                                spec_elements.extend(found)
-                            except:
-                                continue
-                
-                # Try to apply filter
-                for element in spec_elements[:1]:
-                    if self._safe_click(element, f"{filter_type} filter: {option}"):
-                        applied_count += 1
-                        break
+                strategies = [("spec_text", lambda o=option: self._find_spec_elements(o, keywords))]
+                if self._apply_memoized(filter_type, option, strategies):
+                    applied_count += 1
                         
             logger.info(f"Applied {applied_count}/{len(options)} {filter_type} filters")
             return applied_count > 0
@@ -265,6 +263,29 @@ class AdaptiveFilterApplier:
             logger.error(f"Error applying {filter_type} filters: {e}")
             return False
     
+    def _find_spec_elements(self, option: str, keywords: List[str]) -> List[WebElement]:
+        """Find spec filter elements mentioning the option's number and a keyword"""
+        # Extract numeric value
+        numbers = re.findall(r'\d+', option)
+        
+        spec_elements = []
+        for keyword in keywords:
+            for number in numbers:
+                selectors = [
+                    f"//*[contains(text(), '{number}') and contains(text(), '{keyword}')]",
+                    f"//label[contains(text(), '{number}') and contains(text(), '{keyword}')]",
+                    f"//button[contains(text(), '{number}') and contains(text(), '{keyword}')]"
+                ]
+                
+                for selector in selectors:
+                    try:
+                        found = self.driver.find_elements(By.XPATH, selector)
+                        spec_elements.extend(found)
+                    except:
+                        continue
+                        
+        return spec_elements
+    
     def _apply_resolution_filters_adaptive(self, resolutions: List[str]) -> bool:
         """Apply resolution filters for TGDD"""
         return self._apply_spec_filters_adaptive(resolutions, 'resolution', ['x', 'resolution', 'độ phân giải'])
@@ -285,6 +306,56 @@ class AdaptiveFilterApplier:
         """Apply battery filters for FPTShop"""
         return self._apply_spec_filters_adaptive(battery_options, 'battery', ['mah', 'pin'])
     
+    def _apply_memoized(self, filter_type: str, value: str,
+                        strategies: Sequence[Tuple[str, Callable[[], List[WebElement]]]]) -> bool:
+        """
+        Click the filter element for `value`: the remembered locator when it still
+        validates, otherwise the first element found by the adaptive strategies
+        (tried in order), which is then remembered with its visible label for the
+        next run. A remembered element only validates while it shows that same label:
+        "8 GB" must not stand in for "128 GB", nor a "Từ 2 - 4 triệu" option for "Dưới 2 triệu".
+        """
+        description = f"{filter_type} filter: {value}"
+        memo = locator_memo.get(self.source, filter_type, value)
+        if memo:
+            element = self._validate_locator(memo["locator"], memo["expect"])
+            if element is not None and self._safe_click(element, f"{description} (remembered)"):
+                return True
+            logger.info(f"Remembered locator for {description} is stale, searching again")
+            locator_memo.forget(self.source, filter_type, value)
+        
+        for strategy, find in strategies:
+            elements = find()
+            if not elements:
+                continue
+            element = elements[0]  # Take first match
+            locator, label = self._locate(element)
+            if not self._safe_click(element, description):
+                return False
+            # An element without text (icon only) could not be validated later
+            if locator and label:
+                locator_memo.remember(self.source, filter_type, value, strategy, locator, label)
+            return True
+        return False
+    
+    def _locate(self, element: WebElement) -> Tuple[Optional[str], str]:
+        """
+        Exact locator and normalized visible label of an element found by a broad
+        search (taken before clicking it)
+        """
+        try:
+            locator, label = self.driver.execute_script(LOCATE_SCRIPT, element)
+            return locator or None, label or ""
+        except Exception:
+            return None, ""
+    
+    def _validate_locator(self, locator: str, expect: str) -> Optional[WebElement]:
+        """One round trip: the element at `locator` if its visible label is still `expect`"""
+        try:
+            return self.driver.execute_script(VALIDATE_LOCATOR_SCRIPT, locator, expect)
+        except Exception:
+            return None
+    
     def _safe_click(self, element: WebElement, description: str) -> bool:
         """Safely click an element with error handling"""
         try:
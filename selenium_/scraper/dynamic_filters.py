@@ -12,6 +12,8 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
 
+from cache.rate_limiter import rate_limiter
+
 logger = logging.getLogger(__name__)
 
 class DynamicFilterScraper:
@@ -42,6 +44,8 @@ class DynamicFilterScraper:
             
         try:
             logger.info("🔍 Scraping FPTShop filters dynamically...")
+            # Background refreshes share the per-host budget with the scrapes
+            rate_limiter.acquire("https://fptshop.com.vn/dien-thoai")
             self.driver.get("https://fptshop.com.vn/dien-thoai")
             
             # Wait for page to load
@@ -232,6 +236,8 @@ class DynamicFilterScraper:
             
         try:
             logger.info("🔍 Scraping TGDD filters dynamically...")
+            # Background refreshes share the per-host budget with the scrapes
+            rate_limiter.acquire("https://www.thegioididong.com/dtdd")
             self.driver.get("https://www.thegioididong.com/dtdd")
             
             # Wait for page to load
@@ -14,9 +14,14 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import os
+import threading
 import time
 import logging
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
+
+from cache.rate_limiter import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,17 @@ class FilterScraper:
     def __init__(self):
         self.driver = None
         self.wait = None
+        # Seconds spent on each category (and on loading the page) in the last scrape
+        self.timings: Dict[str, float] = {}
+    
+    def _timed(self, category: str, scrape: Callable[[], Any]) -> Any:
+        """Run one category scrape, recording how long it took"""
+        started = time.monotonic()
+        try:
+            return scrape()
+        finally:
+            self.timings[category] = round(time.monotonic() - started, 3)
+            logger.info(f"{self.__class__.__name__} {category}: {self.timings[category]:.2f}s")
     
     def setup_driver(self):
         """Setup Chrome driver for scraping with secure webdriver-manager installation"""
@@ -69,6 +85,14 @@ class FilterScraper:
         else:
             raise Exception("Failed to initialize Chrome driver")
     
+    def open(self, url: str):
+        """
+        Load a page once the shared per-host limiter grants a token: the sites are
+        scraped concurrently (and refreshed in the background) alongside the scrapes
+        """
+        rate_limiter.acquire(url)
+        self.driver.get(url)
+
     def cleanup(self):
         """Clean up driver resources"""
         if self.driver:
@@ -88,12 +112,14 @@ class TGDDFilterScraper(FilterScraper):
         Scrape all filter categories from TGDD
         Based on MCP Playwright analysis showing comprehensive filter structure
         """
+        self.timings = {}
+        started = time.monotonic()
         try:
             logger.info("=== Starting TGDD filter scraping ===")
             self.setup_driver()
             
             logger.info(f"Navigating to {self.base_url}")
-            self.driver.get(self.base_url)
+            self.open(self.base_url)
             time.sleep(3)
             logger.info("Page loaded, looking for filter elements")
             
@@ -114,42 +140,43 @@ class TGDDFilterScraper(FilterScraper):
                     logger.info("Alternative filter button clicked")
                 except NoSuchElementException:
                     logger.warning("Filter button not found, continuing...")
+            self.timings['page_load'] = round(time.monotonic() - started, 3)
             
             filters = {}
             
             # Scrape brands (from MCP analysis: Samsung, iPhone, OPPO, Xiaomi, vivo, realme, HONOR, TCL, Tecno, Nokia, Masstel, etc.)
             logger.info("Starting brand scraping...")
-            filters['brands'] = self._scrape_brands()
+            filters['brands'] = self._timed('brands', self._scrape_brands)
             logger.info(f"Brands scraped: {len(filters.get('brands', []))}")
             
             # Scrape price ranges (from MCP: Dưới 2 triệu, Từ 2-4 triệu, Từ 4-7 triệu, etc.)
             logger.info("Starting price range scraping...")
-            filters['price_ranges'] = self._scrape_price_ranges()
+            filters['price_ranges'] = self._timed('price_ranges', self._scrape_price_ranges)
             logger.info(f"Price ranges scraped: {len(filters.get('price_ranges', []))}")
             
             # Scrape RAM options (from MCP: 3GB, 4GB, 6GB, 8GB, 12GB, 16GB)
             logger.info("Starting RAM options scraping...")
-            filters['ram_options'] = self._scrape_ram_options()
+            filters['ram_options'] = self._timed('ram_options', self._scrape_ram_options)
             logger.info(f"RAM options scraped: {len(filters.get('ram_options', []))}")
             
             # Scrape storage options (from MCP: 64GB, 128GB, 256GB, 512GB, 1TB)
             logger.info("Starting storage options scraping...")
-            filters['storage_options'] = self._scrape_storage_options()
+            filters['storage_options'] = self._timed('storage_options', self._scrape_storage_options)
             logger.info(f"Storage options scraped: {len(filters.get('storage_options', []))}")
             
             # Scrape screen resolutions (from MCP: HD+, Full HD+, 1.5K, 2K+, QXGA+)
             logger.info("Starting resolutions scraping...")
-            filters['resolutions'] = self._scrape_resolutions()
+            filters['resolutions'] = self._timed('resolutions', self._scrape_resolutions)
             logger.info(f"Resolutions scraped: {len(filters.get('resolutions', []))}")
             
             # Scrape refresh rates (from MCP: 60Hz, 90Hz, 120Hz, 144Hz)
             logger.info("Starting refresh rates scraping...")
-            filters['refresh_rates'] = self._scrape_refresh_rates()
+            filters['refresh_rates'] = self._timed('refresh_rates', self._scrape_refresh_rates)
             logger.info(f"Refresh rates scraped: {len(filters.get('refresh_rates', []))}")
             
             # Scrape special features (from MCP: 5G, NFC, AI, Gaming, etc.)
             logger.info("Starting special features scraping...")
-            filters['special_features'] = self._scrape_special_features()
+            filters['special_features'] = self._timed('special_features', self._scrape_special_features)
             logger.info(f"Special features scraped: {len(filters.get('special_features', []))}")
             
             logger.info(f"=== TGDD scraping completed: {len(filters)} categories ===")
@@ -163,6 +190,7 @@ class TGDDFilterScraper(FilterScraper):
         finally:
             logger.info("Cleaning up TGDD scraper")
             self.cleanup()
+            self.timings['total'] = round(time.monotonic() - started, 3)
     
     def _scrape_brands(self) -> List[str]:
         """Scrape brand options dynamically with Xem thêm expansion"""
@@ -447,11 +475,13 @@ class FPTShopFilterScraper(FilterScraper):
         Scrape all filter categories from FPTShop
         Based on MCP Playwright analysis of detailed filter structure
         """
+        self.timings = {}
+        started = time.monotonic()
         try:
             self.setup_driver()
             logger.info("Starting FPTShop filter scraping")
             
-            self.driver.get(self.base_url)
+            self.open(self.base_url)
             time.sleep(3)
             
             # Click filter button (based on MCP analysis: "Dùng bộ lọc ngay")
@@ -469,24 +499,25 @@ class FPTShopFilterScraper(FilterScraper):
                     time.sleep(2)
                 except:
                     pass
+            self.timings['page_load'] = round(time.monotonic() - started, 3)
             
             filters = {}
             
             # Based on MCP analysis, scrape all filter categories
-            filters['brands'] = self._scrape_brands()
-            filters['price_ranges'] = self._scrape_price_ranges()
-            filters['os_options'] = self._scrape_os_options()
-            filters['rom_options'] = self._scrape_rom_options()
-            filters['connectivity'] = self._scrape_connectivity()
-            filters['battery_performance'] = self._scrape_battery_performance()
-            filters['network_support'] = self._scrape_network_support()
-            filters['ram_options'] = self._scrape_ram_options()
-            filters['memory_card'] = self._scrape_memory_card()
-            filters['screen_size'] = self._scrape_screen_size()
-            filters['screen_standard'] = self._scrape_screen_standard()
-            filters['refresh_rate'] = self._scrape_refresh_rate()
-            filters['camera_features'] = self._scrape_camera_features()
-            filters['special_features'] = self._scrape_special_features()
+            filters['brands'] = self._timed('brands', self._scrape_brands)
+            filters['price_ranges'] = self._timed('price_ranges', self._scrape_price_ranges)
+            filters['os_options'] = self._timed('os_options', self._scrape_os_options)
+            filters['rom_options'] = self._timed('rom_options', self._scrape_rom_options)
+            filters['connectivity'] = self._timed('connectivity', self._scrape_connectivity)
+            filters['battery_performance'] = self._timed('battery_performance', self._scrape_battery_performance)
+            filters['network_support'] = self._timed('network_support', self._scrape_network_support)
+            filters['ram_options'] = self._timed('ram_options', self._scrape_ram_options)
+            filters['memory_card'] = self._timed('memory_card', self._scrape_memory_card)
+            filters['screen_size'] = self._timed('screen_size', self._scrape_screen_size)
+            filters['screen_standard'] = self._timed('screen_standard', self._scrape_screen_standard)
+            filters['refresh_rate'] = self._timed('refresh_rate', self._scrape_refresh_rate)
+            filters['camera_features'] = self._timed('camera_features', self._scrape_camera_features)
+            filters['special_features'] = self._timed('special_features', self._scrape_special_features)
             
             logger.info(f"Successfully scraped FPTShop filters: {len(filters)} categories")
             return filters
@@ -496,6 +527,7 @@ class FPTShopFilterScraper(FilterScraper):
             return {}
         finally:
             self.cleanup()
+            self.timings['total'] = round(time.monotonic() - started, 3)
     
     def _scrape_brands(self) -> List[str]:
         """Scrape brand options with full expansion - should get all brands from image"""
@@ -869,23 +901,70 @@ class FPTShopFilterScraper(FilterScraper):
 
 
 class DynamicFilterManager:
-    """Manager for coordinating filter scraping from multiple sources"""
+    """
+    Manager for coordinating filter scraping from multiple sources.
+
+    Each site runs in its own Chrome, so the sites are scraped concurrently. The
+    categories of one site stay sequential: a WebDriver session executes one
+    command at a time, so extra tabs of the same session would only interleave.
+    The combined result is kept for FILTER_CACHE_TTL_SECONDS and concurrent
+    callers share a single scrape.
+    """
     
-    def __init__(self):
-        self.tgdd_scraper = TGDDFilterScraper()
-        self.fptshop_scraper = FPTShopFilterScraper()
+    SCRAPERS = {
+        "TGDD": TGDDFilterScraper,
+        "FPT": FPTShopFilterScraper,
+    }
     
-    def get_combined_filters(self) -> Dict[str, Any]:
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('FILTER_CACHE_TTL_SECONDS', 3600))
+        self._lock = threading.Lock()
+        self._combined: Optional[Dict[str, Any]] = None
+        self._scraped_at = 0.0
+        self.timings: Dict[str, Any] = {}
+    
+    def get_combined_filters(self, force_refresh: bool = False) -> Dict[str, Any]:
         """
         Get combined filter options from all sources
         This completely replaces hardcoded FilterList values
         """
+        with self._lock:
+            if not force_refresh and self._combined and time.time() - self._scraped_at < self.ttl_seconds:
+                return self._combined
+            combined = self._scrape_combined()
+            # An empty result (both sites failed) is not cached
+            if combined:
+                self._combined, self._scraped_at = combined, time.time()
+            return combined
+    
+    def get_timings(self) -> Dict[str, Any]:
+        """Seconds per site and per category of the last scrape, and the age of the cached result"""
+        return {
+            **self.timings,
+            "cached": self._combined is not None,
+            "age_seconds": round(time.time() - self._scraped_at, 1) if self._combined else None,
+            "ttl_seconds": self.ttl_seconds,
+        }
+    
+    def _scrape_combined(self) -> Dict[str, Any]:
         try:
             logger.info("Starting combined filter scraping")
-            
-            # Scrape from both sources
-            tgdd_filters = self.tgdd_scraper.scrape_filters()
-            fptshop_filters = self.fptshop_scraper.scrape_filters()
+            started = time.monotonic()
+            
+            # Scrape from both sources at once, a fresh scraper (and Chrome) per site
+            scrapers = {name: cls() for name, cls in self.SCRAPERS.items()}
+            with ThreadPoolExecutor(max_workers=len(scrapers)) as executor:
+                futures = {name: executor.submit(scraper.scrape_filters) for name, scraper in scrapers.items()}
+                results = {name: future.result() for name, future in futures.items()}
+            tgdd_filters = results["TGDD"]
+            fptshop_filters = results["FPT"]
+            self.timings = {
+                "total": round(time.monotonic() - started, 3),
+                "sources": {name: dict(scraper.timings) for name, scraper in scrapers.items()},
+            }
+            logger.info(f"Filter scraping took {self.timings['total']:.1f}s: {self.timings['sources']}")
+            if not tgdd_filters and not fptshop_filters:
+                return {}
             
             # Combine and merge filters intelligently
             combined = {
@@ -956,3 +1035,7 @@ class DynamicFilterManager:
                         merged.append(price_range)
         
         return merged
+
+
+# Global instance
+filter_manager = DynamicFilterManager()
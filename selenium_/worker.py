@@ -0,0 +1,142 @@
+"""
+Scrape worker process: pulls jobs from the Redis queue and runs the scrapers.
+
+Run one or more per machine:
+    python -m selenium_.worker --concurrency 4
+"""
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+from cache.circuit_breaker import circuit_breaker
+from cache.job_queue import ScrapeJobQueue
+from cache.price_history import price_history
+from cache.catalog_snapshot import catalog_snapshots
+from cache.scrape_stats import scrape_stats
+from selenium_.cancellation import CancellationToken
+from selenium_.deadline import Deadline
+from selenium_.driver_pool import DriverPool
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.product_matcher import group_offers
+from selenium_.scrape_service import ScrapeService
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeWorker:
+    """Claims scrape jobs and runs them on the worker's own driver pool"""
+
+    CANCEL_POLL_SECONDS = 1.0
+
+    def __init__(self, job_queue: ScrapeJobQueue, service: ScrapeService, concurrency: int = 1):
+        self.queue = job_queue
+        self.service = service
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stop = threading.Event()
+
+    def process(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        logger.info(f"[{self.worker_id}] Processing job {job_id} (attempt {job['attempts']})")
+
+        # Keep the lease alive while the scrape runs, and watch for a cancel request
+        done = threading.Event()
+        token = CancellationToken()
+
+        def heartbeat():
+            last_beat = time.monotonic()
+            while not done.wait(self.CANCEL_POLL_SECONDS):
+                try:
+                    if self.queue.is_cancel_requested(job_id):
+                        token.cancel("job cancelled")
+                    if time.monotonic() - last_beat >= self.queue.visibility_timeout / 3:
+                        self.queue.heartbeat(job_id)
+                        last_beat = time.monotonic()
+                except Exception as e:
+                    logger.warning(f"[{self.worker_id}] Heartbeat for job {job_id} failed: {e}")
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            if self.queue.is_cancel_requested(job_id):
+                token.cancel("job cancelled")
+            phone_config = PhoneConfiguration.from_dict(job["config"])
+            results, reports = self.service.scrape(phone_config, Deadline(job["deadline_seconds"], token=token))
+            if token.cancelled:
+                self.queue.mark_cancelled(job_id)
+                logger.info(f"[{self.worker_id}] Job {job_id} cancelled")
+                return
+            if not results and all(r["error"] for r in reports.values()):
+                raise RuntimeError("; ".join(f"{k}: {r['error']}" for k, r in reports.items()))
+            completed = self.queue.complete(job_id, self.worker_id, {
+                "total_products": len(results),
+                "products": [r.to_dict() for r in results],
+                "groups": [g.to_dict() for g in group_offers(results)],
+                "sources": reports,
+            })
+            if not completed:
+                logger.warning(f"[{self.worker_id}] Lease of job {job_id} lost, result dropped")
+                return
+            logger.info(f"[{self.worker_id}] Job {job_id} done with {len(results)} products")
+        except Exception as e:
+            logger.error(f"[{self.worker_id}] Job {job_id} failed: {e}")
+            if token.cancelled:
+                self.queue.mark_cancelled(job_id)
+            else:
+                self.queue.fail(job_id, str(e))
+        finally:
+            done.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.queue.requeue_expired()
+                job = self.queue.claim(self.worker_id)
+                if job:
+                    self.process(job)
+            except Exception as e:
+                logger.error(f"[{self.worker_id}] Worker loop error: {e}")
+                self._stop.wait(1)
+
+    def run_forever(self):
+        logger.info(f"Scrape worker {self.worker_id} started with concurrency {self.concurrency}")
+        threads = [threading.Thread(target=self._loop, daemon=True) for _ in range(self.concurrency)]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                t.join()
+        except KeyboardInterrupt:
+            logger.info("Stopping scrape worker...")
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        self.service.pool.close()
+
+
+def main():
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Scrape worker")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv('SCRAPE_WORKER_CONCURRENCY', 1)),
+                        help="Number of jobs processed in parallel by this process")
+    args = parser.parse_args()
+
+    # Each concurrent job needs one driver per source, DRIVER_POOL_SIZE adds room for fan-out
+    pool = DriverPool(size=max(args.concurrency * len(ScrapeService.SOURCES),
+                               int(os.getenv('DRIVER_POOL_SIZE', 2))))
+    service = ScrapeService(pool, scrape_stats, circuit_breaker, price_history, catalog_snapshots)
+    worker = ScrapeWorker(ScrapeJobQueue(), service, concurrency=args.concurrency)
+    worker.run_forever()
+
+
+if __name__ == "__main__":
+    main()
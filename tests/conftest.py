@@ -0,0 +1,21 @@
+import os
+
+import pytest
+import redis
+
+
+@pytest.fixture
+def redis_client():
+    """
+    Redis for tests: the server at TEST_REDIS_URL (flushed before and after each test),
+    else an in-process fakeredis with Lua support.
+    """
+    url = os.getenv('TEST_REDIS_URL')
+    if url:
+        client = redis.from_url(url, decode_responses=True)
+        client.flushdb()
+        yield client
+        client.flushdb()
+        return
+    fakeredis = pytest.importorskip("fakeredis")
+    yield fakeredis.FakeRedis(decode_responses=True)
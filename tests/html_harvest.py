@@ -0,0 +1,58 @@
+"""
+What FPTShopScraper.FILTER_HARVEST_SCRIPT returns, computed from saved HTML instead
+of a live page, so the harvest parsers can be tested and benchmarked offline.
+"""
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import urljoin
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+
+class _HarvestParser(HTMLParser):
+    def __init__(self, base_url: str):
+        super().__init__()
+        self.base_url = base_url
+        self.links: List[str] = []
+        self.texts: List[Optional[tuple]] = []  # Document order of the elements, like `body *`
+        self._open: List[tuple] = []  # (tag, index in texts, own text parts)
+        self._in_body = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self._in_body = True
+            return
+        if not self._in_body:
+            return
+        href = dict(attrs).get("href")
+        if tag == "a" and href and "/dien-thoai/" in urljoin(self.base_url, href):
+            self.links.append(urljoin(self.base_url, href))
+        if tag in VOID_TAGS:
+            return
+        self.texts.append(None)
+        self._open.append((tag, len(self.texts) - 1, []))
+
+    def handle_endtag(self, tag):
+        if not self._open or self._open[-1][0] != tag:
+            return
+        tag, index, parts = self._open.pop()
+        own = "".join(parts).strip()
+        if own and len(own) <= 80:
+            self.texts[index] = (tag, own)
+
+    def handle_data(self, data):
+        if self._open:
+            self._open[-1][2].append(data)
+
+
+def harvest_html(html: str, base_url: str = "https://fptshop.com.vn/dien-thoai") -> dict:
+    parser = _HarvestParser(base_url)
+    parser.feed(html)
+    links = [h for h in parser.links if "?" not in h and not h.rstrip("/").endswith("/dien-thoai")]
+    return {"links": links, "texts": [t for t in parser.texts if t]}
+
+
+def load_harvest(name: str = "fptshop_dien_thoai.html") -> dict:
+    return harvest_html((FIXTURES / name).read_text(encoding="utf-8"))
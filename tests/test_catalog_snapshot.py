@@ -0,0 +1,34 @@
+import os
+import time
+
+from cache.catalog_snapshot import CatalogSnapshot, CatalogSnapshotStore, encode_snapshot
+from selenium_.model.result import Result
+
+
+def phone(i: int, price: str = "5.990.000₫") -> Result:
+    return Result(f"//img/{i}.jpg", f"Samsung Galaxy A{i} 8GB/128GB", price, f"https://x/{i}",
+                  ["8 GB", "128 GB"], source="TGDD", source_id=str(i))
+
+
+def test_more_symbols_than_uint16(tmp_path):
+    records = [{"source": "TGDD", "source_id": f"{i:06d}", "chip": f"chip-{i}", "seen_at": 1.0}
+               for i in range(70000)]
+    path = tmp_path / "big.snap"
+    path.write_bytes(encode_snapshot(records, 1))
+    snapshot = CatalogSnapshot(str(path))
+    assert snapshot.record(69999)["chip"] == "chip-69999"
+    assert snapshot.lookup("TGDD", "069999") == 69999
+
+
+def test_unchanged_scrape_is_not_republished(tmp_path):
+    store = CatalogSnapshotStore(str(tmp_path))
+    now = time.time()
+    assert store.publish([([phone(1), phone(2)], now)]) == 1
+    # Same products seen again shortly after: nothing to write
+    assert store.publish([([phone(1), phone(2)], now + 60)]) == 1
+    assert sorted(n for n in os.listdir(tmp_path) if n.endswith(".snap")) == ["catalog-00000001.snap"]
+    # A price change is published
+    assert store.publish([([phone(2, "4.990.000₫")], now + 120)]) == 2
+    snapshot = store.current()
+    assert snapshot.record(snapshot.lookup("TGDD", "2"))["price_vnd"] == 4990000
+    assert snapshot.record(snapshot.lookup("TGDD", "1"))["seen_at"] == now
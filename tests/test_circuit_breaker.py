@@ -0,0 +1,16 @@
+import time
+
+from cache.circuit_breaker import HALF_OPEN, CircuitBreaker
+
+
+def test_cancelled_trial_releases_the_slot(redis_client):
+    breaker = CircuitBreaker(redis_client)
+    redis_client.hset(breaker.BREAKER_KEY.format("FPT"),
+                      mapping={"state": "open", "opened_at": time.time() - breaker.cooldown_seconds - 1})
+    assert breaker.state("FPT") == HALF_OPEN
+    assert breaker.allow("FPT")
+    # One trial at a time
+    assert not breaker.allow("FPT")
+    breaker.release("FPT")
+    assert breaker.state("FPT") == HALF_OPEN
+    assert breaker.allow("FPT")
@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+
+import pytest
+
+from cache.circuit_breaker import CircuitBreaker
+from selenium_.count_service import CountService
+from selenium_.deadline import Deadline
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.page.fpt import FPTShop
+from selenium_.scrape_service import ScrapeService
+
+
+class FakePool:
+    @contextmanager
+    def driver(self, timeout=None, cancelled=None):
+        yield object()
+
+
+class RecordingCache:
+    def __init__(self):
+        self.saved = {}
+
+    def get(self, source, config_key):
+        return None
+
+    def set(self, source, config_key, count):
+        self.saved[source] = count
+
+
+def scraper(total):
+    class Scraper:
+        def __init__(self, driver):
+            pass
+
+        def count(self, phone, deadline):
+            return total
+    return Scraper
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # TGDD's total was not shown: get_product_count() gives None, not the cards listed
+    monkeypatch.setattr(ScrapeService, "SOURCES", {"TGDD": scraper(None), "FPT": scraper(7)})
+    return RecordingCache()
+
+
+def test_unknown_count_is_reported_but_not_cached(cache):
+    total, reports = CountService(FakePool(), cache).count(PhoneConfiguration())
+    assert total is None
+    assert reports["TGDD"]["count"] is None
+    assert reports["TGDD"]["error"] == "total not shown"
+    assert cache.saved == {"FPT": 7}
+
+
+class CountingDriver:
+    def __init__(self, counts):
+        self.counts = counts
+
+    def execute_script(self, script, *args):
+        return dict(self.counts)
+
+
+@pytest.mark.parametrize("counts, total", [
+    ({"header": None, "shown": 0, "more": None, "empty": False}, None),
+    ({"header": None, "shown": 0, "more": None, "empty": True}, 0),
+    ({"header": None, "shown": 20, "more": 7, "empty": False}, 27),
+    ({"header": 31, "shown": 20, "more": 11, "empty": False}, 31),
+])
+def test_fpt_total_is_unknown_without_products_or_empty_marker(counts, total):
+    # A blocked or unloaded page must not read as a confirmed "0 phones"
+    fpt = FPTShop(CountingDriver(counts))
+    fpt.deadline = Deadline(0.3)
+    fpt._read_total()
+    assert fpt.total_product == total
+
+
+def test_open_circuit_skips_the_source(cache, redis_client):
+    breaker = CircuitBreaker(redis_client)
+    for _ in range(breaker.failure_threshold):
+        breaker.record("TGDD", False, 1.0, False)
+    service = CountService(FakePool(), cache, breaker=breaker)
+    total, reports = service.count(PhoneConfiguration())
+    assert reports["TGDD"]["error"] == "circuit open"
+    assert cache.saved == {"FPT": 7}
+    # FPT was counted and recorded as healthy
+    assert breaker.health(["FPT"])["FPT"]["errors"] == "0"
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+
+from selenium_.cancellation import ScrapeCancelled
+from selenium_.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def get(self, url):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = DriverPool(size=1)
+    monkeypatch.setattr(pool, "_create_driver", FakeDriver)
+    return pool
+
+
+def test_exhausted_pool_times_out(pool):
+    with pool.driver():
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.1)
+
+
+def test_cancelled_wait_stops_early(pool):
+    with pool.driver():
+        started = time.monotonic()
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=30, cancelled=lambda: time.monotonic() - started > 0.3)
+        assert time.monotonic() - started < 2
+
+
+def test_waiter_gets_the_released_driver(pool):
+    drv = pool.acquire()
+    pool.release(drv)
+    assert pool.acquire(timeout=0.1) is drv
+
+
+@pytest.mark.parametrize("error, kept", [
+    (ScrapeCancelled("client gone"), True),
+    (TimeoutException("wait shortened by the deadline"), True),
+    (InvalidSessionIdException("session deleted"), False),
+])
+def test_only_driver_errors_discard_the_driver(pool, error, kept):
+    with pytest.raises(type(error)):
+        with pool.driver() as drv:
+            raise error
+    assert (pool.acquire(timeout=0.1) is drv) == kept
@@ -0,0 +1,35 @@
+from cache.filter_cache import RELEASE_SCRIPT, FilterOptionCache
+
+
+class FailingManager:
+    timings = {}
+
+    def get_combined_filters(self, force_refresh=False):
+        return {}
+
+
+def make_cache(redis_client, tmp_path):
+    cache = FilterOptionCache(FailingManager(), str(tmp_path / "filters.json"))
+    cache.redis = redis_client
+    cache._release_script = redis_client.register_script(RELEASE_SCRIPT)
+    return cache
+
+
+def test_refresh_lock_is_released_with_its_token(redis_client, tmp_path):
+    cache = make_cache(redis_client, tmp_path)
+    token = cache._refresh_due()
+    assert token
+    # Another process sees the scrape in progress
+    assert make_cache(redis_client, tmp_path)._refresh_due() is None
+    cache._release(token)
+    assert not redis_client.exists(cache.LOCK_KEY)
+    assert make_cache(redis_client, tmp_path)._refresh_due()
+
+
+def test_expired_lock_taken_by_another_process_is_kept(redis_client, tmp_path):
+    cache = make_cache(redis_client, tmp_path)
+    token = cache._refresh_due()
+    redis_client.delete(cache.LOCK_KEY)  # Expired mid-scrape
+    other = make_cache(redis_client, tmp_path)._refresh_due()
+    cache._release(token)
+    assert redis_client.get(cache.LOCK_KEY) == other
@@ -0,0 +1,52 @@
+import pytest
+
+from html_harvest import load_harvest
+from selenium_.page.fptshop import FPTShopScraper
+
+
+@pytest.fixture(scope="module")
+def harvest():
+    return load_harvest()
+
+
+@pytest.fixture
+def scraper():
+    return FPTShopScraper()
+
+
+def test_harvest_fixture_shape(harvest):
+    assert "https://fptshop.com.vn/dien-thoai/samsung" in harvest["links"]
+    # Sort links carry a query string, the bare listing is not a brand
+    assert not any("?" in link or link.endswith("/dien-thoai") for link in harvest["links"])
+    assert ("span", "Dưới 2 triệu") in harvest["texts"]
+
+
+def test_brands(scraper, harvest):
+    assert scraper._parse_brands(harvest) == [
+        "apple", "samsung", "xiaomi", "oppo", "honor", "realme", "vivo", "tecno", "nokia",
+    ]
+
+
+def test_price_ranges(scraper, harvest):
+    labels = [p["label"] for p in scraper._parse_price_ranges(harvest)]
+    assert labels == ["Dưới 2 triệu", "Từ 2 - 4 triệu", "Từ 4 - 7 triệu", "Từ 7 - 13 triệu",
+                      "Từ 13 - 20 triệu", "Trên 20 triệu"]
+
+
+def test_memory_options(scraper, harvest):
+    assert scraper._parse_ram_options(harvest) == ["4 GB", "6 GB", "8 GB", "12 GB"]
+    assert scraper._parse_storage_options(harvest) == ["64 GB", "128 GB", "256 GB", "512 GB", "1 TB"]
+
+
+def test_os_and_network_options(scraper, harvest):
+    assert scraper._parse_os_options(harvest) == ["iOS", "Android"]
+    assert scraper._parse_network_options(harvest) == ["5G", "4G"]
+
+
+def test_all_options_from_one_harvest(scraper, harvest, monkeypatch):
+    loads = []
+    monkeypatch.setattr(scraper, "harvest_filters", lambda: loads.append(1) or harvest)
+    options = scraper.get_all_filter_options()
+    assert len(loads) == 1
+    assert set(options) == {"brands", "price_ranges", "ram_options", "storage_options", "os_options",
+                            "network_options"}
@@ -0,0 +1,132 @@
+import json
+import time
+
+import pytest
+
+from cache.job_queue import ScrapeJobQueue
+
+
+@pytest.fixture
+def queue(redis_client, monkeypatch):
+    monkeypatch.setenv('SCRAPE_JOB_MAX_ATTEMPTS', '2')
+    monkeypatch.setenv('SCRAPE_JOB_VISIBILITY_TIMEOUT', '60')
+    return ScrapeJobQueue(redis_client)
+
+
+def test_claim_leases_the_oldest_job(queue):
+    first = queue.enqueue({"brand": ["Samsung"]}, deadline_seconds=30)
+    queue.enqueue({"brand": ["OPPO"]})
+
+    job = queue.claim("worker-1", block_timeout=0.1)
+
+    assert job["id"] == first
+    assert job["status"] == "running"
+    assert job["attempts"] == 1
+    assert job["config"] == {"brand": ["Samsung"]}
+    assert job["deadline_seconds"] == 30.0
+    assert queue.redis.lrange(queue.PROCESSING_KEY, 0, -1) == [first]
+    assert queue.redis.zscore(queue.LEASES_KEY, first) > time.time()
+
+
+def test_claim_returns_none_when_empty(queue):
+    assert queue.claim("worker-1", block_timeout=0.1) is None
+
+
+def test_complete_stores_result_and_releases_lease(queue):
+    job_id = queue.enqueue({})
+    queue.claim("worker-1", block_timeout=0.1)
+
+    assert queue.complete(job_id, "worker-1", {"total_products": 2})
+
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"total_products": 2}
+    assert queue.redis.llen(queue.PROCESSING_KEY) == 0
+    assert queue.redis.zcard(queue.LEASES_KEY) == 0
+
+
+def test_failure_is_retried_then_dead_lettered(queue):
+    job_id = queue.enqueue({})
+
+    queue.claim("worker-1", block_timeout=0.1)
+    assert queue.fail(job_id, "boom") == "queued"
+    assert queue.redis.lrange(queue.PENDING_KEY, 0, -1) == [job_id]
+
+    queue.claim("worker-1", block_timeout=0.1)
+    assert queue.fail(job_id, "boom again") == "dead"
+
+    job = queue.get(job_id)
+    assert job["status"] == "dead"
+    assert job["error"] == "boom again"
+    assert queue.redis.lrange(queue.DEAD_KEY, 0, -1) == [job_id]
+    assert queue.redis.llen(queue.PENDING_KEY) == 0
+    assert queue.redis.llen(queue.PROCESSING_KEY) == 0
+
+
+def test_fail_of_a_job_not_in_processing_is_ignored(queue):
+    job_id = queue.enqueue({})
+    queue.claim("worker-1", block_timeout=0.1)
+    queue.fail(job_id, "boom")
+
+    # A second failure report (e.g. lease recovery racing the worker) does not duplicate it
+    assert queue.fail(job_id, "boom") is None
+    assert queue.redis.lrange(queue.PENDING_KEY, 0, -1) == [job_id]
+
+
+def test_expired_lease_is_requeued(queue):
+    job_id = queue.enqueue({})
+    queue.claim("worker-1", block_timeout=0.1)
+    queue.redis.zadd(queue.LEASES_KEY, {job_id: time.time() - 1})
+
+    assert queue.requeue_expired() == [job_id]
+
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert job["error"] == "visibility timeout expired"
+    assert queue.redis.lrange(queue.PENDING_KEY, 0, -1) == [job_id]
+    assert queue.redis.zcard(queue.LEASES_KEY) == 0
+
+
+def test_live_lease_is_not_requeued(queue):
+    queue.enqueue({})
+    queue.claim("worker-1", block_timeout=0.1)
+
+    assert queue.requeue_expired() == []
+
+
+def test_complete_without_the_lease_is_ignored(queue):
+    job_id = queue.enqueue({})
+    queue.claim("worker-1", block_timeout=0.1)
+    queue.redis.zadd(queue.LEASES_KEY, {job_id: time.time() - 1})
+    queue.requeue_expired()
+    queue.claim("worker-2", block_timeout=0.1)
+
+    # worker-1 lost the lease, its late result does not finish worker-2's run
+    assert not queue.complete(job_id, "worker-1", {"total_products": 1})
+    assert queue.get(job_id)["status"] == "running"
+    assert queue.complete(job_id, "worker-2", {"total_products": 2})
+    assert queue.get(job_id)["result"] == {"total_products": 2}
+
+
+def test_job_with_an_expired_record_is_dead_lettered(queue):
+    gone = queue.enqueue({"brand": ["Samsung"]})
+    queue.redis.delete(queue.JOB_KEY.format(gone))
+    kept = queue.enqueue({"brand": ["OPPO"]})
+
+    job = queue.claim("worker-1", block_timeout=0.1)
+
+    assert job["id"] == kept
+    assert queue.redis.lrange(queue.DEAD_KEY, 0, -1) == [gone]
+    assert queue.redis.lrange(queue.PROCESSING_KEY, 0, -1) == [kept]
+    assert not queue.redis.exists(queue.JOB_KEY.format(gone))
+
+
+def test_result_is_read_in_byte_ranges(queue):
+    job_id = queue.enqueue({})
+    queue.claim("worker-1", block_timeout=0.1)
+    queue.complete(job_id, "worker-1", {"products": [{"name": "Điện thoại"}]})
+
+    assert "result" not in queue.get(job_id, include_result=False)
+    payload = queue.read_result(job_id, 0, 9) + queue.read_result(job_id, 10, -1)
+    assert isinstance(payload, bytes)
+    assert json.loads(payload.decode("utf-8")) == {"products": [{"name": "Điện thoại"}]}
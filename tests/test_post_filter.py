@@ -0,0 +1,36 @@
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.model.result import Result
+from selenium_.post_filter import PostFilter
+
+
+def product(name: str, details=(), price: str = "10.990.000₫") -> Result:
+    return Result("", name, price, "", list(details))
+
+
+CONFIG = PhoneConfiguration(brand=["Samsung"], ram=("8 GB", ">="), refresh_rates=["120 Hz"])
+
+
+def test_products_are_checked_on_their_parsed_fields():
+    post_filter = PostFilter(CONFIG)
+    assert post_filter.matches(product("Samsung Galaxy A55 8GB/128GB", ["120 Hz"]))
+    assert not post_filter.matches(product("Samsung Galaxy A15 4GB/128GB", ["90 Hz"]))
+    assert not post_filter.matches(product("Xiaomi Redmi Note 13 8GB/128GB", ["120 Hz"]))
+
+
+def test_missing_fields_pass_when_the_site_applied_the_filter():
+    assert PostFilter(CONFIG).matches(product("Samsung Galaxy A55"))
+
+
+def test_missing_fields_fail_when_the_filter_ran_locally_only():
+    post_filter = PostFilter(CONFIG, strict=("refresh_rates",))
+    assert not post_filter.matches(product("Samsung Galaxy A55 8GB/128GB"))
+    assert post_filter.matches(product("Samsung Galaxy A55 8GB/128GB", ["120 Hz"]))
+    # RAM still came from the site filter
+    assert post_filter.matches(product("Samsung Galaxy A55", ["120 Hz"]))
+
+
+def test_price_range():
+    post_filter = PostFilter(PhoneConfiguration(price_range="tu-4-7-trieu"))
+    kept = [r.name for r in post_filter.apply([product("a", price="5.490.000₫"), product("b", price="8.990.000₫"),
+                                               product("c", price="Liên hệ")])]
+    assert kept == ["a", "c"]
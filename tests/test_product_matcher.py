@@ -0,0 +1,50 @@
+import pytest
+
+from selenium_.model.result import Result
+from selenium_.product_matcher import ProductKey, group_offers
+
+
+def listing(name: str, source: str, price: str = "10.990.000₫") -> Result:
+    return Result("", name, price, "", [], source=source)
+
+
+@pytest.mark.parametrize("tgdd, fpt", [
+    ("Samsung Galaxy S24 Ultra 5G 12GB/256GB", "Samsung Galaxy S24 Ultra 12GB 256GB"),
+    ("Samsung Galaxy Z Flip6 5G 12GB/256GB", "Samsung Galaxy Z Flip6 256GB"),
+    ("iPhone 15 Pro Max 256GB", "Điện thoại iPhone 15 Pro Max 256GB Titan tự nhiên"),
+    ("Xiaomi Redmi Note 13 8GB/128GB", "Xiaomi Redmi Note 13 8GB 128GB Đen"),
+    ("Samsung Galaxy A55 5G 8GB/128GB", "Samsung Galaxy A55 5G"),
+])
+def test_same_model_across_sources_is_grouped(tgdd, fpt):
+    groups = group_offers([listing(tgdd, "TGDD"), listing(fpt, "FPT", "10.490.000₫")])
+    assert len(groups) == 1
+    assert groups[0].to_dict()["sources"] == ["FPT", "TGDD"]
+    assert groups[0].best_price_vnd == 10490000
+
+
+@pytest.mark.parametrize("a, b", [
+    ("Samsung Galaxy A15 4G 8GB/128GB", "Samsung Galaxy A15 5G 8GB/128GB"),
+    ("iPhone 15 Pro 256GB", "iPhone 15 Pro Max 256GB"),
+    ("iPhone 15 128GB", "iPhone 15 256GB"),
+    ("Samsung Galaxy Z Flip6 5G 256GB", "Samsung Galaxy Z Fold6 5G 256GB"),
+    ("Samsung Galaxy S24 256GB", "Samsung Galaxy S24 FE 256GB"),
+])
+def test_different_models_stay_apart(a, b):
+    assert len(group_offers([listing(a, "TGDD"), listing(b, "FPT")])) == 2
+
+
+def test_name_without_storage_does_not_chain_storage_sizes():
+    groups = group_offers([
+        listing("iPhone 15 128GB", "TGDD"),
+        listing("iPhone 15 256GB", "TGDD"),
+        listing("iPhone 15", "FPT"),
+    ])
+    assert len(groups) == 3
+
+
+def test_network_and_colour_words_are_not_part_of_the_model():
+    key = ProductKey(listing("Samsung Galaxy Z Flip6 5G 12GB/256GB Xanh Dương", "TGDD"))
+    assert key.brand == "Samsung"
+    assert key.model_tokens == ("galaxy", "z", "flip6")
+    assert key.network == "5g"
+    assert key.storage_gb == 256.0
@@ -0,0 +1,55 @@
+import pytest
+
+from cache.scrape_stats import ScrapeStats
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.page.tgdd import TGDD
+from selenium_.query_planner import CLEARED, QueryPlanner
+
+CONFIG = PhoneConfiguration(brand=["Samsung"], ram=("8 GB", ">="), storage=("256 GB", ">="))
+
+
+@pytest.fixture
+def stats(redis_client):
+    stats = ScrapeStats()
+    stats.redis = redis_client
+    return stats
+
+
+@pytest.fixture
+def planner(stats, monkeypatch):
+    monkeypatch.setattr(QueryPlanner, "REMEASURE_RATE", 0.0)
+    return QueryPlanner(stats)
+
+
+def measured_batch(scraper: TGDD):
+    scraper._record_groups({
+        "initial": 1200,
+        "groups": [
+            {"group": "base", "total": 150, "ms": 900},
+            {"group": "ram", "total": 75, "ms": 1400},
+            {"group": "storage", "total": 60, "ms": 700},
+        ],
+    })
+
+
+def test_measured_batch_fills_base_total_and_filter_timings():
+    scraper = TGDD(driver=None)
+    measured_batch(scraper)
+    assert scraper.base_total == 150
+    assert scraper.filter_timings == {"ram": (1.4, 150, 75), "storage": (0.7, 75, 60)}
+
+
+def test_measurement_stops_once_the_filters_are_sampled(planner, stats):
+    assert planner.needs_measurement("TGDD", CONFIG)
+    scraper = TGDD(driver=None)
+    measured_batch(scraper)
+    for _ in range(QueryPlanner.MIN_SAMPLES):
+        for name, (latency, before, after) in scraper.filter_timings.items():
+            stats.record_filter("TGDD", name, latency, before, after)
+    assert planner.needs_measurement("TGDD", CONFIG)  # Base total still unknown
+    stats.record_count("TGDD", CONFIG.replace(**CLEARED).cache_key(), scraper.base_total)
+    assert not planner.needs_measurement("TGDD", CONFIG)
+
+
+def test_nothing_to_measure_without_spec_filters(planner):
+    assert not planner.needs_measurement("TGDD", PhoneConfiguration(brand=["Samsung"]))
@@ -0,0 +1,30 @@
+import pytest
+
+from cache.scrape_stats import ScrapeStats
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.query_splitter import QuerySplitter
+
+
+@pytest.fixture
+def splitter(redis_client):
+    stats = ScrapeStats()
+    stats.redis = redis_client
+    splitter = QuerySplitter(stats)
+    # A 400-phone catalog, evenly spread over the price buckets
+    phone = PhoneConfiguration()
+    stats.record_count("TGDD", phone.cache_key(), 400)
+    for bucket in splitter.filter_list.get_price_ranges():
+        stats.record_count("TGDD", phone.replace(price_range=bucket["data-href"]).cache_key(), 60)
+    return splitter
+
+
+def test_whole_catalog_fans_out_over_price_buckets(splitter):
+    assert len(splitter.split(PhoneConfiguration(), parallelism=4)) > 1
+
+
+def test_top_n_is_not_split(splitter):
+    # One session loads the N products, more sessions only add their fixed cost
+    phone = PhoneConfiguration()
+    assert splitter.split(phone, parallelism=4, limit=10) == [phone]
+    brands = phone.replace(brand=["Samsung", "OPPO", "Xiaomi", "vivo"])
+    assert splitter.split(brands, parallelism=4, limit=10) == [brands]
@@ -0,0 +1,85 @@
+import math
+import time
+
+import pytest
+
+from cache.rate_limiter import RateLimiter, host_of, parse_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(params=["local", "redis"])
+def limiter(request, clock):
+    redis_client = request.getfixturevalue("redis_client") if request.param == "redis" else None
+    return RateLimiter(redis_client, limits={"example.com": (2.0, 2.0)}, clock=clock, sleep=clock.sleep)
+
+
+def test_parse_limits_and_host():
+    assert parse_limits("a.com=1:3, b.vn=0.5") == {"a.com": (1.0, 3.0), "b.vn": (0.5, 0.5)}
+    assert host_of("https://www.Example.com:443/path") == "example.com"
+
+
+def test_burst_then_spaced_at_rate(limiter, clock):
+    assert limiter.acquire("https://example.com/a")
+    assert limiter.acquire("https://example.com/b")
+    assert clock.sleeps == []
+    started = clock.now
+    assert limiter.acquire("https://example.com/c")
+    assert clock.now - started == pytest.approx(0.5)
+    # The wait is slept in slices, never longer than one at a time
+    assert max(clock.sleeps) <= RateLimiter.SLEEP_SLICE
+
+
+def test_unknown_host_is_not_limited(limiter, clock):
+    for _ in range(10):
+        assert limiter.acquire("https://other.com")
+    assert clock.sleeps == []
+
+
+def test_wait_beyond_max_wait_is_refused(limiter, clock):
+    limiter.acquire("example.com", tokens=2)
+    assert not limiter.acquire("example.com", max_wait=0.1)
+    assert clock.sleeps == []
+    assert limiter.metrics()["example.com"]["rejected"] == 1
+    # Nothing was reserved by the refusal
+    assert limiter.reserve("example.com", max_wait=0.5) == (True, pytest.approx(0.5))
+
+
+def test_infinite_max_wait_means_no_limit(limiter, clock):
+    limiter.acquire("example.com", tokens=2)
+    assert limiter.acquire("example.com", tokens=4, max_wait=math.inf)
+    assert clock.now == pytest.approx(1002.0)
+
+
+def test_cancellation_stops_the_wait(limiter, clock):
+    limiter.acquire("example.com", tokens=2)
+    deadline = clock.now + 0.6
+    assert not limiter.acquire("example.com", tokens=4, cancelled=lambda: clock.now >= deadline)
+    assert clock.now < 1001.0
+
+
+def test_shared_bucket_refills_on_the_server_clock(redis_client):
+    limits = {"example.com": (1.0, 1.0)}
+    worker = RateLimiter(redis_client, limits=limits)
+    # A worker whose clock runs an hour ahead does not refill the shared bucket
+    skewed = RateLimiter(redis_client, limits=limits)
+    skewed.clock = lambda: time.time() + 3600
+    assert worker.reserve("example.com") == (True, 0.0)
+    granted, wait = skewed.reserve("example.com")
+    assert granted and wait == pytest.approx(1.0, abs=0.1)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from selenium_.model.result import Result, parse_price_vnd
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12.990.000₫", 12990000),
+    ("12,990,000 đ", 12990000),
+    ("12990000", 12990000),
+    ("Giá: 8.490.000₫ -10%", 8490000),
+    ("Liên hệ", None),
+    ("Không có thông tin", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_price_vnd(text, expected):
+    assert parse_price_vnd(text) == expected
+
+
+def make_result() -> Result:
+    return Result("//cdn.tgdd.vn/s24.jpg", "Samsung Galaxy S24 Ultra 5G 12GB/256GB", "29.990.000₫",
+                  "https://www.thegioididong.com/dtdd/samsung-galaxy-s24-ultra",
+                  ['6.8"', "120 Hz", "Snapdragon 8 Gen 3 for Galaxy"], source="TGDD", source_id="307174")
+
+
+def test_fields_are_parsed_at_construction():
+    r = make_result()
+    assert r.price_vnd == 29990000
+    assert (r.ram_gb, r.storage_gb) == (12.0, 256.0)
+    assert r.refresh_rate_hz == 120
+    assert r.screen_inches == 6.8
+    assert r.chip == "Snapdragon 8 Gen 3"
+
+
+def test_to_dict_has_the_product_out_shape():
+    from main import ProductOut
+
+    data = make_result().to_dict()
+    assert ProductOut(**data).model_dump() == data
+    json.dumps(data, ensure_ascii=False)
+
+
+def test_to_dict_defaults_for_missing_values():
+    data = Result(None, None, None, None, None).to_dict()
+    assert data["image_link"] == "N/A"
+    assert data["name"] == ""
+    assert data["price"] == "Không có thông tin"
+    assert data["details"] == []
+    assert data["price_vnd"] is None
+
+
+def test_round_trip_through_dict():
+    r = make_result()
+    assert Result.from_dict(r.to_dict()).to_dict() == r.to_dict()
+
+
+def test_slots_keep_records_compact():
+    with pytest.raises(AttributeError):
+        make_result().extra = 1
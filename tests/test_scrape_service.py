@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from cache.circuit_breaker import OPEN, CircuitBreaker
+from cache.rate_limiter import rate_limiter
+from selenium_.model.phone_configuration import PhoneConfiguration
+from selenium_.page.fpt import FPTShop
+from selenium_.scrape_service import ScrapeService
+
+
+class RecordingBreaker:
+    def __init__(self):
+        self.records = []
+        self.saved = []
+
+    def record(self, source, success, latency, zero_result):
+        self.records.append((source, success, zero_result))
+
+    def save_results(self, source, config_key, results):
+        self.saved.append(source)
+
+
+def report(**overrides):
+    r = {"partial": False, "expected": None, "collected": 0, "error": "", "latency": 1.0, "timed_out": False}
+    r.update(overrides)
+    return r
+
+
+@pytest.fixture
+def service():
+    return ScrapeService(pool=None, breaker=RecordingBreaker())
+
+
+def health(service, *reports):
+    merged = ScrapeService._merge_reports(list(reports))
+    service._record_health("FPT", PhoneConfiguration(), [], list(reports), merged)
+    return service.breaker.records[-1][1]
+
+
+def test_timed_out_errors_are_not_failures(service):
+    assert health(service, report(error="Message: timeout", partial=True, timed_out=True))
+    assert health(service, report(error="scrape cancelled: client gone", timed_out=True))
+
+
+def test_real_errors_are_failures(service):
+    assert not health(service, report(error="no such element"))
+    assert not health(service, report(collected=3), report(error="no such element"))
+
+
+def test_zero_results_fail_unless_the_site_confirmed_an_empty_listing(service):
+    assert not health(service, report(expected=12))
+    assert health(service, report(expected=0))
+    # A blocked page shows no total either
+    assert not health(service, report(expected=None))
+    assert health(service, report(expected=None, partial=True, timed_out=True))
+
+
+class FakePool:
+    size = 2
+
+    @contextmanager
+    def driver(self, timeout=None, cancelled=None):
+        yield BlockedDriver()
+
+
+class BlockedDriver:
+    def get(self, url):
+        raise WebDriverException("net::ERR_CONNECTION_RESET")
+
+
+def test_failing_fpt_page_opens_the_breaker(redis_client, monkeypatch):
+    monkeypatch.setattr(ScrapeService, "SOURCES", {"FPT": FPTShop})
+    monkeypatch.setattr(rate_limiter, "limits", {})
+    breaker = CircuitBreaker(redis_client)
+    service = ScrapeService(pool=FakePool(), breaker=breaker)
+    for _ in range(breaker.failure_threshold):
+        _, reports = service.scrape(PhoneConfiguration())
+        assert "ERR_CONNECTION_RESET" in reports["FPT"]["error"]
+    assert breaker.state("FPT") == OPEN
+    _, reports = service.scrape(PhoneConfiguration())
+    assert reports["FPT"]["circuit_open"]
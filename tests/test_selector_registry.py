@@ -0,0 +1,61 @@
+import pytest
+
+from cache.selector_registry import SelectorRegistry
+
+IMAGE_SELECTORS = ("a.flex-1 img", "img")
+
+
+@pytest.fixture
+def registry(redis_client):
+    registry = SelectorRegistry()
+    registry.redis = redis_client
+    return registry
+
+
+def lookup_from(found):
+    return lambda selector: "x.jpg" if selector in found else None
+
+
+def test_declared_order_is_kept_while_both_match(registry):
+    # The broad fallback hits on every card, the precise selector on most of them
+    for i in range(200):
+        found = {"img"} if i % 10 == 0 else {"a.flex-1 img", "img"}
+        registry.first("FPT", "image", IMAGE_SELECTORS, lookup_from(found))
+    assert registry.ranked("FPT", "image", IMAGE_SELECTORS) == list(IMAGE_SELECTORS)
+    stats = registry._field_stats("FPT", "image")
+    # "img" is only reached when the precise selector misses
+    assert stats["img"][1] < 40
+
+
+def test_collapsed_selector_is_demoted_and_recovers(registry):
+    for _ in range(30):
+        registry.first("FPT", "image", IMAGE_SELECTORS, lookup_from({"img"}))
+    assert registry.ranked("FPT", "image", IMAGE_SELECTORS) == ["img", "a.flex-1 img"]
+    # Probes keep measuring the demoted selector, which moves back once it matches again
+    for _ in range(100):
+        registry.first("FPT", "image", IMAGE_SELECTORS, lookup_from({"a.flex-1 img", "img"}))
+    assert registry.ranked("FPT", "image", IMAGE_SELECTORS) == list(IMAGE_SELECTORS)
+
+
+def test_few_misses_do_not_demote(registry):
+    for _ in range(SelectorRegistry.MIN_SAMPLES - 1):
+        registry.record("FPT", "name", "h3", False)
+    assert registry.ranked("FPT", "name", ("h3", "a[title]")) == ["h3", "a[title]"]
+
+
+def test_collapse_raises_an_alert_once(registry):
+    for _ in range(SelectorRegistry.MIN_SAMPLES):
+        registry.record("TGDD", "price", "strong.price", True)
+    for _ in range(20):
+        registry.record("TGDD", "price", "strong.price", False)
+    alerts = registry.alerts()
+    assert len(alerts) == 1
+    assert alerts[0]["selector"] == "strong.price"
+
+
+def test_rankings_are_persisted(registry, redis_client):
+    registry.first("TGDD", "details", (".utility p",), lookup_from({".utility p"}))
+    registry.flush()
+    other = SelectorRegistry()
+    other.redis = redis_client
+    assert other._field_stats("TGDD", "details")[".utility p"][1] == 1
@@ -0,0 +1,51 @@
+import pytest
+
+from selenium_.model.spec_parser import Specs, SpecParser, spec_parser
+
+
+@pytest.mark.parametrize("texts, expected", [
+    (["8 GB", "256 GB", "Full HD+", "120 Hz"], Specs(8.0, 256.0, "Full HD+", 120)),
+    (["RAM 8 GB", "ROM 128 GB"], Specs(8.0, 128.0)),
+    (["Bộ nhớ trong 256 GB"], Specs(storage_gb=256.0)),
+    (["1 TB"], Specs(storage_gb=1024.0)),
+    (["Samsung Galaxy S24 Ultra 5G 12GB/256GB"], Specs(12.0, 256.0)),
+    (["iPhone 15 Pro Max 256GB"], Specs(storage_gb=256.0)),
+    # A budget phone's 16 GB is storage once the card also lists its RAM
+    (["4 GB", "16 GB"], Specs(4.0, 16.0)),
+    (["16 GB", "RAM 2 GB"], Specs(2.0, 16.0)),
+    (["ROM 128 GB", "8 GB"], Specs(8.0, 128.0)),
+    (["Nokia C32 4GB/64GB"], Specs(4.0, 64.0)),
+    (["Quad HD+ (2K+)"], Specs(resolution="2K+")),
+    (["FHD+"], Specs(resolution="Full HD+")),
+    (["Super Retina XDR"], Specs(resolution="Retina (iPhone)")),
+    (["1.5K"], Specs(resolution="1.5K")),
+    (['Màn hình 6.5" HD+ 90 Hz'], Specs(resolution="HD+", refresh_rate_hz=90, screen_inches=6.5)),
+    (["6.67 inch"], Specs(screen_inches=6.67)),
+    (["Chip Snapdragon 8 Gen 3 for Galaxy"], Specs(chip="Snapdragon 8 Gen 3")),
+    (["Apple A17 Pro"], Specs(chip="Apple A17 Pro")),
+    (["MediaTek Dimensity 7050"], Specs(chip="MediaTek Dimensity 7050")),
+    (["Helio G99"], Specs(chip="Helio G99")),
+    (["Camera 200 MP", "Pin 5000 mAh", "Sạc nhanh 45 W"], Specs()),
+])
+def test_parse_samples(texts, expected):
+    assert spec_parser.parse(texts) == expected
+
+
+def test_galaxy_model_is_not_an_apple_chip():
+    assert spec_parser.parse(["Samsung Galaxy A55 5G 8GB/128GB"]).chip is None
+
+
+def test_first_match_per_field_wins():
+    specs = spec_parser.parse(["120 Hz", "90 Hz", "8 GB", "12 GB"])
+    assert specs.refresh_rate_hz == 120
+    assert specs.ram_gb == 8.0
+
+
+def test_empty_and_missing_texts():
+    assert spec_parser.parse([]) == Specs()
+    assert spec_parser.parse(["", None]) == Specs()
+
+
+def test_parser_instances_agree():
+    texts = ["8 GB", "256 GB", "FHD+", "120 Hz"]
+    assert SpecParser().parse(texts) == spec_parser.parse(texts)
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+
+import pytest
+
+from export_service.streaming import (
+    BATCH_SIZE, CATALOG_COLUMNS, PRODUCT_COLUMNS, export_response, iter_csv, iter_json_array, iter_ndjson,
+    iter_parquet,
+)
+from selenium_.model.result import Result
+
+
+def rows(n: int):
+    for i in range(n):
+        yield Result(f"//img/{i}.jpg", f"Samsung Galaxy A{i} 8GB/128GB", "5.990.000₫", f"https://x/{i}",
+                     ["8 GB", "128 GB", "Full HD+"], source="TGDD", source_id=str(i)).to_dict()
+
+
+def test_ndjson_one_object_per_row():
+    lines = b"".join(iter_ndjson(rows(3), PRODUCT_COLUMNS)).decode("utf-8").splitlines()
+    assert len(lines) == 3
+    first = json.loads(lines[0])
+    assert list(first) == [name for name, _ in PRODUCT_COLUMNS]
+    assert first["price_vnd"] == 5990000
+    assert first["details"] == ["8 GB", "128 GB", "Full HD+"]
+
+
+def test_ndjson_is_written_in_batches():
+    chunks = list(iter_ndjson(rows(BATCH_SIZE * 2 + 1), PRODUCT_COLUMNS))
+    assert len(chunks) == 3
+
+
+def test_csv_has_bom_header_and_joined_lists():
+    data = b"".join(iter_csv(rows(2), PRODUCT_COLUMNS)).decode("utf-8")
+    assert data.startswith("\ufeff")
+    table = list(csv.reader(io.StringIO(data[1:])))
+    assert table[0] == [name for name, _ in PRODUCT_COLUMNS]
+    assert len(table) == 3
+    row = dict(zip(table[0], table[1]))
+    assert row["details"] == "8 GB; 128 GB; Full HD+"
+    assert row["chip"] == ""
+
+
+def test_missing_columns_are_empty():
+    data = b"".join(iter_csv([{"source": "FPT", "name": "x"}], CATALOG_COLUMNS)).decode("utf-8")
+    assert data.splitlines()[1] == "FPT,,x,,,,"
+
+
+def test_parquet_round_trip():
+    pq = pytest.importorskip("pyarrow.parquet")
+    table = pq.read_table(io.BytesIO(b"".join(iter_parquet(rows(BATCH_SIZE + 5), PRODUCT_COLUMNS))))
+    assert table.num_rows == BATCH_SIZE + 5
+    assert table.column("price_vnd")[0].as_py() == 5990000
+
+
+def test_export_response_headers():
+    response = export_response(rows(1), "csv", "result-abc")
+    assert response.headers["content-disposition"] == 'attachment; filename="result-abc.csv"'
+    assert response.media_type.startswith("text/csv")
+    with pytest.raises(ValueError):
+        export_response(rows(1), "xlsx", "result-abc")
+
+
+def byte_ranges(payload: bytes):
+    # Like Redis GETRANGE: inclusive end, empty past the end
+    return lambda start, end: payload[start:end + 1]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64 * 1024])
+def test_json_array_is_decoded_across_chunks(chunk_size):
+    products = [{"name": "Điện thoại Samsung", "price_vnd": 5990000, "ram_gb": 8.0}, 12345, None, []]
+    payload = json.dumps({"total": 4, "meta": {"phones": [1]}, "phones": products,
+                          "after": "x"}, ensure_ascii=False).encode("utf-8")
+    assert list(iter_json_array(byte_ranges(payload), "phones", chunk_size)) == products
+
+
+def test_json_array_missing_key_yields_nothing():
+    payload = json.dumps({"total": 0, "phones": []}).encode("utf-8")
+    assert list(iter_json_array(byte_ranges(payload), "products", 4)) == []
+    assert list(iter_json_array(byte_ranges(payload), "phones", 4)) == []
+
+
+def test_json_array_rejects_a_missing_payload():
+    with pytest.raises(ValueError):
+        list(iter_json_array(byte_ranges(b""), "phones"))